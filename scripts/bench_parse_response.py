@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型响应解析微基准
+
+功能：
+- 构造一组贴近实际的模型响应（纯 JSON、```json 代码块、前后夹带说明文字、
+  合并分析的 results、长篇铺垫、被截断的响应等）
+- 对比旧的正则提取与 response_parser.extract_json 的耗时与解析结果
+
+用法：
+python scripts/bench_parse_response.py [--repeat 200] [--ideas 3]
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from response_parser import extract_json
+
+
+def legacy_extract(content: str, key: str) -> Dict:
+    """旧版 _extract_json：整体解析失败后依次尝试三个正则"""
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+
+    json_match = re.search(r'```json\s*(\{[\s\S]*?\})\s*```', content)
+    if not json_match:
+        json_match = re.search(r'```\s*(\{[\s\S]*?\})\s*```', content)
+    if not json_match:
+        json_match = re.search(r'\{[\s\S]*"' + key + r'"[\s\S]*\}', content)
+
+    if json_match:
+        try:
+            json_str = json_match.group(1) if json_match.lastindex else json_match.group(0)
+            return json.loads(json_str)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"无法解析 API 返回的 JSON: {str(e)}")
+
+    raise ValueError("API 响应中未找到有效的 JSON 数据")
+
+
+def make_idea(i: int) -> Dict:
+    """一个典型的创意对象"""
+    return {
+        "name": f"热点速记{i}：一键生成「事件时间线」的小工具",
+        "score": 70 + i % 20,
+        "fun_score": 72 + i % 15,
+        "use_score": 60 + i % 30,
+        "features": [
+            "自动汇总话题下的高赞微博，按时间排序生成时间线",
+            "支持 {关键词} 订阅与 \"反转\" 提醒",
+            "一键生成可分享的长图卡片",
+        ],
+        "target_users": "喜欢追热点、但没时间刷完整个话题的年轻用户",
+        "description": "把碎片化的热搜讨论整理成一条清晰的事件脉络，"
+                       "用户几秒钟就能看懂来龙去脉，并能分享给朋友。" * 2,
+    }
+
+
+def build_corpus(count: int) -> List[Tuple[str, str, str]]:
+    """
+    构造响应语料
+
+    Returns:
+        [(名称, 键, 响应文本), ...]
+    """
+    ideas = {"ideas": [make_idea(i) for i in range(count)]}
+    plain = json.dumps(ideas, ensure_ascii=False, indent=2)
+    compact = json.dumps(ideas, ensure_ascii=False)
+    preamble = "好的，我来分析这个热搜背后的产品机会。\n\n" + "首先，这个话题的讨论热度很高，用户情绪集中在……\n" * 40
+    epilogue = "\n\n以上创意中，第一个最值得优先验证。如需调整评分标准（例如 {有趣度: 80%}），请告诉我。"
+    batch = {"results": [{"hotword": f"话题{j}", "ideas": ideas["ideas"]} for j in range(5)]}
+
+    return [
+        ('纯 JSON', 'ideas', plain),
+        ('```json 代码块', 'ideas', f"```json\n{plain}\n```"),
+        ('说明文字 + 代码块', 'ideas', f"{preamble}```json\n{plain}\n```{epilogue}"),
+        ('说明文字 + 裸 JSON', 'ideas', f"{preamble}{compact}{epilogue}"),
+        ('合并分析 results', 'results', f"```json\n{json.dumps(batch, ensure_ascii=False, indent=2)}\n```"),
+        ('代码块被截断', 'ideas', f"{preamble}```json\n{plain[:len(plain) * 4 // 5]}"),
+        ('裸 JSON 被截断', 'ideas', compact[:len(compact) * 4 // 5]),
+    ]
+
+
+def run(parse: Callable[[str, str], Dict], key: str, content: str, repeat: int) -> Tuple[float, str]:
+    """
+    多次解析同一响应
+
+    Returns:
+        (单次平均耗时（微秒）, 结果说明)
+    """
+    try:
+        data = parse(content, key)
+        outcome = f"{len(data.get(key, []))} 项" if isinstance(data.get(key), list) else "缺少键"
+    except ValueError:
+        outcome = "失败"
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            parse(content, key)
+        except ValueError:
+            pass
+    return (time.perf_counter() - started) / repeat * 1e6, outcome
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="模型响应解析微基准")
+    parser.add_argument('--repeat', type=int, default=200,
+                        help="每条响应的解析次数 (默认: 200)")
+    parser.add_argument('--ideas', type=int, default=3,
+                        help="每条响应中的创意数量 (默认: 3)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.ideas)
+    print(f"📊 {len(corpus)} 条响应，每条解析 {args.repeat} 次\n")
+    print(f"{'响应':<20}{'大小':>9}{'正则 (µs)':>12}{'结果':>8}{'extract_json (µs)':>18}{'结果':>8}")
+    print("-" * 78)
+
+    totals = [0.0, 0.0]
+    for name, key, content in corpus:
+        legacy, legacy_outcome = run(legacy_extract, key, content, args.repeat)
+        fast, fast_outcome = run(extract_json, key, content, args.repeat)
+        totals[0] += legacy
+        totals[1] += fast
+        print(f"{name:<20}{len(content):>9,}{legacy:>12.1f}{legacy_outcome:>8}{fast:>18.1f}{fast_outcome:>8}")
+
+    print("-" * 78)
+    print(f"{'合计':<20}{'':>9}{totals[0]:>12.1f}{'':>8}{totals[1]:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
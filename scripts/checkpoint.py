@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析任务的检查点日志
+
+功能：
+- 每个热搜分析完成后立即追加写入一行 JSON（append-only，逐行 fsync）
+- 中断后可按热搜快照恢复，跳过已成功分析的热搜
+- 容忍进程被杀时写了一半的最后一行
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+
+def snapshot_id(hotspots_data: Dict, fallback: str = '') -> str:
+    """
+    计算热搜快照标识
+
+    Args:
+        hotspots_data: 热搜 JSON 数据（fetch() 的返回值）
+        fallback: 无 fetch_time 时使用的标识（通常为文件名）
+
+    Returns:
+        形如 20260117_202156 的快照标识
+    """
+    fetch_time = hotspots_data.get('fetch_time', '')
+    try:
+        return datetime.strptime(fetch_time, '%Y-%m-%d %H:%M:%S').strftime('%Y%m%d_%H%M%S')
+    except ValueError:
+        return re.sub(r'[^\w.-]', '_', os.path.splitext(os.path.basename(fallback))[0]) or 'unknown'
+
+
+class CheckpointJournal:
+    """单个快照的检查点日志，线程安全"""
+
+    def __init__(self, snapshot: str, directory: str = '.checkpoints'):
+        """
+        初始化检查点日志
+
+        Args:
+            snapshot: 快照标识（见 snapshot_id）
+            directory: 日志目录
+        """
+        self.snapshot = snapshot
+        self.path = os.path.join(directory, f"analysis_{snapshot}.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self) -> Dict[str, List[Dict]]:
+        """
+        读取已完成的分析结果
+
+        Returns:
+            热搜词 -> 创意列表（只包含成功的结果，失败占位符会在恢复时重新分析）
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程中断时可能留下不完整的最后一行
+                    continue
+                if entry.get('snapshot') != self.snapshot:
+                    continue
+                ideas = entry.get('ideas') or []
+                if ideas and all(idea.get('score', 0) > 0 for idea in ideas):
+                    completed[entry['hotword']] = ideas
+
+        return completed
+
+    def record(self, hotword: str, ideas: List[Dict]):
+        """追加一条分析结果并立即落盘"""
+        line = json.dumps({
+            'snapshot': self.snapshot,
+            'hotword': hotword,
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'ideas': ideas
+        }, ensure_ascii=False)
+
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def reset(self):
+        """清空日志（非恢复模式下重新开始）"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
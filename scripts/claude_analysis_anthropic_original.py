@@ -7,12 +7,16 @@
 - 读取微博热搜数据
 - 调用 Claude API 生成产品创意
 - 保存结构化创意数据
+- ANALYSIS_WORKERS > 1 时使用 AsyncAnthropic 并发调用 messages.create
+  （信号量限制并发数，所有请求共用同一个客户端的连接池）
 
 用法：
 python claude_analysis.py
 
 环境变量：
 - ANTHROPIC_API_KEY: Claude API 密钥（必需）
+- ANTHROPIC_BASE_URL: API 地址（可选，如指向本地桩服务进行测试）
+- ANALYSIS_WORKERS: 并发请求数（可选，默认：1 即顺序执行）
 
 作者：
 Claude Code Skill Generator
@@ -21,35 +25,42 @@ Claude Code Skill Generator
 v2.0.0 (2026-01-18) - GitHub Actions 迁移版本
 """
 
+import asyncio
 import json
 import os
-import re
 import sys
 from datetime import datetime
 from typing import Dict, List
 
 try:
-    from anthropic import Anthropic
+    from anthropic import Anthropic, AsyncAnthropic
 except ImportError:
     print("错误: 未安装 anthropic 库")
     print("请运行: pip install anthropic")
     sys.exit(1)
 
+from response_parser import extract_json
+
 
 class ClaudeHotspotAnalyzer:
     """基于 Claude 的微博热搜创意分析器"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: str = None, max_workers: int = 1):
         """
         初始化分析器
 
         Args:
             api_key: Anthropic API 密钥
+            base_url: API 地址（可选，默认读取 ANTHROPIC_BASE_URL，未设置时为官方地址）
+            max_workers: analyze_batch_async 的并发请求数
         """
         if not api_key:
             raise ValueError("未提供 ANTHROPIC_API_KEY")
 
-        self.client = Anthropic(api_key=api_key)
+        self.api_key = api_key
+        self.base_url = base_url or os.environ.get('ANTHROPIC_BASE_URL') or None
+        self.max_workers = max(1, max_workers)
+        self.client = Anthropic(api_key=api_key, base_url=self.base_url)
         self.model = "claude-3-5-sonnet-20241022"
 
     def find_latest_hotspot_data(self) -> str:
@@ -179,53 +190,73 @@ class ClaudeHotspotAnalyzer:
         Returns:
             产品创意列表
         """
-        hotword = hotspot['hotword']
-        hotness = hotspot['hotword_num_int']
-        rank = hotspot.get('rank', '?')
-
         try:
-            # 创建提示词
-            prompt = self.create_analysis_prompt(hotspot)
-
             # 调用 Claude API
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
-
-            # 提取响应内容
-            content = response.content[0].text
-
-            # 解析 JSON 响应
-            ideas = self.parse_claude_response(content)
-
-            # 为每个创意添加热搜关联信息
-            for idea in ideas:
-                idea['hotword'] = hotword
-                idea['hotness'] = hotness
-                idea['rank'] = rank
-
-            return ideas
+            response = self.client.messages.create(**self._request_params(hotspot))
+            return self._attach_hotspot(self.parse_claude_response(response.content[0].text), hotspot)
 
         except Exception as e:
             print(f"  ❌ 分析失败: {str(e)}")
-            # 返回一个失败占位符
-            return [{
-                "hotword": hotword,
-                "hotness": hotness,
-                "rank": rank,
-                "name": f"「{hotword}」分析失败",
-                "score": 0,
-                "fun_score": 0,
-                "use_score": 0,
-                "features": [f"错误: {str(e)}"],
-                "target_users": "无法生成",
-                "description": f"Claude API 调用失败: {str(e)}"
+            return self._failure_placeholder(hotspot, e)
+
+    async def analyze_hotspot_async(self, client: AsyncAnthropic, hotspot: Dict,
+                                    semaphore: asyncio.Semaphore) -> List[Dict]:
+        """
+        analyze_hotspot 的异步版本
+
+        Args:
+            client: 共用的 AsyncAnthropic 客户端
+            hotspot: 热搜数据字典
+            semaphore: 限制同时进行的请求数
+
+        Returns:
+            产品创意列表
+        """
+        try:
+            async with semaphore:
+                response = await client.messages.create(**self._request_params(hotspot))
+            return self._attach_hotspot(self.parse_claude_response(response.content[0].text), hotspot)
+
+        except Exception as e:
+            print(f"  ❌ {hotspot['hotword']} 分析失败: {str(e)}")
+            return self._failure_placeholder(hotspot, e)
+
+    def _request_params(self, hotspot: Dict) -> Dict:
+        """messages.create 的请求参数"""
+        return {
+            "model": self.model,
+            "max_tokens": 2000,
+            "messages": [{
+                "role": "user",
+                "content": self.create_analysis_prompt(hotspot)
             }]
+        }
+
+    @staticmethod
+    def _attach_hotspot(ideas: List[Dict], hotspot: Dict) -> List[Dict]:
+        """为每个创意添加热搜关联信息"""
+        for idea in ideas:
+            idea['hotword'] = hotspot['hotword']
+            idea['hotness'] = hotspot['hotword_num_int']
+            idea['rank'] = hotspot.get('rank', '?')
+        return ideas
+
+    @staticmethod
+    def _failure_placeholder(hotspot: Dict, error: Exception) -> List[Dict]:
+        """返回一个失败占位符"""
+        hotword = hotspot['hotword']
+        return [{
+            "hotword": hotword,
+            "hotness": hotspot['hotword_num_int'],
+            "rank": hotspot.get('rank', '?'),
+            "name": f"「{hotword}」分析失败",
+            "score": 0,
+            "fun_score": 0,
+            "use_score": 0,
+            "features": [f"错误: {str(error)}"],
+            "target_users": "无法生成",
+            "description": f"Claude API 调用失败: {str(error)}"
+        }]
 
     def parse_claude_response(self, content: str) -> List[Dict]:
         """
@@ -240,29 +271,7 @@ class ClaudeHotspotAnalyzer:
         Raises:
             ValueError: 无法解析 JSON
         """
-        # 尝试直接解析
-        try:
-            data = json.loads(content)
-            return data.get('ideas', [])
-        except json.JSONDecodeError:
-            pass
-
-        # 尝试提取 JSON 代码块
-        json_match = re.search(r'```json\s*(\{[\s\S]*?\})\s*```', content)
-        if not json_match:
-            json_match = re.search(r'```\s*(\{[\s\S]*?\})\s*```', content)
-        if not json_match:
-            json_match = re.search(r'\{[\s\S]*"ideas"[\s\S]*\}', content)
-
-        if json_match:
-            try:
-                json_str = json_match.group(1) if json_match.lastindex else json_match.group(0)
-                data = json.loads(json_str)
-                return data.get('ideas', [])
-            except json.JSONDecodeError as e:
-                raise ValueError(f"无法解析 Claude 返回的 JSON: {str(e)}")
-
-        raise ValueError("Claude 响应中未找到有效的 JSON 数据")
+        return extract_json(content, 'ideas')['ideas']
 
     def analyze_batch(self, hotspots: List[Dict]) -> List[Dict]:
         """
@@ -285,18 +294,64 @@ class ClaudeHotspotAnalyzer:
             print(f"\n[{idx}/{total}] 分析: {hotword}")
 
             ideas = self.analyze_hotspot(hotspot)
+            self._print_result(ideas)
+            all_ideas.extend(ideas)
 
-            if ideas and ideas[0]['score'] > 0:
-                print(f"  ✅ 成功生成 {len(ideas)} 个创意")
-                for idea in ideas:
-                    print(f"     - {idea['name']} ({idea['score']}分)")
-            else:
-                print(f"  ⚠️  分析失败")
+        return all_ideas
 
-            all_ideas.extend(ideas)
+    async def analyze_batch_async(self, hotspots: List[Dict], max_workers: int = None) -> List[Dict]:
+        """
+        并发批量分析热搜
+
+        所有请求共用一个 AsyncAnthropic 客户端（及其 HTTP 连接池），
+        同时进行的请求数不超过 max_workers。结果按输入（排名）顺序返回，
+        与 analyze_batch 的输出一致。
+
+        Args:
+            hotspots: 热搜数据列表
+            max_workers: 并发请求数（可选，默认使用初始化时的配置）
 
+        Returns:
+            所有创意列表
+        """
+        workers = max(1, int(max_workers or self.max_workers))
+        total = len(hotspots)
+        results: List[List[Dict]] = [[] for _ in hotspots]
+        done = 0
+
+        print(f"\n🤖 开始分析 {total} 个热搜话题 (并发 {workers})")
+        print("=" * 60)
+
+        semaphore = asyncio.Semaphore(workers)
+        client = AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+
+        async def run(idx: int, hotspot: Dict):
+            nonlocal done
+            results[idx] = await self.analyze_hotspot_async(client, hotspot, semaphore)
+            done += 1
+            print(f"\n[{done}/{total}] 完成: #{idx + 1} {hotspot['hotword']}")
+            self._print_result(results[idx])
+
+        try:
+            await asyncio.gather(*(run(idx, hotspot) for idx, hotspot in enumerate(hotspots)))
+        finally:
+            await client.close()
+
+        all_ideas = []
+        for ideas in results:
+            all_ideas.extend(ideas)
         return all_ideas
 
+    @staticmethod
+    def _print_result(ideas: List[Dict]):
+        """打印单个热搜的分析结果"""
+        if ideas and ideas[0]['score'] > 0:
+            print(f"  ✅ 成功生成 {len(ideas)} 个创意")
+            for idea in ideas:
+                print(f"     - {idea['name']} ({idea['score']}分)")
+        else:
+            print(f"  ⚠️  分析失败")
+
     def save_ideas(self, ideas: List[Dict], output_file: str = None):
         """
         保存创意数据到文件
@@ -359,7 +414,7 @@ def main():
 
     try:
         # 创建分析器
-        analyzer = ClaudeHotspotAnalyzer(api_key)
+        analyzer = ClaudeHotspotAnalyzer(api_key, max_workers=int(os.environ.get('ANALYSIS_WORKERS', '1')))
 
         # 查找最新数据
         print("\n📂 查找热搜数据文件...")
@@ -371,8 +426,11 @@ def main():
         hotspots = analyzer.load_hotspots(hotspot_file, limit=10)
         print(f"✅ 加载 {len(hotspots)} 个热搜话题")
 
-        # 批量分析
-        ideas = analyzer.analyze_batch(hotspots)
+        # 批量分析（ANALYSIS_WORKERS > 1 时并发请求）
+        if analyzer.max_workers > 1:
+            ideas = asyncio.run(analyzer.analyze_batch_async(hotspots))
+        else:
+            ideas = analyzer.analyze_batch(hotspots)
 
         # 保存结果
         print("\n" + "=" * 60)
@@ -10,12 +10,30 @@
 - 保存结构化创意数据
 
 用法：
-python claude_analysis_proxy.py
+python claude_analysis_proxy.py [--resume] [--incremental]
+
+参数：
+- --resume: 从检查点恢复，跳过同一热搜快照中已成功分析的话题
+- --incremental: 增量分析，复用历史库中已分析过且热度未大幅变化的话题的创意
 
 环境变量：
 - API_ENDPOINT: API 端点 URL（必需）
 - API_KEY: API 密钥（必需）
 - API_MODEL: 模型名称（可选，默认：claude-sonnet-4-5）
+- ANALYSIS_WORKERS: 并发分析的线程数（可选，默认：1 即顺序执行）
+- ANALYSIS_BATCH_SIZE: 每个请求打包的热搜数量（可选，默认：1，即逐条分析）
+- LLM_POOL_SIZE / LLM_IDLE_TIMEOUT / LLM_HTTP2: 连接池配置（见 http_client.py）
+- LLM_CACHE: 设为 0 跳过响应缓存（可选，其余缓存配置见 response_cache.py）
+- LLM_RPM / LLM_TPM: 每分钟请求数 / token 数限制（可选，默认不限制，见 rate_limit.py）
+- LLM_THROTTLE_RETRIES: 被限流（HTTP 429/503）后的最大重试次数（可选，默认：5）
+- LLM_RETRY_* / LLM_HEDGE / LLM_HEDGE_DELAY: 分类重试与对冲请求配置（见 retry_policy.py）
+- LLM_STREAM: 设为 1 使用流式（SSE）响应，创意逐个产出（可选，默认：关闭）
+- LLM_STREAM_MAX_IDEAS: 流式模式下收到多少个创意后提前结束生成（可选，默认：3，0 表示不限制）
+- ANALYSIS_INCREMENTAL: 设为 1 等同于 --incremental（历史库路径见 snapshot_store.py 的 WEIBO_HISTORY_DB）
+- ANALYSIS_REANALYZE_RATIO: 增量模式下热度涨到上次分析时的多少倍以上时重新分析（可选，默认：2.0）
+- ANALYSIS_DEDUP_THRESHOLD: 近似重复热搜的相似度阈值，同一簇只分析一次（可选，默认：0 即关闭；
+  与代表热搜的相似度不低于 0.8 时才复制其创意，见 dedup.py）
+- ANALYSIS_REUSE_NEAR_DUPLICATES: 设为 1 时增量模式下新热搜可复用历史库中近似重复热搜的创意（可选，默认：关闭）
 
 示例：
 export API_ENDPOINT="https://nwcvxulatwfv.sg-members-1.clawcloudrun.com/antigravity/v1/chat/completions"
@@ -29,20 +47,49 @@ Claude Code Skill Generator
 v2.1.0 (2026-01-18) - 支持自定义 API 中转服务
 """
 
+import argparse
 import json
 import os
-import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, List
-import urllib.request
-import urllib.error
+from typing import Callable, Dict, List, Optional
+
+from checkpoint import CheckpointJournal, snapshot_id
+from dedup import DedupIndex, char_shingles, cluster_hotwords, jaccard
+from http_client import HTTPStatusError, PooledHTTPClient
+from llm_stream import IncrementalIdeasParser, iter_completion_deltas
+from rate_limit import AdaptiveConcurrency, RateLimiter, ThrottledError, parse_retry_after
+from records import Hotspot
+from response_cache import ResponseCache
+from response_parser import extract_json
+from retry_policy import LatencyTracker, RetryPolicy, hedged_call
+from snapshot_store import SnapshotStore
+
+# 提示词模板版本：缓存键只包含热搜词与该版本号（不含热度），修改提示词模板时递增
+PROMPT_VERSION = 1
+
+# 预估单次请求的输出 token 数（用于 token 限流，拿到 usage 后会修正）
+EXPECTED_COMPLETION_TOKENS = 1500
+
+# 复制另一热搜的创意前，两者字符特征的 Jaccard 相似度下限（近乎同一标题）
+NEAR_DUPLICATE_SIMILARITY = 0.8
 
 
 class HotspotAnalyzer:
     """基于自定义 API 中转服务的微博热搜创意分析器"""
 
-    def __init__(self, endpoint: str, api_key: str, model: str = "claude-sonnet-4-5"):
+    def __init__(self, endpoint: str, api_key: str, model: str = "claude-sonnet-4-5",
+                 max_workers: int = 1, http_client: PooledHTTPClient = None,
+                 cache: ResponseCache = None, use_cache: bool = True,
+                 batch_size: int = 1, rate_limiter: RateLimiter = None,
+                 max_throttle_retries: int = 5, retry_policy: RetryPolicy = None,
+                 hedge: bool = False, hedge_delay: float = 20.0,
+                 stream: bool = False, stream_max_ideas: int = 3,
+                 idea_callback: Callable[[Dict], None] = None,
+                 dedup_threshold: float = 0.0, reuse_near_duplicates: bool = False):
         """
         初始化分析器
 
@@ -50,6 +97,21 @@ class HotspotAnalyzer:
             endpoint: API 端点 URL
             api_key: API 密钥
             model: 模型名称
+            max_workers: 批量分析时的并发线程数（1 表示顺序执行）
+            http_client: 共享的 HTTP 客户端（可选，默认按环境变量创建连接池）
+            cache: 响应缓存（可选，默认按环境变量创建）
+            use_cache: 是否使用响应缓存（False 时绕过缓存）
+            batch_size: 每个请求打包分析的热搜数量（1 表示逐条分析）
+            rate_limiter: 请求数 / token 数限流器（可选，默认按环境变量创建）
+            max_throttle_retries: 被限流后的最大重试次数
+            retry_policy: 按错误类别的重试策略（可选，默认按环境变量创建）
+            hedge: 是否启用对冲请求
+            hedge_delay: 耗时样本不足时的对冲延迟（秒），样本足够后使用 p95
+            stream: 是否使用流式响应（流式模式下不使用对冲请求）
+            stream_max_ideas: 流式模式下收到多少个创意后中止生成（0 表示不限制）
+            idea_callback: 流式模式下每产出一个创意时的回调（可选，默认打印创意名称）
+            dedup_threshold: 近似重复热搜的相似度阈值（0 表示不去重）
+            reuse_near_duplicates: 增量模式下没有同名历史记录时，是否复用近似重复热搜的历史创意
         """
         if not endpoint:
             raise ValueError("未提供 API_ENDPOINT")
@@ -59,6 +121,32 @@ class HotspotAnalyzer:
         self.endpoint = endpoint
         self.api_key = api_key
         self.model = model
+        self.max_workers = max(1, int(max_workers))
+        self.http_client = http_client or PooledHTTPClient.from_env()
+        self.cache = (cache or ResponseCache.from_env()) if use_cache else None
+        self.batch_size = max(1, int(batch_size))
+        self.rate_limiter = rate_limiter or RateLimiter.from_env()
+        self.concurrency = AdaptiveConcurrency(self.max_workers)
+        self.max_throttle_retries = max_throttle_retries
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.latency = LatencyTracker()
+        self.stream = stream
+        self.stream_max_ideas = stream_max_ideas
+        self.idea_callback = idea_callback
+        self.first_idea_latencies: List[float] = []
+        self.aborted_streams = 0
+        self.snapshot_id = None
+        self.checkpoint: Optional[CheckpointJournal] = None
+        self.resume = False
+        self.history: Optional[SnapshotStore] = None
+        self.reanalyze_ratio = 2.0
+        self.reused = 0
+        self.history_index: Optional[DedupIndex] = None
+        self.dedup_threshold = dedup_threshold
+        self.reuse_near_duplicates = reuse_near_duplicates
+        self.deduplicated = 0
 
     def find_latest_hotspot_data(self) -> str:
         """
@@ -80,7 +168,7 @@ class HotspotAnalyzer:
         # 返回最新修改的文件
         return max(json_files, key=os.path.getctime)
 
-    def load_hotspots(self, filepath: str, limit: int = 10) -> List[Dict]:
+    def load_hotspots(self, filepath: str, limit: int = 10) -> List[Hotspot]:
         """
         加载热搜数据
 
@@ -89,30 +177,118 @@ class HotspotAnalyzer:
             limit: 分析的热搜数量限制
 
         Returns:
-            热搜数据列表
+            热搜记录列表（Hotspot）
         """
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
-        hotspots = data.get('data', [])[:limit]
+        return self.select_hotspots(data, limit, source=filepath)
+
+    def select_hotspots(self, data: Dict, limit: int = 10, source: str = '') -> List[Hotspot]:
+        """
+        从内存中的热搜数据选取待分析的热搜
+
+        Args:
+            data: 热搜数据（WeiboHotspotFetcher.fetch() 的返回值）
+            limit: 分析的热搜数量限制
+            source: 数据来源（文件名），用于无抓取时间时确定快照
+
+        Returns:
+            热搜记录列表（Hotspot）
+        """
+        hotspots = [Hotspot.coerce(item, idx) for idx, item in enumerate(data.get('data', [])[:limit], 1)]
 
         if not hotspots:
             raise ValueError("热搜数据为空")
 
+        self.snapshot_id = snapshot_id(data, source)
         return hotspots
 
-    def create_analysis_prompt(self, hotspot: Dict) -> str:
+    def enable_checkpoint(self, resume: bool = False, directory: str = '.checkpoints'):
+        """
+        启用检查点日志（需先调用 load_hotspots 确定快照）
+
+        每个热搜分析完成后立即写入日志；resume 为 True 时跳过日志中
+        同一快照已成功分析的热搜，否则清空旧日志重新开始。
+
+        Args:
+            resume: 是否从已有日志恢复
+            directory: 日志目录
+        """
+        if not self.snapshot_id:
+            raise ValueError("未加载热搜数据，无法确定检查点快照")
+
+        self.checkpoint = CheckpointJournal(self.snapshot_id, directory)
+        self.resume = resume
+        if not resume:
+            self.checkpoint.reset()
+
+    def enable_incremental(self, reanalyze_ratio: float = 2.0, db_path: str = None):
+        """
+        启用增量分析
+
+        分析前按热搜词（精确匹配，其次归一化形式）查找历史库中最近一次
+        的分析结果：热度未超过上次的 reanalyze_ratio 倍时直接复用创意，
+        否则重新分析。成功的分析结果会写回历史库。
+
+        Args:
+            reanalyze_ratio: 触发重新分析的热度倍数
+            db_path: 历史库路径（可选，默认见 snapshot_store.default_db_path）
+        """
+        self.history = SnapshotStore(db_path)
+        self.reanalyze_ratio = reanalyze_ratio
+
+    def _reusable_ideas(self, hotspot: Hotspot) -> Optional[List[Dict]]:
+        """增量模式下可复用的历史创意，需要重新分析时返回 None"""
+        record = self.history.latest_analysis(hotspot.hotword)
+        if record is None and self.reuse_near_duplicates:
+            record = self._near_duplicate_analysis(hotspot.hotword)
+        if record is None or not record['ideas']:
+            return None
+        # 与匹配到的那条记录分析时的热度比较
+        if hotspot.hotness > record['hotness'] * self.reanalyze_ratio:
+            print(f"📈 {hotspot.hotword}: 热度 {record['hotness']:,} ({record['hotword']}) → "
+                  f"{hotspot.hotness:,}，重新分析")
+            return None
+        if record['hotword'] != hotspot.hotword:
+            # 来源话题通常不在本次报告中，作为普通创意展示，只记录来源
+            return [dict(idea, reused_from=record['hotword']) for idea in record['ideas']]
+        return [dict(idea) for idea in record['ideas']]
+
+    def _near_duplicate_analysis(self, hotword: str) -> Optional[Dict]:
+        """在历史库已分析的热搜中查找近似重复（相似度不低于 NEAR_DUPLICATE_SIMILARITY）的一条分析记录"""
+        if self.history_index is None:
+            self.history_index = DedupIndex(max(self.dedup_threshold, NEAR_DUPLICATE_SIMILARITY))
+            for analyzed in self.history.analyzed_hotwords():
+                self.history_index.add(analyzed)
+
+        for match, similarity in self.history_index.query(hotword):
+            record = self.history.latest_analysis(match)
+            if record and record['hotword'] == match:
+                print(f"🔗 {hotword} ≈ {match} (相似度 {similarity:.2f})，复用其历史创意")
+                return record
+        return None
+
+    def _record_history(self, hotspot: Hotspot, ideas: List[Dict]):
+        """把成功的分析结果写回历史库"""
+        if not ideas or not all(idea['score'] > 0 for idea in ideas):
+            return
+        self.history.record_analysis(hotspot.hotword, hotspot.hotness, ideas, self.model)
+        if self.history_index is not None:
+            self.history_index.add(hotspot.hotword)
+
+    def create_analysis_prompt(self, hotspot: Hotspot) -> str:
         """
         创建分析提示词
 
         Args:
-            hotspot: 热搜数据字典
+            hotspot: 热搜记录
 
         Returns:
             完整的提示词字符串
         """
-        hotword = hotspot['hotword']
-        hotness = hotspot['hotword_num_int']
+        hotword = hotspot.hotword
+        hotness = hotspot.hotness
 
         prompt = f"""你是一位资深产品经理，擅长发现热点背后的产品机会。
 
@@ -177,18 +353,145 @@ class HotspotAnalyzer:
 
         return prompt
 
-    def call_api(self, prompt: str) -> str:
+    def create_batch_prompt(self, hotspots: List[Hotspot]) -> str:
+        """
+        创建多热搜合并分析的提示词
+
+        评分标准与输出结构只出现一次，模型需为每个话题分别返回 ideas 数组。
+
+        Args:
+            hotspots: 热搜记录列表
+
+        Returns:
+            完整的提示词字符串
+        """
+        topics = "\n".join(
+            f"{idx}. {hotspot.hotword} （热度 {hotspot.hotness:,}）"
+            for idx, hotspot in enumerate(hotspots, 1)
+        )
+
+        prompt = f"""你是一位资深产品经理，擅长发现热点背后的产品机会。
+
+请基于以下 {len(hotspots)} 个微博热搜话题，**分别**为每个话题生成 3 个产品创意。
+
+## 热搜信息
+{topics}
+
+## 评分标准
+1. **有趣度 (80%权重)**: 创意新颖性、话题热度、用户参与度、传播潜力
+2. **有用度 (20%权重)**: 实用价值、需求强度、市场痛点解决程度
+
+## 输出要求
+为每个创意提供以下信息：
+1. **产品名称**: 简洁易记，体现热点元素 (2-8个字)
+2. **综合评分**: 0-100分 (有趣度×0.8 + 有用度×0.2)
+3. **有趣度评分**: 0-100分
+4. **有用度评分**: 0-100分
+5. **核心功能**: 3-5个关键功能点
+6. **目标用户**: 用户画像描述 (年龄、兴趣、需求场景)
+7. **产品描述**: 100字以内的简洁描述
+
+## 输出格式
+请**只返回 JSON 格式**，不要包含其他解释文字。results 中每一项对应一个话题，
+hotword 必须与上面列出的话题原文完全一致：
+
+```json
+{{
+  "results": [
+    {{
+      "hotword": "话题原文",
+      "ideas": [
+        {{
+          "name": "产品名称",
+          "score": 85,
+          "fun_score": 82,
+          "use_score": 88,
+          "features": ["功能1", "功能2", "功能3"],
+          "target_users": "25-35岁职场人士，需要...",
+          "description": "基于热搜话题的..."
+        }}
+      ]
+    }}
+  ]
+}}
+```
+
+请开始分析。"""
+
+        return prompt
+
+    def call_api(self, prompt: str, on_idea: Callable[[Dict], None] = None) -> str:
         """
         调用自定义 API 中转服务
 
+        请求先经过令牌桶限流与自适应并发控制；遇到 HTTP 429/503 时按
+        Retry-After（缺省时指数退避）暂停、并发减半后重试。启用对冲请求时，
+        若请求耗时超过近期 p95 仍未返回，会再并发发出一个相同请求并取先返回者。
+
         Args:
             prompt: 用户提示词
+            on_idea: 流式模式下每解析出一个创意时的回调（可选，提供时才增量解析 ideas）
 
         Returns:
             API 响应内容
 
         Raises:
-            Exception: API 调用失败
+            NetworkError: 网络错误
+            HTTPStatusError: 非 2xx 响应
+            ThrottledError: 限流重试耗尽（不再由 _complete 重试）
+            ValueError: 响应格式错误
+        """
+        if self.stream or not self.hedge:
+            return self._call_throttled(prompt, on_idea=on_idea)
+
+        # 对冲请求不占用并发名额，否则在并发已满时它只能排队，失去意义
+        delay = self.latency.percentile(0.95) if len(self.latency) >= 5 else self.hedge_delay
+        return hedged_call(lambda: self._call_throttled(prompt), delay,
+                           backup=lambda: self._call_throttled(prompt, hedged=True))
+
+    def _call_throttled(self, prompt: str, hedged: bool = False,
+                        on_idea: Callable[[Dict], None] = None) -> str:
+        """在限流与自适应并发控制下发送请求，被限流时等待后重试"""
+        estimated_tokens = len(prompt) + EXPECTED_COMPLETION_TOKENS
+
+        for attempt in range(self.max_throttle_retries + 1):
+            self.rate_limiter.acquire(estimated_tokens)
+
+            try:
+                with (nullcontext() if hedged else self.concurrency):
+                    started = time.monotonic()
+                    if self.stream:
+                        content, used_tokens = self._stream_completion(prompt, on_idea)
+                    else:
+                        content, used_tokens = self._post_completion(prompt)
+            except ThrottledError as e:
+                self.concurrency.on_throttle()
+                if attempt >= self.max_throttle_retries:
+                    # 已按限流策略重试过，不能再被当作 5xx 交给 _complete 重试
+                    raise ThrottledError(e.status, f"被限流 {attempt + 1} 次，放弃: {str(e)}", e.retry_after)
+                wait = e.retry_after if e.retry_after is not None else min(2 ** attempt, 60)
+                print(f"  ⏳ 被限流 (HTTP {e.status})，{wait:.1f} 秒后重试，当前并发上限 {int(self.concurrency.limit)}")
+                self.rate_limiter.pause(wait)
+                continue
+
+            self.latency.record(time.monotonic() - started)
+            self.concurrency.on_success()
+            if used_tokens:
+                self.rate_limiter.record_usage(estimated_tokens, used_tokens)
+            return content
+
+    def _post_completion(self, prompt: str):
+        """
+        发送单次补全请求
+
+        Returns:
+            (响应内容, 实际消耗的 token 数，未知时为 None)
+
+        Raises:
+            ThrottledError: 服务端限流
+            NetworkError: 网络错误
+            HTTPStatusError: 其他非 2xx 响应
+            ValueError: 响应格式错误
         """
         payload = {
             "model": self.model,
@@ -204,79 +507,242 @@ class HotspotAnalyzer:
         }
 
         try:
-            req = urllib.request.Request(
-                self.endpoint,
-                data=json.dumps(payload).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-
-            with urllib.request.urlopen(req, timeout=120) as response:
-                response_data = response.read().decode('utf-8')
-                result = json.loads(response_data)
-
-            # 解析 OpenAI 格式的响应
-            if 'choices' in result and len(result['choices']) > 0:
-                return result['choices'][0]['message']['content']
-            else:
-                raise ValueError(f"API 响应格式错误: {result}")
+            result = self.http_client.post_json(self.endpoint, payload, headers, timeout=120)
+        except HTTPStatusError as e:
+            if e.status in (429, 503):
+                raise ThrottledError(e.status, e.body, parse_retry_after(e.headers.get('retry-after')))
+            raise
 
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            raise Exception(f"API 调用失败 (HTTP {e.code}): {error_body}")
-        except urllib.error.URLError as e:
-            raise Exception(f"网络错误: {str(e)}")
-        except Exception as e:
-            raise Exception(f"API 调用失败: {str(e)}")
+        # 解析 OpenAI 格式的响应
+        if 'choices' in result and len(result['choices']) > 0:
+            usage = result.get('usage') or {}
+            return result['choices'][0]['message']['content'], usage.get('total_tokens')
+
+        raise ValueError(f"API 响应格式错误: {result}")
+
+    def _stream_completion(self, prompt: str, on_idea: Callable[[Dict], None] = None):
+        """
+        以 SSE 流式方式发送补全请求
+
+        提供 on_idea 时增量解析 ideas 数组，每个创意对象闭合后立即回调，
+        并在收到 stream_max_ideas 个创意后关闭连接、中止生成。
 
-    def analyze_hotspot(self, hotspot: Dict) -> List[Dict]:
+        Returns:
+            (响应内容, None)。增量解析出创意时返回规整后的 {"ideas": [...]} JSON
+
+        Raises:
+            ThrottledError: 服务端限流
+            NetworkError: 网络错误
+            HTTPStatusError: 其他非 2xx 响应
+        """
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "stream": True
+        }
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        started = time.monotonic()
+        parser = IncrementalIdeasParser() if on_idea else None
+        chunks = []
+        lines = self.http_client.stream_lines(self.endpoint, payload, headers, timeout=120)
+
+        try:
+            for delta in iter_completion_deltas(lines):
+                chunks.append(delta)
+                if parser is None:
+                    continue
+
+                for idea in parser.feed(delta):
+                    if len(parser.ideas) == 1:
+                        self.first_idea_latencies.append(time.monotonic() - started)
+                    on_idea(idea)
+
+                if parser.done:
+                    break
+                if self.stream_max_ideas and len(parser.ideas) >= self.stream_max_ideas:
+                    self.aborted_streams += 1
+                    break
+        except HTTPStatusError as e:
+            if e.status in (429, 503):
+                raise ThrottledError(e.status, e.body, parse_retry_after(e.headers.get('retry-after')))
+            raise
+        finally:
+            lines.close()
+
+        if parser is not None and parser.ideas:
+            return json.dumps({"ideas": parser.ideas}, ensure_ascii=False), None
+
+        return ''.join(chunks), None
+
+    def analyze_hotspot(self, hotspot: Hotspot) -> List[Dict]:
         """
         分析单个热搜并生成创意
 
         Args:
-            hotspot: 热搜数据字典
+            hotspot: 热搜记录
 
         Returns:
             产品创意列表
         """
-        hotword = hotspot['hotword']
-        hotness = hotspot['hotword_num_int']
-        rank = hotspot.get('rank', '?')
+        hotword = hotspot.hotword
 
         try:
             # 创建提示词
             prompt = self.create_analysis_prompt(hotspot)
 
-            # 调用 API
-            print(f"  调用 API: {self.endpoint[:50]}...")
-            content = self.call_api(prompt)
+            # 优先读取缓存，未命中时调用 API 并解析响应
+            on_idea = (lambda idea: self._emit_idea(idea, hotspot)) if self.stream else None
+            cache_key = self.cache_key([hotspot])
+            content, ideas, cached = self._complete(prompt, hotword, self.parse_response, on_idea, cache_key)
 
-            # 解析响应
-            ideas = self.parse_response(content)
+            # 仅缓存可成功解析的响应
+            if self.cache and not cached and ideas:
+                self.cache.put(cache_key, self.model, self.endpoint, content)
 
-            # 为每个创意添加热搜关联信息
-            for idea in ideas:
-                idea['hotword'] = hotword
-                idea['hotness'] = hotness
-                idea['rank'] = rank
-
-            return ideas
+            return self._attach_hotspot(ideas, hotspot)
 
         except Exception as e:
             print(f"  ❌ 分析失败: {str(e)}")
-            # 返回一个失败占位符
-            return [{
-                "hotword": hotword,
-                "hotness": hotness,
-                "rank": rank,
-                "name": f"「{hotword}」分析失败",
-                "score": 0,
-                "fun_score": 0,
-                "use_score": 0,
-                "features": [f"错误: {str(e)}"],
-                "target_users": "无法生成",
-                "description": f"API 调用失败: {str(e)}"
-            }]
+            return self._failure_placeholder(hotspot, e)
+
+    def analyze_group(self, hotspots: List[Hotspot]) -> List[List[Dict]]:
+        """
+        在一次请求中分析多个热搜
+
+        模型遗漏的话题（或整批请求失败时的全部话题）会自动回退为逐条分析。
+
+        Args:
+            hotspots: 热搜记录列表
+
+        Returns:
+            与输入顺序一致的创意列表的列表
+        """
+        if len(hotspots) == 1:
+            return [self.analyze_hotspot(hotspots[0])]
+
+        label = "、".join(hotspot.hotword for hotspot in hotspots)
+        ideas_by_hotword: Dict[str, List[Dict]] = {}
+
+        try:
+            prompt = self.create_batch_prompt(hotspots)
+            cache_key = self.cache_key(hotspots)
+            content, ideas_by_hotword, cached = self._complete(
+                prompt, label, lambda text: self.parse_batch_response(text, hotspots), cache_key=cache_key)
+
+            if self.cache and not cached and len(ideas_by_hotword) == len(hotspots):
+                self.cache.put(cache_key, self.model, self.endpoint, content)
+
+        except Exception as e:
+            print(f"  ⚠️  合并分析失败，逐条重试: {str(e)}")
+
+        results = []
+        for hotspot in hotspots:
+            ideas = ideas_by_hotword.get(hotspot.hotword)
+            if ideas:
+                results.append(self._attach_hotspot(ideas, hotspot))
+            else:
+                print(f"  ↩️  逐条补充分析: {hotspot.hotword}")
+                results.append(self.analyze_hotspot(hotspot))
+
+        return results
+
+    @staticmethod
+    def cache_key(hotspots: List[Hotspot]) -> str:
+        """
+        响应缓存的键文本
+
+        提示词中包含热度，而热度每次抓取都会变化；键只取热搜词与提示词模板版本，
+        同一话题在多次运行之间（如 10:00 与 22:00）都能命中缓存。模型与端点由缓存另行计入。
+
+        Args:
+            hotspots: 本次请求包含的热搜（单条或合并分析）
+
+        Returns:
+            键文本
+        """
+        kind = 'batch' if len(hotspots) > 1 else 'single'
+        return '\n'.join([f"prompt-v{PROMPT_VERSION}", kind] + [hotspot.hotword for hotspot in hotspots])
+
+    def _complete(self, prompt: str, label: str, parse,
+                  on_idea: Callable[[Dict], None] = None, cache_key: str = None):
+        """
+        获取并解析提示词对应的模型响应（先查缓存）
+
+        网络错误、5xx 与 JSON 解析失败按重试策略分别计数，
+        以带抖动的指数退避重试。
+
+        Args:
+            prompt: 提示词
+            label: 日志中显示的话题
+            parse: 响应解析函数
+            on_idea: 流式模式下的创意回调（可选）
+            cache_key: 缓存键文本（可选，默认使用提示词）
+
+        Returns:
+            (响应内容, 解析结果, 是否来自缓存)
+
+        Raises:
+            Exception: 重试耗尽或不可重试的错误
+        """
+        content = self.cache.get(cache_key or prompt, self.model, self.endpoint) if self.cache else None
+        if content is not None:
+            print(f"  ♻️  命中缓存: {label}")
+            return content, parse(content), True
+
+        retries: Dict[str, int] = {}
+        attempt = 0
+        while True:
+            try:
+                print(f"  调用 API: {self.endpoint[:50]}...")
+                content = self.call_api(prompt, on_idea=on_idea)
+                return content, parse(content), False
+            except Exception as e:
+                kind = self.retry_policy.classify(e)
+                if not self.retry_policy.should_retry(kind, retries.get(kind, 0)):
+                    raise
+                retries[kind] = retries.get(kind, 0) + 1
+                wait = self.retry_policy.backoff(attempt)
+                attempt += 1
+                print(f"  🔁 {label} 第 {attempt} 次重试 ({kind}，{wait:.1f} 秒后): {str(e)[:80]}")
+                time.sleep(wait)
+
+    def _emit_idea(self, idea: Dict, hotspot: Hotspot):
+        """流式模式下转发刚解析出的创意"""
+        tagged = dict(idea, **hotspot.idea_fields())
+        if self.idea_callback:
+            self.idea_callback(tagged)
+        else:
+            print(f"  💡 {tagged['hotword']}: {tagged.get('name', '未知创意')} ({tagged.get('score', 0)}分)")
+
+    def _attach_hotspot(self, ideas: List[Dict], hotspot: Hotspot) -> List[Dict]:
+        """为每个创意添加热搜关联信息"""
+        fields = hotspot.idea_fields()
+        for idea in ideas:
+            idea.update(fields)
+        return ideas
+
+    def _failure_placeholder(self, hotspot: Hotspot, error: Exception) -> List[Dict]:
+        """返回一个失败占位符"""
+        hotword = hotspot.hotword
+        return [{
+            "hotword": hotword,
+            "hotness": hotspot.hotness,
+            "rank": hotspot.rank,
+            "name": f"「{hotword}」分析失败",
+            "score": 0,
+            "fun_score": 0,
+            "use_score": 0,
+            "features": [f"错误: {str(error)}"],
+            "target_users": "无法生成",
+            "description": f"API 调用失败: {str(error)}"
+        }]
 
     def parse_response(self, content: str) -> List[Dict]:
         """
@@ -289,76 +755,193 @@ class HotspotAnalyzer:
             创意列表
 
         Raises:
-            ValueError: 无法解析 JSON
+            ValueError: 无法解析 JSON，或其中没有 ideas 数组（交给 PARSE 类重试）
         """
-        # 尝试直接解析
-        try:
-            data = json.loads(content)
-            return data.get('ideas', [])
-        except json.JSONDecodeError:
-            pass
-
-        # 尝试提取 JSON 代码块
-        json_match = re.search(r'```json\s*(\{[\s\S]*?\})\s*```', content)
-        if not json_match:
-            json_match = re.search(r'```\s*(\{[\s\S]*?\})\s*```', content)
-        if not json_match:
-            json_match = re.search(r'\{[\s\S]*"ideas"[\s\S]*\}', content)
-
-        if json_match:
-            try:
-                json_str = json_match.group(1) if json_match.lastindex else json_match.group(0)
-                data = json.loads(json_str)
-                return data.get('ideas', [])
-            except json.JSONDecodeError as e:
-                raise ValueError(f"无法解析 API 返回的 JSON: {str(e)}")
+        return extract_json(content, 'ideas')['ideas']
 
-        raise ValueError("API 响应中未找到有效的 JSON 数据")
+    def parse_batch_response(self, content: str, hotspots: List[Hotspot]) -> Dict[str, List[Dict]]:
+        """
+        解析合并分析的响应，按热搜拆分
 
-    def analyze_batch(self, hotspots: List[Dict]) -> List[Dict]:
+        Args:
+            content: API 返回的文本内容
+            hotspots: 本次请求包含的热搜记录列表
+
+        Returns:
+            热搜词 -> 创意列表（模型遗漏的话题不会出现在结果中）
+
+        Raises:
+            ValueError: 无法解析 JSON
+        """
+        results = extract_json(content, 'results')['results']
+        expected = {hotspot.hotword.strip(): hotspot.hotword for hotspot in hotspots}
+
+        ideas_by_hotword = {}
+        for item in results:
+            if not isinstance(item, dict):
+                continue
+            hotword = expected.get(str(item.get('hotword', '')).strip())
+            ideas = item.get('ideas')
+            if hotword and isinstance(ideas, list) and ideas:
+                ideas_by_hotword[hotword] = ideas
+
+        return ideas_by_hotword
+
+    def analyze_batch(self, hotspots: List[Hotspot], max_workers: int = None,
+                      batch_size: int = None) -> List[Dict]:
         """
         批量分析热搜
 
+        分析几乎全部时间都在等待网络响应，因此 max_workers > 1 时使用线程池
+        并发调用 API，整批耗时约等于最慢的一次调用。batch_size > 1 时每 N 个
+        热搜合并为一次请求。结果始终按输入（排名）顺序返回。
+
         Args:
-            hotspots: 热搜数据列表
+            hotspots: 热搜记录列表
+            max_workers: 并发线程数（可选，默认使用初始化时的配置）
+            batch_size: 每个请求打包的热搜数量（可选，默认使用初始化时的配置）
 
         Returns:
             所有创意列表
         """
-        all_ideas = []
+        workers = max(1, int(max_workers or self.max_workers))
+        size = max(1, int(batch_size or self.batch_size))
         total = len(hotspots)
-
-        print(f"\n🤖 开始分析 {total} 个热搜话题")
+        results: List[List[Dict]] = [[] for _ in hotspots]
+
+        # 从检查点恢复已完成的热搜，增量模式下复用历史创意
+        restored = self.checkpoint.load() if self.checkpoint and self.resume else {}
+        pending = []
+        reused = 0
+        for idx, hotspot in enumerate(hotspots):
+            if hotspot.hotword in restored:
+                results[idx] = self._attach_hotspot(restored[hotspot.hotword], hotspot)
+                continue
+            ideas = self._reusable_ideas(hotspot) if self.history else None
+            if ideas:
+                results[idx] = self._attach_hotspot(ideas, hotspot)
+                reused += 1
+            else:
+                pending.append(idx)
+        self.reused += reused
+        # 去重前计数：合并到代表的热搜在代表完成时一并计入进度
+        restored_count = total - len(pending) - reused
+        done = total - len(pending)
+
+        # 近似重复的热搜只分析排名最高的代表，结果分发给簇内与代表足够接近的其他热搜
+        duplicates: Dict[int, List[int]] = {}
+        if self.dedup_threshold > 0 and len(pending) > 1:
+            duplicates = self._near_duplicates(hotspots, pending)
+            merged = {dup for dups in duplicates.values() for dup in dups}
+            pending = [idx for idx in pending if idx not in merged]
+            self.deduplicated += len(merged)
+        groups = [pending[start:start + size] for start in range(0, len(pending), size)]
+
+        print(f"\n🤖 开始分析 {total} 个热搜话题"
+              + (f" (并发 {workers})" if workers > 1 else "")
+              + (f" (每请求 {size} 个)" if size > 1 else ""))
+        if restored:
+            print(f"♻️  从检查点恢复 {restored_count} 个，待分析 {len(pending)} 个")
+        if reused:
+            print(f"♻️  复用历史创意 {reused} 个，待分析 {len(pending)} 个")
+        for rep, dups in duplicates.items():
+            print(f"🔗 合并近似热搜: {hotspots[rep].hotword} ← "
+                  + " / ".join(hotspots[idx].hotword for idx in dups))
         print("=" * 60)
 
-        for idx, hotspot in enumerate(hotspots, 1):
-            hotword = hotspot['hotword']
-            print(f"\n[{idx}/{total}] 分析: {hotword}")
+        def run(group: List[int]) -> List[List[Dict]]:
+            return self.analyze_group([hotspots[idx] for idx in group])
+
+        def store(idx: int, ideas: List[Dict]):
+            if self.checkpoint:
+                self.checkpoint.record(hotspots[idx].hotword, ideas)
+            if self.history:
+                self._record_history(hotspots[idx], ideas)
+
+        def collect(group: List[int], group_results: List[List[Dict]], done: int):
+            for idx, ideas in zip(group, group_results):
+                results[idx] = ideas
+                store(idx, ideas)
+                for dup in duplicates.get(idx, []):
+                    results[dup] = self._attach_hotspot(
+                        [dict(idea, duplicate_of=hotspots[idx].hotword) for idea in ideas], hotspots[dup])
+                    store(dup, results[dup])
+                done += 1 + len(duplicates.get(idx, []))
+                print(f"\n[{done}/{total}] 完成: #{idx + 1} {hotspots[idx].hotword}")
+                self._print_result(ideas)
+            return done
+
+        if workers == 1 or len(groups) <= 1:
+            for group in groups:
+                if size == 1:
+                    print(f"\n[{group[0] + 1}/{total}] 分析: {hotspots[group[0]].hotword}")
+                done = collect(group, run(group), done)
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(groups))) as executor:
+                futures = {executor.submit(run, group): group for group in groups}
+                for future in as_completed(futures):
+                    done = collect(futures[future], future.result(), done)
+
+        # 从检查点或历史库取回的 duplicate_of 只在代表话题也在本批次时保留，
+        # 否则报告中只剩指向缺失话题的链接
+        batch = {hotspot.hotword for hotspot in hotspots}
+        all_ideas = []
+        for ideas in results:
+            for idea in ideas:
+                if idea.get('duplicate_of') and idea['duplicate_of'] not in batch:
+                    idea['reused_from'] = idea.pop('duplicate_of')
+            all_ideas.extend(ideas)
+
+        return all_ideas
 
-            ideas = self.analyze_hotspot(hotspot)
+    def _near_duplicates(self, hotspots: List[Hotspot], pending: List[int]) -> Dict[int, List[int]]:
+        """
+        在待分析的热搜中找出可以直接复用代表结果的近似重复热搜
 
-            if ideas and ideas[0]['score'] > 0:
-                print(f"  ✅ 成功生成 {len(ideas)} 个创意")
-                for idea in ideas:
-                    print(f"     - {idea['name']} ({idea['score']}分)")
-            else:
-                print(f"  ⚠️  分析失败")
+        聚类会经由中间热搜把不同事件串到同一簇，因此只合并与代表本身的
+        相似度不低于 max(阈值, NEAR_DUPLICATE_SIMILARITY) 的成员，其余成员照常分析。
 
-            all_ideas.extend(ideas)
+        Returns:
+            {代表下标: [复用其结果的热搜下标, ...]}
+        """
+        threshold = max(self.dedup_threshold, NEAR_DUPLICATE_SIMILARITY)
+        duplicates: Dict[int, List[int]] = {}
+        for members in cluster_hotwords([hotspots[idx].hotword for idx in pending], self.dedup_threshold):
+            if len(members) < 2:
+                continue
+            representative = pending[members[0]]
+            shingles = char_shingles(hotspots[representative].hotword)
+            dups = [pending[m] for m in members[1:]
+                    if jaccard(shingles, char_shingles(hotspots[pending[m]].hotword)) >= threshold]
+            if dups:
+                duplicates[representative] = dups
+        return duplicates
+
+    def _print_result(self, ideas: List[Dict]):
+        """打印单个热搜的分析结果"""
+        if ideas and ideas[0]['score'] > 0:
+            print(f"  ✅ 成功生成 {len(ideas)} 个创意")
+            for idea in ideas:
+                print(f"     - {idea['name']} ({idea['score']}分)")
+        else:
+            print(f"  ⚠️  分析失败")
 
-        return all_ideas
+    def close(self):
+        """释放连接池中的连接"""
+        self.http_client.close()
+        if self.history:
+            self.history.close()
 
-    def save_ideas(self, ideas: List[Dict], output_file: str = None):
+    def build_output(self, ideas: List[Dict]) -> Dict:
         """
-        保存创意数据到文件
+        组装创意数据（含统计信息），即 save_ideas 写入文件的内容
 
         Args:
             ideas: 创意列表
-            output_file: 输出文件路径（可选）
-        """
-        if output_file is None:
-            output_file = f"weibo_ideas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
+        Returns:
+            创意数据字典
+        """
         # 统计信息
         total = len(ideas)
         successful = len([i for i in ideas if i['score'] > 0])
@@ -374,17 +957,61 @@ class HotspotAnalyzer:
                 'successful': successful,
                 'excellent': excellent,
                 'good': good,
-                'avg_score': sum(i['score'] for i in ideas if i['score'] > 0) / max(successful, 1)
+                'avg_score': sum(i['score'] for i in ideas if i['score'] > 0) / max(successful, 1),
+                'cache': self.cache.stats() if self.cache else {'hits': 0, 'misses': 0, 'bypassed': True}
             },
             'ideas': ideas
         }
 
+        if self.stream:
+            latencies = self.first_idea_latencies
+            output_data['statistics']['streaming'] = {
+                'requests_with_ideas': len(latencies),
+                'avg_time_to_first_idea': sum(latencies) / len(latencies) if latencies else None,
+                'max_time_to_first_idea': max(latencies) if latencies else None,
+                'aborted': self.aborted_streams
+            }
+
+        if self.dedup_threshold > 0:
+            output_data['statistics']['dedup'] = {
+                'merged': self.deduplicated,
+                'threshold': self.dedup_threshold
+            }
+
+        if self.history:
+            output_data['statistics']['incremental'] = {
+                'reused': self.reused,
+                'reanalyze_ratio': self.reanalyze_ratio
+            }
+
+        return output_data
+
+    def save_ideas(self, ideas: List[Dict], output_file: str = None) -> Dict:
+        """
+        保存创意数据到文件
+
+        Args:
+            ideas: 创意列表
+            output_file: 输出文件路径（可选）
+
+        Returns:
+            写入文件的创意数据
+        """
+        if output_file is None:
+            output_file = f"weibo_ideas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        output_data = self.build_output(ideas)
+
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(output_data, f, ensure_ascii=False, indent=2)
 
         print(f"\n💾 创意数据已保存: {output_file}")
+        self.print_statistics(output_data)
+
+        return output_data
 
-        # 打印统计信息
+    def print_statistics(self, output_data: Dict):
+        """打印统计信息"""
         stats = output_data['statistics']
         print(f"\n📊 统计信息:")
         print(f"   总创意数: {stats['total']}")
@@ -392,10 +1019,53 @@ class HotspotAnalyzer:
         print(f"   优秀(>80): {stats['excellent']}")
         print(f"   良好(60-80): {stats['good']}")
         print(f"   平均分: {stats['avg_score']:.1f}")
+        if self.cache:
+            print(f"   缓存命中: {stats['cache']['hits']} / 未命中: {stats['cache']['misses']}")
+        if self.dedup_threshold > 0 and stats['dedup']['merged']:
+            print(f"   合并近似热搜: {stats['dedup']['merged']} 个")
+        if self.history:
+            print(f"   复用历史创意: {stats['incremental']['reused']} 个热搜")
+        if self.stream and stats['streaming']['avg_time_to_first_idea'] is not None:
+            print(f"   首个创意平均耗时: {stats['streaming']['avg_time_to_first_idea']:.2f} 秒")
+
+
+def create_analyzer_from_env() -> HotspotAnalyzer:
+    """
+    根据环境变量创建分析器（环境变量说明见模块文档）
+
+    Raises:
+        ValueError: 未设置 API_ENDPOINT 或 API_KEY
+    """
+    return HotspotAnalyzer(
+        os.environ.get('API_ENDPOINT'),
+        os.environ.get('API_KEY'),
+        os.environ.get('API_MODEL') or 'claude-sonnet-4-5',
+        max_workers=int(os.environ.get('ANALYSIS_WORKERS', '1')),
+        batch_size=int(os.environ.get('ANALYSIS_BATCH_SIZE', '1')),
+        max_throttle_retries=int(os.environ.get('LLM_THROTTLE_RETRIES', '5')),
+        hedge=os.environ.get('LLM_HEDGE', '').lower() in ('1', 'true', 'yes'),
+        hedge_delay=float(os.environ.get('LLM_HEDGE_DELAY', '20')),
+        stream=os.environ.get('LLM_STREAM', '').lower() in ('1', 'true', 'yes'),
+        stream_max_ideas=int(os.environ.get('LLM_STREAM_MAX_IDEAS', '3')),
+        dedup_threshold=float(os.environ.get('ANALYSIS_DEDUP_THRESHOLD', '0')),
+        reuse_near_duplicates=os.environ.get('ANALYSIS_REUSE_NEAR_DUPLICATES', '').lower() in ('1', 'true', 'yes')
+    )
+
+
+def incremental_from_env() -> bool:
+    """是否通过环境变量启用了增量分析"""
+    return os.environ.get('ANALYSIS_INCREMENTAL', '').lower() in ('1', 'true', 'yes')
 
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="微博热搜创意分析器")
+    parser.add_argument('--resume', action='store_true',
+                        help="从检查点恢复，跳过同一快照中已成功分析的热搜")
+    parser.add_argument('--incremental', action='store_true',
+                        help="增量分析，复用历史库中已分析且热度未大幅变化的热搜")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("微博热搜创意分析器 (自定义 API 版本)")
     print("=" * 60)
@@ -420,13 +1090,12 @@ def main():
         print("  API_KEY = your_api_key")
         sys.exit(1)
 
-    model = os.environ.get('API_MODEL', 'claude-sonnet-4-5')
-
     try:
         # 创建分析器
-        print(f"\n📡 API 端点: {endpoint}")
-        print(f"🤖 模型: {model}")
-        analyzer = HotspotAnalyzer(endpoint, api_key, model)
+        analyzer = create_analyzer_from_env()
+        print(f"\n📡 API 端点: {analyzer.endpoint}")
+        print(f"🤖 模型: {analyzer.model}")
+        print(f"🧵 并发数: {analyzer.max_workers}")
 
         # 查找最新数据
         print("\n📂 查找热搜数据文件...")
@@ -438,12 +1107,22 @@ def main():
         hotspots = analyzer.load_hotspots(hotspot_file, limit=10)
         print(f"✅ 加载 {len(hotspots)} 个热搜话题")
 
+        # 启用检查点，每完成一个热搜即落盘
+        analyzer.enable_checkpoint(resume=args.resume)
+        print(f"📝 检查点: {analyzer.checkpoint.path}" + (" (恢复模式)" if args.resume else ""))
+
+        # 增量模式：复用历史库中的分析结果
+        if args.incremental or incremental_from_env():
+            analyzer.enable_incremental(float(os.environ.get('ANALYSIS_REANALYZE_RATIO', '2.0')))
+            print(f"🗄️  增量分析: {analyzer.history.path} (热度 ×{analyzer.reanalyze_ratio:g} 时重新分析)")
+
         # 批量分析
         ideas = analyzer.analyze_batch(hotspots)
 
         # 保存结果
         print("\n" + "=" * 60)
         analyzer.save_ideas(ideas)
+        analyzer.close()
 
         print("\n✅ 分析完成!")
         sys.exit(0)
@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热搜快照列式归档
+
+功能：
+- 只追加的列式存储：每条热搜记录拆成定长列，文件可直接 mmap 后切片读取，无需解析
+- 热搜词与标签以字典编码（按首次出现顺序分配 id），不再在每个快照中重复存储
+- 与 SnapshotStore 相同的读取接口（load_points / hotword_history / latest_snapshot / snapshot_at），
+  趋势分析与历史查询可任选其一作为数据源
+- 与 weibo_hotspots_*.json 互相转换
+- 读取只看 ends.u64 已提交的部分，从不修改文件；追加在锁文件下进行，
+  未提交完成的追加（列文件长于 ends.u64 记录的总数）由下一次追加截断
+
+目录结构（原生字节序，x86 / ARM 均为小端）：
+- hotwords.txt   热搜词字典，每行一个，行号即 id
+- tags.txt       标签字典，每行一个，行号即 id（第 0 行为空标签）
+- hotword_nums.txt 热度原文字典（如 "剧集 1123860"），第 0 行为空，表示原文即热度数值
+- hotword.u32    每条记录的热搜词 id
+- hotness.i64    热度
+- rank.u8        排名
+- tag.u8         标签 id
+- hotword_num.u32 热度原文 id
+- time.u32       抓取时间（Unix 秒，按 UTC 解释抓取时间字符串，与时区无关）
+- snapshots.u32  每个快照的抓取时间
+- ends.u64       每个快照结束处的累计记录数（最后写入，作为提交标记）
+- .lock          追加时持有的锁文件（fcntl.flock，不支持的平台上不加锁）
+
+weibo_url 由热搜词还原，不单独存储。
+
+用法：
+python scripts/columnar_archive.py ingest [weibo_hotspots_*.json ...]
+python scripts/columnar_archive.py export [抓取时间|latest] [输出文件]
+python scripts/columnar_archive.py history <热搜词>
+python scripts/columnar_archive.py stats
+
+环境变量：
+- WEIBO_ARCHIVE_DIR: 归档目录（可选，默认：weibo_archive）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import calendar
+import glob
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from records import Hotspot, to_json
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+from text_utils import normalize_hotword
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 列名 → array 类型码
+COLUMNS = {
+    'hotword': ('hotword.u32', 'I'),
+    'hotness': ('hotness.i64', 'q'),
+    'rank': ('rank.u8', 'B'),
+    'tag': ('tag.u8', 'B'),
+    'time': ('time.u32', 'I'),
+    'hotword_num': ('hotword_num.u32', 'I'),
+}
+# 后加入的列，旧归档中缺少的部分按 id 0 补齐
+PADDED_COLUMNS = ('hotword_num',)
+SNAPSHOTS = ('snapshots.u32', 'I')
+ENDS = ('ends.u64', 'Q')
+
+
+def default_archive_dir() -> str:
+    """归档默认目录"""
+    return os.environ.get('WEIBO_ARCHIVE_DIR') or 'weibo_archive'
+
+
+def to_timestamp(fetch_time: str) -> int:
+    """抓取时间字符串 → Unix 秒（按 UTC 解释）"""
+    return calendar.timegm(datetime.strptime(fetch_time, TIME_FORMAT).timetuple())
+
+
+def from_timestamp(timestamp: int) -> str:
+    """Unix 秒 → 抓取时间字符串"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(TIME_FORMAT)
+
+
+class ColumnarArchive:
+    """热搜快照列式归档"""
+
+    def __init__(self, directory: str = None):
+        """
+        打开归档目录
+
+        只读取 ends.u64 已提交的部分，不创建、不修改任何文件（可与正在追加的进程同时打开）；
+        目录不存在时视为空归档，首次 append 时创建。
+
+        Args:
+            directory: 归档目录（可选，默认见 default_archive_dir）
+        """
+        self.directory = directory or default_archive_dir()
+        self._maps: Dict[str, memoryview] = {}
+        self._mmaps: List[mmap.mmap] = []
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """释放全部列映射"""
+        self._release()
+
+    def _release(self):
+        """
+        释放缓存的列视图并关闭 mmap
+
+        调用方仍持有 column() / load_points() 返回的切片时，对应映射无法关闭，
+        会在这些切片释放后随之回收。
+        """
+        for view in self._maps.values():
+            view.release()
+        self._maps.clear()
+        for mapping in self._mmaps:
+            try:
+                mapping.close()
+            except BufferError:
+                pass
+        self._mmaps = []
+
+    def __len__(self) -> int:
+        return len(self._column(*ENDS))
+
+    @property
+    def rows(self) -> int:
+        """已提交的记录总数"""
+        ends = self._column(*ENDS)
+        return ends[-1] if len(ends) else 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        """
+        映射 ends.u64 并读取字典
+
+        先映射提交标记再读字典：字典总是先于 ends.u64 写入，
+        因此已提交记录引用的 id 都在读到的字典中。
+        """
+        self._release()
+        self._column(*ENDS)
+        self.hotwords: List[str] = self._read_lines('hotwords.txt')
+        self.tags: List[str] = self._read_lines('tags.txt') or ['']
+        self.hotword_nums: List[str] = self._read_lines('hotword_nums.txt') or ['']
+        self._hotword_ids = {word: i for i, word in enumerate(self.hotwords)}
+        self._tag_ids = {tag: i for i, tag in enumerate(self.tags)}
+        self._hotword_num_ids = {num: i for i, num in enumerate(self.hotword_nums)}
+
+    def _read_lines(self, name: str) -> List[str]:
+        """读取字典文件的完整行（忽略追加中断留下的半行）"""
+        path = self._path(name)
+        if not os.path.exists(path):
+            return []
+        # newline='\n'：不把热搜词中的 '\r' 当作换行，否则其后的 id 全部错位
+        with open(path, 'r', encoding='utf-8', newline='\n') as f:
+            content = f.read()
+        return content.split('\n')[:-1]
+
+    def _truncate(self, name: str, size: int):
+        path = self._path(name)
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+
+    def _recover(self):
+        """
+        截断未提交的记录（以 ends.u64 中完整写入的条目为准）
+
+        只在持有锁的追加中调用；读取方以 ends.u64 为界，不会看到被截断的部分。
+        """
+        self._release()
+        path = self._path(ENDS[0])
+        itemsize = array(ENDS[1]).itemsize
+        if os.path.exists(path):
+            self._truncate(ENDS[0], os.path.getsize(path) // itemsize * itemsize)
+        self._load()
+        count, rows = len(self), self.rows
+        self._truncate(SNAPSHOTS[0], count * array(SNAPSHOTS[1]).itemsize)
+        for column, (name, typecode) in COLUMNS.items():
+            size = rows * array(typecode).itemsize
+            self._truncate(name, size)
+            path = self._path(name)
+            current = os.path.getsize(path) if os.path.exists(path) else 0
+            if column in PADDED_COLUMNS and current < size:
+                with open(path, 'ab') as f:
+                    f.write(bytes(size - current))
+        for name in ('hotwords.txt', 'tags.txt', 'hotword_nums.txt'):
+            # 上次追加中断留下的半行，截断到最后一个完整行
+            path = self._path(name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    content = f.read()
+                self._truncate(name, content.rfind(b'\n') + 1)
+        self._load()
+
+    @contextmanager
+    def _lock(self):
+        """追加期间独占归档目录"""
+        with open(self._path('.lock'), 'a') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _column(self, name: str, typecode: str) -> memoryview:
+        """
+        以 mmap 只读映射列文件，返回按类型解释的 memoryview（零拷贝）
+
+        只包含已提交的部分：ends.u64 取完整写入的条目，snapshots.u32 取前 len(self) 项，
+        其余列取前 self.rows 项（正在追加的进程写入的记录不可见）。
+        """
+        view = self._maps.get(name)
+        if view is None:
+            if name == ENDS[0]:
+                limit = None
+            elif name == SNAPSHOTS[0]:
+                limit = len(self)
+            else:
+                limit = self.rows
+            view = self._map(name, typecode)[:limit]
+            self._maps[name] = view
+        return view
+
+    def _map(self, name: str, typecode: str) -> memoryview:
+        """映射列文件中完整写入的条目"""
+        path = self._path(name)
+        itemsize = array(typecode).itemsize
+        size = os.path.getsize(path) // itemsize * itemsize if os.path.exists(path) else 0
+        if size == 0:
+            return memoryview(array(typecode))
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        self._mmaps.append(mapping)
+        return memoryview(mapping).cast(typecode)
+
+    def column(self, name: str) -> memoryview:
+        """
+        读取一列（hotword / hotness / rank / tag / time / hotword_num）
+
+        返回的 memoryview 可切片、可用 numpy.frombuffer 零拷贝转换为数组；
+        它是独立的视图，close() 之后仍可读取（映射在其释放后回收）。
+        """
+        return self._column(*COLUMNS[name])[:]
+
+    def fetch_times(self) -> List[str]:
+        """全部快照的抓取时间（升序）"""
+        return [from_timestamp(t) for t in self._column(*SNAPSHOTS)]
+
+    def _intern(self, values: List[str], ids: Dict[str, int], new: List[str], value: str) -> int:
+        value = value.replace('\n', ' ')
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+            new.append(value)
+        return index
+
+    def append(self, result: Dict) -> bool:
+        """
+        追加一个快照
+
+        Args:
+            result: WeiboHotspotFetcher.fetch() 的返回值
+
+        Returns:
+            是否写入（抓取失败、没有数据或不晚于最后一个快照时返回 False）
+        """
+        if not result.get('success', True) or not result.get('data'):
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock():
+            self._recover()
+            return self._append(result)
+
+    def _append(self, result: Dict) -> bool:
+        """在持有锁且已截断未提交记录的状态下追加一个快照"""
+        timestamp = to_timestamp(result['fetch_time'])
+        snapshots = self._column(*SNAPSHOTS)
+        if len(snapshots) and timestamp <= snapshots[-1]:
+            return False
+
+        new_words, new_tags, new_nums = [], [], []
+        columns = {name: array(typecode) for name, (_, typecode) in COLUMNS.items()}
+        for idx, item in enumerate(result['data'], 1):
+            hotspot = Hotspot.coerce(item, idx)
+            columns['hotword'].append(self._intern(self.hotwords, self._hotword_ids, new_words, hotspot.hotword))
+            columns['hotness'].append(hotspot.hotness)
+            columns['rank'].append(min(hotspot.rank, 255))
+            tag = hotspot.hot_tag
+            # 标签 id 以 uint8 存储，超出 256 种时记为空标签
+            if tag in self._tag_ids or len(self.tags) < 256:
+                columns['tag'].append(self._intern(self.tags, self._tag_ids, new_tags, tag))
+            else:
+                columns['tag'].append(0)
+            columns['time'].append(timestamp)
+            # 原文与热度数值一致时记为 id 0，只有 "剧集 1123860" 这类原文进入字典
+            num = hotspot.hotword_num
+            columns['hotword_num'].append(
+                0 if num == str(hotspot.hotness) or not num
+                else self._intern(self.hotword_nums, self._hotword_num_ids, new_nums, num))
+
+        # 先写字典与列，最后写快照索引（提交标记）
+        self._append_lines('hotwords.txt', new_words)
+        if not os.path.exists(self._path('tags.txt')):
+            new_tags = self.tags
+        self._append_lines('tags.txt', new_tags)
+        if not os.path.exists(self._path('hotword_nums.txt')):
+            new_nums = self.hotword_nums
+        self._append_lines('hotword_nums.txt', new_nums)
+        for name, (filename, _) in COLUMNS.items():
+            with open(self._path(filename), 'ab') as f:
+                columns[name].tofile(f)
+        with open(self._path(SNAPSHOTS[0]), 'ab') as f:
+            array(SNAPSHOTS[1], [timestamp]).tofile(f)
+        with open(self._path(ENDS[0]), 'ab') as f:
+            array(ENDS[1], [self.rows + len(result['data'])]).tofile(f)
+
+        self._load()
+        return True
+
+    def _append_lines(self, name: str, lines: List[str]):
+        if lines:
+            with open(self._path(name), 'a', encoding='utf-8', newline='\n') as f:
+                f.write(''.join(line + '\n' for line in lines))
+
+    def ingest_files(self, paths: Iterable[str]) -> int:
+        """
+        批量导入热搜 JSON 文件（按抓取时间排序后追加）
+
+        Args:
+            paths: 文件路径列表
+
+        Returns:
+            新导入的快照数量
+        """
+        results = []
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    results.append(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"  ⚠️  跳过 {path}: {str(e)}")
+        results = [r for r in results if r.get('fetch_time')]
+        results.sort(key=lambda r: r['fetch_time'])
+        return sum(1 for result in results if self.append(result))
+
+    def _snapshot_range(self, index: int) -> range:
+        ends = self._column(*ENDS)
+        return range(ends[index - 1] if index else 0, ends[index])
+
+    def snapshot(self, index: int) -> Dict:
+        """
+        还原第 index 个快照为 fetch() 返回值的结构
+
+        Args:
+            index: 快照下标（支持负数）
+
+        Returns:
+            热搜数据字典
+        """
+        index = range(len(self))[index]
+        rows = self._snapshot_range(index)
+        hotword, hotness = self.column('hotword')[rows.start:rows.stop], self.column('hotness')[rows.start:rows.stop]
+        rank, tag = self.column('rank')[rows.start:rows.stop], self.column('tag')[rows.start:rows.stop]
+        num = self.column('hotword_num')[rows.start:rows.stop]
+
+        # 旧归档没有 hotword_num 列（在下一次追加时补齐），此时原文按热度数值还原
+        data = [Hotspot(rank=rank[i], hotword=self.hotwords[hotword[i]], hotness=hotness[i],
+                        hotword_num=self.hotword_nums[num[i]] if i < len(num) and num[i] else str(hotness[i]),
+                        hot_tag=self.tags[tag[i]]).to_dict()
+                for i in range(len(rows))]
+
+        return {
+            'success': True,
+            'code': 200,
+            'message': 'success',
+            'data': data,
+            'fetch_time': from_timestamp(self._column(*SNAPSHOTS)[index]),
+            'total': len(data)
+        }
+
+    def latest_snapshot(self) -> Optional[Dict]:
+        """最近一次快照"""
+        return self.snapshot(-1) if len(self) else None
+
+    def snapshot_at(self, fetch_time: str) -> Optional[Dict]:
+        """不晚于指定时间的最近一次快照"""
+        index = bisect_right(self._column(*SNAPSHOTS), to_timestamp(fetch_time)) - 1
+        return self.snapshot(index) if index >= 0 else None
+
+    def _first_snapshot(self, since: str = None, last: int = None) -> int:
+        """since / last 对应的起始快照下标"""
+        start = bisect_left(self._column(*SNAPSHOTS), to_timestamp(since)) if since else 0
+        if last:
+            start = max(start, len(self) - last)
+        return start
+
+    def load_points(self, since: str = None, last: int = None) -> Dict:
+        """
+        按列加载热度数据点（与 SnapshotStore.load_points 返回结构相同）
+
+        hotword_id / rank / hotness 为 mmap 上的切片，不复制数据。
+
+        Args:
+            since: 起始时间（可选，'YYYY-MM-DD HH:MM:SS'）
+            last: 只加载最近的 last 个快照（可选）
+
+        Returns:
+            {'fetch_times', 'snapshot', 'hotword_id', 'rank', 'hotness', 'hotwords'}
+        """
+        start = self._first_snapshot(since, last)
+        ends = self._column(*ENDS)
+        first_row = ends[start - 1] if start else 0
+
+        # 每个数据点所属快照的下标（相对 start）
+        snapshot = array('q')
+        previous = first_row
+        for offset, end in enumerate(ends[start:]):
+            snapshot.extend(array('q', [offset]) * (end - previous))
+            previous = end
+
+        return {
+            'fetch_times': [from_timestamp(t) for t in self._column(*SNAPSHOTS)[start:]],
+            'snapshot': snapshot,
+            'hotword_id': self.column('hotword')[first_row:],
+            'rank': self.column('rank')[first_row:],
+            'hotness': self.column('hotness')[first_row:],
+            'hotwords': dict(enumerate(self.hotwords)),
+        }
+
+    def hotword_history(self, hotword: str, since: str = None,
+                        normalized: bool = False) -> List[Dict]:
+        """
+        查询热搜词的历史排名与热度（与 SnapshotStore.hotword_history 返回结构相同）
+
+        Args:
+            hotword: 热搜词
+            since: 起始时间（可选）
+            normalized: 是否按归一化形式匹配（合并不同写法）
+
+        Returns:
+            [{fetch_time, rank, hotness, hotword}, ...]，按时间升序
+        """
+        if normalized:
+            key = normalize_hotword(hotword)
+            ids = {i for i, word in enumerate(self.hotwords) if normalize_hotword(word) == key}
+        else:
+            ids = {self._hotword_ids[hotword]} if hotword in self._hotword_ids else set()
+        if not ids:
+            return []
+
+        start = self._first_snapshot(since)
+        ends = self._column(*ENDS)
+        first_row = ends[start - 1] if start else 0
+        column = self.column('hotword')
+        rank, hotness, times = self.column('rank'), self.column('hotness'), self.column('time')
+
+        return [{
+            'fetch_time': from_timestamp(times[i]),
+            'rank': rank[i],
+            'hotness': hotness[i],
+            'hotword': self.hotwords[column[i]],
+        } for i in range(first_row, len(column)) if column[i] in ids]
+
+    def stats(self) -> Dict[str, int]:
+        """归档统计"""
+        names = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        size = sum(os.path.getsize(self._path(name)) for name in names)
+        return {
+            'snapshots': len(self),
+            'hotwords': len(self.hotwords),
+            'items': self.rows,
+            'bytes': size
+        }
+
+
+def main():
+    """命令行入口"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('ingest', 'export', 'history', 'stats'):
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    with ColumnarArchive() as archive:
+        if command == 'ingest':
+            paths = sys.argv[2:] or sorted(glob.glob('weibo_hotspots_*.json'))
+            print(f"📥 导入 {len(paths)} 个文件到 {archive.directory}")
+            added = archive.ingest_files(paths)
+            print(f"✅ 新增 {added} 个快照")
+        elif command == 'export':
+            target = sys.argv[2] if len(sys.argv) > 2 else 'latest'
+            result = archive.latest_snapshot() if target == 'latest' else archive.snapshot_at(target)
+            if result is None:
+                print("❌ 没有符合条件的快照")
+                sys.exit(1)
+            filename = sys.argv[3] if len(sys.argv) > 3 else \
+                f"weibo_hotspots_{result['fetch_time'].replace('-', '').replace(':', '').replace(' ', '_')}.json"
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2, default=to_json)
+            print(f"💾 快照 {result['fetch_time']} 已导出: {filename}")
+        elif command == 'history':
+            if len(sys.argv) < 3:
+                print("❌ 请提供热搜词")
+                sys.exit(1)
+            for row in archive.hotword_history(sys.argv[2], normalized=True):
+                print(f"{row['fetch_time']}  #{row['rank']:<3} {row['hotness']:>10,}  {row['hotword']}")
+
+        stats = archive.stats()
+        print(f"\n📊 快照 {stats['snapshots']} 个 | 热搜词 {stats['hotwords']} 个 | 记录 {stats['items']} 条"
+              f" | 占用 {stats['bytes'] / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热搜词近似去重（MinHash / LSH）
+
+功能：
+- 以归一化热搜词的字符 2-gram / 3-gram 作为特征，无需中文分词依赖
+- MinHash 签名 + LSH 分桶找出候选对，再以特征集合的 Jaccard 相似度确认
+- 并查集合并为簇，整体耗时与热搜数量呈线性关系
+- 增量索引 DedupIndex 可持续加入热搜词（如历史库中全部已分析的热搜）
+
+用法：
+python scripts/dedup.py [weibo_hotspots_*.json]
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import glob
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from text_utils import normalize_hotword
+
+# Mersenne 素数，用于 (a * x + b) mod p 形式的置换哈希
+_PRIME = (1 << 61) - 1
+
+
+def char_shingles(text: str, sizes: Tuple[int, ...] = (2, 3)) -> Set[str]:
+    """
+    提取字符 n-gram 特征
+
+    Args:
+        text: 热搜词
+        sizes: n-gram 长度
+
+    Returns:
+        特征集合（文本过短时为文本本身）
+    """
+    normalized = normalize_hotword(text)
+    shingles = {normalized[i:i + n] for n in sizes for i in range(len(normalized) - n + 1)}
+    return shingles or {normalized}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """两个特征集合的 Jaccard 相似度"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash 签名生成器"""
+
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        """
+        初始化签名生成器
+
+        Args:
+            num_perm: 置换（签名）个数
+            seed: 置换参数的种子，相同种子生成的签名可以互相比较
+        """
+        self.num_perm = num_perm
+        self.params = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode('utf-8'), digest_size=16).digest()
+            a, b = struct.unpack('<QQ', digest)
+            self.params.append((a % (_PRIME - 1) + 1, b % _PRIME))
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        """
+        计算 MinHash 签名
+
+        特征先用 crc32 映射为稳定的整数（不受 PYTHONHASHSEED 影响），
+        跨进程、跨运行生成的签名一致。
+        """
+        values = [zlib.crc32(s.encode('utf-8')) for s in shingles]
+        return tuple(min([(a * v + b) % _PRIME for v in values]) for a, b in self.params)
+
+
+class DedupIndex:
+    """可增量加入的近似重复索引"""
+
+    def __init__(self, threshold: float = 0.5, num_perm: int = 32, bands: int = 16):
+        """
+        初始化索引
+
+        默认 16 段 × 2 行：相似度 0.5 的热搜对成为候选的概率约 99%，
+        候选再按特征集合的精确 Jaccard 相似度确认，不会引入误判。
+
+        Args:
+            threshold: 判定为同一事件的 Jaccard 相似度下限
+            num_perm: MinHash 签名长度
+            bands: LSH 分段数（每段 num_perm // bands 行），段越多召回越高
+        """
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = max(1, num_perm // bands)
+        self.shingles: Dict[str, Set[str]] = {}
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.shingles)
+
+    def __contains__(self, hotword: str) -> bool:
+        return hotword in self.shingles
+
+    def _bands(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def query(self, hotword: str) -> List[Tuple[str, float]]:
+        """
+        查找索引中与热搜词近似重复的条目
+
+        Returns:
+            [(热搜词, 相似度), ...]，按相似度降序
+        """
+        shingles = char_shingles(hotword)
+        signature = self.hasher.signature(shingles)
+        return self._verify(hotword, shingles, self._candidates(signature))
+
+    def add(self, hotword: str) -> List[Tuple[str, float]]:
+        """
+        加入热搜词
+
+        Returns:
+            加入前索引中与其近似重复的条目（同 query）
+        """
+        if hotword in self.shingles:
+            return []
+
+        shingles = char_shingles(hotword)
+        signature = self.hasher.signature(shingles)
+        matches = self._verify(hotword, shingles, self._candidates(signature))
+
+        self.shingles[hotword] = shingles
+        for key in self._bands(signature):
+            self.buckets.setdefault(key, []).append(hotword)
+        return matches
+
+    def _candidates(self, signature: Tuple[int, ...]) -> Set[str]:
+        candidates = set()
+        for key in self._bands(signature):
+            candidates.update(self.buckets.get(key, ()))
+        return candidates
+
+    def _verify(self, hotword: str, shingles: Set[str], candidates: Set[str]) -> List[Tuple[str, float]]:
+        matches = []
+        for candidate in candidates:
+            if candidate == hotword:
+                continue
+            similarity = jaccard(shingles, self.shingles[candidate])
+            if similarity >= self.threshold:
+                matches.append((candidate, similarity))
+        matches.sort(key=lambda m: -m[1])
+        return matches
+
+
+def cluster_hotwords(hotwords: List[str], threshold: float = 0.5,
+                     index: Optional[DedupIndex] = None) -> List[List[int]]:
+    """
+    把近似重复的热搜词聚成簇
+
+    Args:
+        hotwords: 热搜词列表（按排名顺序）
+        threshold: 判定为同一事件的 Jaccard 相似度下限
+        index: 复用的索引（可选，默认新建）
+
+    Returns:
+        簇列表，每个簇为下标列表；簇内及簇间均保持输入顺序，
+        每个簇的第一个下标即代表（排名最高的热搜）
+    """
+    index = index or DedupIndex(threshold)
+    parent = list(range(len(hotwords)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    position: Dict[str, int] = {}
+    for i, hotword in enumerate(hotwords):
+        if hotword in position:
+            parent[find(i)] = find(position[hotword])
+            continue
+        position[hotword] = i
+        for match, _ in index.add(hotword):
+            if match in position:
+                a, b = find(i), find(position[match])
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(hotwords)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def main():
+    """命令行入口：打印热搜文件中的近似重复簇"""
+    path = sys.argv[1] if len(sys.argv) > 1 else max(glob.glob('weibo_hotspots_*.json'),
+                                                     key=os.path.getctime, default=None)
+    if not path:
+        print("❌ 未找到热搜数据文件")
+        sys.exit(1)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        hotwords = [item['hotword'] for item in json.load(f).get('data', [])]
+
+    clusters = cluster_hotwords(hotwords)
+    print(f"📂 {path}: {len(hotwords)} 个热搜，{len(clusters)} 个簇")
+    for members in clusters:
+        if len(members) > 1:
+            print("  🔗 " + " / ".join(f"#{i + 1} {hotwords[i]}" for i in members))
+
+
+if __name__ == "__main__":
+    main()
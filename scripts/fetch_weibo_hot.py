@@ -11,9 +11,18 @@
 
 用法：
 python fetch_weibo_hot_v2.py
+python fetch_weibo_hot_v2.py --watch [--interval 60] [--max-polls N]
+
+参数：
+- --watch: 常驻轮询模式，榜单（排名 / 热度）变化时才保存快照
+- --interval: 轮询间隔秒数（默认：WEIBO_POLL_INTERVAL 或 60）
+- --max-polls: 最多轮询次数（默认不限制，Ctrl+C 结束）
 
 环境变量：
 - TIANAPI_KEY: 天聚数行 API 密钥（可选，默认使用内置密钥）
+- WEIBO_POLL_INTERVAL: 轮询间隔秒数（可选，默认：60）
+- WEIBO_HISTORY_DB: 设置后同时把快照写入该 SQLite 历史库（可选，见 snapshot_store.py）
+- WEIBO_ARCHIVE_DIR: 设置后同时把快照追加到该列式归档（可选，见 columnar_archive.py）
 
 输出：
 - JSON格式的热搜榜单数据
@@ -26,15 +35,21 @@ Claude Code Skill Generator
 v2.0.0 (2026-01-18) - GitHub Actions 迁移版本
 """
 
+import argparse
+import hashlib
 import json
 import os
 import re
 import sys
+import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List
 import urllib.request
 import urllib.error
 
+from records import Hotspot, to_json
+from text_utils import normalize_hotword
+
 
 class WeiboHotspotFetcher:
     """微博热搜榜单获取器"""
@@ -62,7 +77,7 @@ class WeiboHotspotFetcher:
                 "success": True/False,
                 "code": 200,
                 "message": "success",
-                "data": [...],
+                "data": [{rank, hotword, hotword_num, hotword_num_int, hot_tag, weibo_url}, ...],
                 "fetch_time": "2025-01-04 10:30:00",
                 "total": 50
             }
@@ -101,14 +116,14 @@ class WeiboHotspotFetcher:
                 hotword_num_clean = re.sub(r'[^\d]', '', hotword_num_raw)
                 hotword_num_int = int(hotword_num_clean) if hotword_num_clean else 0
 
-                formatted_data.append({
-                    "rank": idx,
-                    "hotword": hotword,
-                    "hotword_num": hotword_num_raw,
-                    "hotword_num_int": hotword_num_int,
-                    "hot_tag": item.get('hottag', ''),
-                    "weibo_url": f"https://s.weibo.com/weibo?q={urllib.parse.quote(hotword)}"
-                })
+                # 对外仍返回字典（可直接 json.dump / .get），需要记录时用 Hotspot.coerce 转换
+                formatted_data.append(Hotspot(
+                    rank=idx,
+                    hotword=hotword,
+                    hotness=hotword_num_int,
+                    hotword_num=hotword_num_raw,
+                    hot_tag=item.get('hottag', '')
+                ).to_dict())
 
             return {
                 "success": True,
@@ -167,44 +182,185 @@ class WeiboHotspotFetcher:
         print("\n🔥 热搜TOP10:")
         print("-" * 60)
 
-        for item in result['data'][:10]:
-            rank = item['rank']
-            hotword = item['hotword']
-            hotness = item['hotword_num']
-            tag = item['hot_tag']
-
-            print(f"{rank:2d}. {hotword}")
-            print(f"    热度: {hotness} | 标签: {tag}")
-            print(f"    链接: {item['weibo_url']}")
+        for idx, item in enumerate(result['data'][:10], 1):
+            item = Hotspot.coerce(item, idx)
+            print(f"{item.rank:2d}. {item.hotword}")
+            print(f"    热度: {item.hotword_num} | 标签: {item.hot_tag}")
+            print(f"    链接: {item.weibo_url}")
             print("-" * 60)
 
-    def save_to_file(self, result: Dict, filename: str = None):
+    def save_to_file(self, result: Dict, filename: str = None) -> str:
         """
         保存热搜数据到JSON文件
 
         Args:
             result: fetch()方法返回的字典
             filename: 输出文件名（可选）
+
+        Returns:
+            保存的文件名
         """
         if filename is None:
             filename = f"weibo_hotspots_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+                json.dump(result, f, ensure_ascii=False, indent=2, default=to_json)
             print(f"\n💾 数据已保存到: {filename}")
 
             # 保存文件名到 .latest_hotspots 文件，供后续脚本使用
             with open('.latest_hotspots', 'w') as f:
                 f.write(filename)
 
+            return filename
+
         except Exception as e:
             print(f"\n❌ 保存文件失败: {str(e)}")
             sys.exit(1)
 
+    def save_to_store(self, result: Dict, db_path: str = None, source: str = ''):
+        """
+        保存热搜数据到 SQLite 历史库
+
+        Args:
+            result: fetch()方法返回的字典
+            db_path: 历史库路径（可选，默认见 snapshot_store.default_db_path）
+            source: 来源文件名（可选）
+        """
+        from snapshot_store import SnapshotStore
+
+        try:
+            with SnapshotStore(db_path) as store:
+                if store.add_snapshot(result, source) is not None:
+                    print(f"🗄️  快照已写入历史库: {store.path}")
+        except Exception as e:
+            print(f"\n⚠️  写入历史库失败: {str(e)}")
+
+    def save_to_archive(self, result: Dict, directory: str = None):
+        """
+        追加热搜数据到列式归档
+
+        Args:
+            result: fetch()方法返回的字典
+            directory: 归档目录（可选，默认见 columnar_archive.default_archive_dir）
+        """
+        from columnar_archive import ColumnarArchive
+
+        try:
+            with ColumnarArchive(directory) as archive:
+                if archive.append(result):
+                    print(f"🗃️  快照已追加到归档: {archive.directory}")
+        except Exception as e:
+            print(f"\n⚠️  写入归档失败: {str(e)}")
+
+    @staticmethod
+    def list_digest(result: Dict) -> str:
+        """
+        计算榜单摘要，用于判断两次抓取之间榜单是否变化
+
+        只包含归一化热搜词、排名与热度，与抓取时间无关。
+
+        Args:
+            result: fetch()方法返回的字典
+
+        Returns:
+            sha256 十六进制摘要
+        """
+        digest = hashlib.sha256()
+        for idx, item in enumerate(result.get('data', []), 1):
+            item = Hotspot.coerce(item, idx)
+            digest.update(
+                f"{item.rank}\t{normalize_hotword(item.hotword)}\t{item.hotness}\n".encode('utf-8')
+            )
+        return digest.hexdigest()
+
+    def poll(self, interval: float = 60, on_change: Callable[[Dict, List[Dict]], None] = None,
+             max_polls: int = None, persist: bool = True, db_path: str = None) -> int:
+        """
+        常驻轮询热搜榜单
+
+        每次抓取后计算榜单摘要，与上一次相同则跳过；变化时保存快照
+        （JSON 文件 / 历史库），并以新出现的热搜调用 on_change。
+        提供历史库时，以库中最近一次快照作为起点，重启后不会重复保存。
+
+        Args:
+            interval: 轮询间隔（秒）
+            on_change: 榜单变化时的回调 on_change(result, new_items)，
+                new_items 为本次轮询中首次出现的热搜（按归一化热搜词判断）
+            max_polls: 最多轮询次数（可选，默认不限制）
+            persist: 变化时是否写出 JSON 文件
+            db_path: 历史库路径（可选，设置后变化时同时写入历史库）
+
+        Returns:
+            检测到的变化次数
+        """
+        last_digest = None
+        seen = set()
+        if db_path:
+            from snapshot_store import SnapshotStore
+
+            with SnapshotStore(db_path) as store:
+                latest = store.latest_snapshot()
+            if latest:
+                last_digest = self.list_digest(latest)
+                seen = {normalize_hotword(item['hotword']) for item in latest['data']}
+                print(f"🗄️  以历史库最近快照为起点: {latest['fetch_time']}")
+
+        polls = changes = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                if polls:
+                    time.sleep(interval)
+                polls += 1
+
+                result = self.fetch()
+                if not result.get('success'):
+                    print(f"⚠️  [{result['fetch_time']}] 获取失败: {result.get('message')}，稍后重试")
+                    continue
+
+                digest = self.list_digest(result)
+                if digest == last_digest:
+                    print(f"⏸️  [{result['fetch_time']}] 榜单无变化")
+                    continue
+                last_digest = digest
+                changes += 1
+
+                new_items = []
+                for item in result['data']:
+                    key = normalize_hotword(item['hotword'])
+                    if key not in seen:
+                        seen.add(key)
+                        new_items.append(item)
+                print(f"🔄 [{result['fetch_time']}] 榜单变化，新上榜 {len(new_items)} 个")
+                for item in new_items[:10]:
+                    print(f"   🆕 #{item.get('rank', '?')} {item['hotword']}")
+
+                filename = self.save_to_file(result) if persist else ''
+                if db_path:
+                    self.save_to_store(result, db_path, source=filename)
+                if os.environ.get('WEIBO_ARCHIVE_DIR'):
+                    self.save_to_archive(result)
+                if on_change:
+                    on_change(result, new_items)
+        except KeyboardInterrupt:
+            print("\n⏹️  已停止轮询")
+
+        print(f"\n📊 轮询 {polls} 次，榜单变化 {changes} 次")
+        return changes
+
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="微博热搜数据抓取器")
+    parser.add_argument('--watch', action='store_true',
+                        help="常驻轮询模式，榜单变化时才保存快照")
+    parser.add_argument('--interval', type=float,
+                        default=float(os.environ.get('WEIBO_POLL_INTERVAL', '60')),
+                        help="轮询间隔秒数 (默认: 60)")
+    parser.add_argument('--max-polls', type=int, default=None,
+                        help="最多轮询次数 (默认不限制)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("微博热搜数据抓取器")
     print("=" * 60)
@@ -224,6 +380,12 @@ def main():
         # 创建获取器实例
         fetcher = WeiboHotspotFetcher(API_KEY)
 
+        if args.watch:
+            print(f"\n👀 轮询模式，间隔 {args.interval:g} 秒")
+            fetcher.poll(args.interval, max_polls=args.max_polls,
+                         db_path=os.environ.get('WEIBO_HISTORY_DB') or None)
+            sys.exit(0)
+
         # 获取热搜数据
         print("\n🌐 正在抓取微博热搜...")
         result = fetcher.fetch()
@@ -232,7 +394,13 @@ def main():
         fetcher.print_summary(result)
 
         # 保存到文件
-        fetcher.save_to_file(result)
+        filename = fetcher.save_to_file(result)
+
+        # 写入历史库
+        if os.environ.get('WEIBO_HISTORY_DB'):
+            fetcher.save_to_store(result, source=filename)
+        if os.environ.get('WEIBO_ARCHIVE_DIR'):
+            fetcher.save_to_archive(result)
 
         print("\n✅ 抓取完成!")
         sys.exit(0)
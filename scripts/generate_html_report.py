@@ -7,9 +7,19 @@
 - 读取 Claude 生成的创意数据
 - 生成精美的 HTML 报告
 - 支持响应式设计
+- 按章节流式写出（文件 / gzip / 标准输出），内存占用不随报告大小增长
+- 页面结构与样式来自预编译模板 templates/report_template.html
+- 可选外链样式：输出一份带内容哈希的 report.<hash>.css，所有报告共享、可长期缓存
+- 可选预压缩：写出压缩后的 HTML 及 .gz / .br 兄弟文件（见 precompress.py）
 
 用法：
-python generate_html_report_v2.py
+python generate_html_report_v2.py [--output 文件名 | --output -] [--gzip] [--precompress]
+                                  [--asset-dir reports/assets --asset-prefix ../../assets/]
+
+环境变量：
+- REPORT_ASSET_DIR: 设置后样式表写入该目录并以 <link> 引用（可选，默认内联 <style>）
+- REPORT_ASSET_PREFIX: 样式表 href 的前缀（可选，相对报告最终所在位置，如 ../../assets/）
+- REPORT_PRECOMPRESS: 设为 1 时写出报告后立即预压缩（可选）
 
 输入：
 - weibo_ideas_*.json (Claude 分析生成的创意数据)
@@ -21,20 +31,129 @@ python generate_html_report_v2.py
 v2.0.0 (2026-01-18) - GitHub Actions 迁移版本
 """
 
+import argparse
+import gzip
+import hashlib
+import io
 import json
 import os
 import sys
+import textwrap
+from contextlib import redirect_stdout
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from precompress import format_savings, precompress_enabled, precompress_file
+from records import Hotspot, Idea
+from template_engine import load_template
+from text_utils import normalize_hotword
+
+# 报告模板（首次使用时编译并缓存，见 template_engine.py）与样式表
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'templates')
+DEFAULT_TEMPLATE = os.path.join(TEMPLATES_DIR, 'report_template.html')
+DEFAULT_STYLESHEET = os.path.join(TEMPLATES_DIR, 'report.css')
+
+RANK_CLASSES = {1: 'gold', 2: 'silver', 3: 'bronze'}
+
+
+@lru_cache(maxsize=8)
+def _read_stylesheet(path: str, mtime_ns: int) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_stylesheet(path: str = None) -> str:
+    """读取样式表（按修改时间缓存）"""
+    path = path or DEFAULT_STYLESHEET
+    return _read_stylesheet(path, os.stat(path).st_mtime_ns)
+
+
+def stylesheet_asset_name(css: str) -> str:
+    """带内容哈希的样式表文件名，内容不变时文件名不变"""
+    return f"report.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]}.css"
 
 
 class HTMLReportGenerator:
     """HTML 报告生成器"""
 
-    def __init__(self):
+    def __init__(self, template_path: str = None, stylesheet_path: str = None,
+                 asset_dir: str = None, asset_prefix: str = '', precompress: bool = False):
+        """
+        初始化生成器
+
+        Args:
+            template_path: 报告模板路径（可选，默认：templates/report_template.html）
+            stylesheet_path: 样式表路径（可选，默认：templates/report.css）
+            asset_dir: 外链样式表的输出目录（可选，不设置时内联样式）
+            asset_prefix: 外链样式表 href 的前缀（相对报告最终所在位置）
+            precompress: 写出后是否压缩 HTML 并生成 .gz / .br 兄弟文件
+        """
+        self.template_path = template_path or DEFAULT_TEMPLATE
+        self.stylesheet_path = stylesheet_path or DEFAULT_STYLESHEET
+        self.asset_dir = asset_dir
+        self.asset_prefix = asset_prefix
+        self.precompress = precompress
+        self._by_hotword: Dict[str, Dict] = {}
+        self._by_normalized: Dict[str, Dict] = {}
         self.hotspots_data = None
         self.ideas_data = None
 
+    @classmethod
+    def from_env(cls) -> 'HTMLReportGenerator':
+        """根据环境变量 REPORT_ASSET_DIR / REPORT_ASSET_PREFIX / REPORT_PRECOMPRESS 创建生成器"""
+        return cls(asset_dir=os.environ.get('REPORT_ASSET_DIR') or None,
+                   asset_prefix=os.environ.get('REPORT_ASSET_PREFIX', ''),
+                   precompress=precompress_enabled())
+
+    def write_assets(self) -> str:
+        """
+        把样式表写入 asset_dir（同名文件已存在时跳过）
+
+        Returns:
+            样式表文件名（report.<hash>.css）
+        """
+        css = load_stylesheet(self.stylesheet_path)
+        name = stylesheet_asset_name(css)
+        path = os.path.join(self.asset_dir, name)
+        if not os.path.exists(path):
+            os.makedirs(self.asset_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(css)
+            os.replace(tmp_path, path)
+            print(f"🎨 样式表已写入: {path}")
+            if self.precompress:
+                precompress_file(path)
+        return name
+
+    @property
+    def hotspots_data(self) -> Dict:
+        """热搜数据；赋值时重建热搜词索引"""
+        return self._hotspots_data
+
+    @hotspots_data.setter
+    def hotspots_data(self, data: Dict):
+        self._hotspots_data = data
+        self._by_hotword = {}
+        self._by_normalized = {}
+        for idx, item in enumerate((data or {}).get('data', []), 1):
+            hotspot = Hotspot.coerce(item, idx)
+            # 同名热搜以排名靠前的为准
+            self._by_hotword.setdefault(hotspot.hotword, hotspot)
+            self._by_normalized.setdefault(normalize_hotword(hotspot.hotword), hotspot)
+
+    def load_data(self, ideas_data: Dict, hotspots_data: Dict = None):
+        """
+        直接使用内存中的数据（供流水线在进程内传递，无需读写 JSON 文件）
+
+        Args:
+            ideas_data: 创意数据（HotspotAnalyzer.build_output() 的返回值）
+            hotspots_data: 热搜数据（WeiboHotspotFetcher.fetch() 的返回值，可选）
+        """
+        self.ideas_data = ideas_data
+        self.hotspots_data = hotspots_data
+
     def load_latest_data(self):
         """加载最新的热搜和创意数据"""
         import glob
@@ -59,589 +178,169 @@ class HTMLReportGenerator:
             with open(latest_hotspots, 'r', encoding='utf-8') as f:
                 self.hotspots_data = json.load(f)
 
-    def get_hotspot_info(self, hotword: str) -> Dict:
-        """获取热搜信息"""
-        if not self.hotspots_data:
-            return {}
-
-        for hotspot in self.hotspots_data.get('data', []):
-            if hotspot['hotword'] == hotword:
-                return hotspot
-        return {}
+    def get_hotspot_info(self, hotword: str) -> Optional[Hotspot]:
+        """获取热搜记录（先精确匹配，再按归一化热搜词匹配），没有时返回 None"""
+        hotspot = self._by_hotword.get(hotword)
+        if hotspot is None:
+            hotspot = self._by_normalized.get(normalize_hotword(hotword))
+        return hotspot
 
     def generate_html(self) -> str:
-        """生成 HTML 内容"""
+        """生成 HTML 内容（完整字符串）"""
+        return ''.join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
+        """
+        按顺序产出 HTML 片段
+
+        Yields:
+            HTML 片段（逐个热搜 / 创意产出，不拼接整页）
+        """
+        yield from load_template(self.template_path).render(self.build_context())
+
+    def build_context(self) -> Dict:
+        """
+        组装模板变量
+
+        Returns:
+            报告模板（templates/report_template.html）使用的变量
+        """
         if not self.ideas_data:
             raise ValueError("未加载创意数据")
 
-        ideas = self.ideas_data.get('ideas', [])
+        ideas = [Idea.from_dict(item) for item in self.ideas_data.get('ideas', [])]
         stats = self.ideas_data.get('statistics', {})
 
         # 按热搜分组
-        ideas_by_hotspot = {}
+        ideas_by_hotspot: Dict[str, List[Idea]] = {}
         for idea in ideas:
-            hotword = idea.get('hotword', '未知话题')
-            if hotword not in ideas_by_hotspot:
-                ideas_by_hotspot[hotword] = []
-            ideas_by_hotspot[hotword].append(idea)
+            ideas_by_hotspot.setdefault(idea.hotword or '未知话题', []).append(idea)
 
         # 按热搜排序（根据第一个创意的 rank）
         sorted_hotspots = sorted(
             ideas_by_hotspot.items(),
-            key=lambda x: x[1][0].get('rank', 999) if x[1] else 999
+            key=lambda x: 999 if x[1][0].rank is None else x[1][0].rank
         )
 
-        # 生成 HTML
-        html = self._generate_html_header()
-        html += self._generate_overview_section(sorted_hotspots[:10])
-        html += self._generate_details_section(sorted_hotspots)
-        html += self._generate_ranking_section(ideas)
-        html += self._generate_statistics_section(stats)
-        html += self._generate_footer()
-
-        return html
-
-    def _generate_html_header(self) -> str:
-        """生成 HTML 头部"""
-        generate_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-        return f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>微博热搜产品创意分析报告 - {datetime.now().strftime('%Y年%m月%d日')}</title>
-    <style>
-        :root {{
-            --primary-color: #FF6B35;
-            --secondary-color: #FF8C42;
-            --accent-excellent: #FFD23F;
-            --accent-good: #06A77D;
-            --accent-normal: #6C757D;
-            --bg-color: #FFF8F0;
-            --text-color: #2D3142;
-            --card-bg: #FFFFFF;
-        }}
-
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background-color: var(--bg-color);
-            color: var(--text-color);
-            line-height: 1.6;
-            padding: 20px;
-        }}
-
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-
-        .report-header {{
-            background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-            color: white;
-            padding: 40px;
-            border-radius: 16px;
-            margin-bottom: 32px;
-            box-shadow: 0 4px 12px rgba(255, 107, 53, 0.3);
-        }}
-
-        .report-header h1 {{
-            font-size: 32px;
-            margin-bottom: 16px;
-            font-weight: 700;
-        }}
-
-        .meta-info {{
-            display: flex;
-            gap: 16px;
-            flex-wrap: wrap;
-        }}
-
-        .meta-info span {{
-            background: rgba(255, 255, 255, 0.2);
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 14px;
-        }}
-
-        h2 {{
-            font-size: 24px;
-            margin-bottom: 20px;
-            color: var(--primary-color);
-            border-left: 4px solid var(--primary-color);
-            padding-left: 12px;
-            margin-top: 32px;
-        }}
-
-        .hotspot-list {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
-            gap: 16px;
-            margin-bottom: 32px;
-        }}
-
-        .hotspot-card {{
-            background: var(--card-bg);
-            padding: 20px;
-            border-radius: 12px;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
-            transition: transform 0.2s, box-shadow 0.2s;
-        }}
-
-        .hotspot-card:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 16px rgba(0, 0, 0, 0.12);
-        }}
-
-        .hotspot-header {{
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            margin-bottom: 12px;
-        }}
-
-        .rank {{
-            background: var(--primary-color);
-            color: white;
-            width: 32px;
-            height: 32px;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-weight: bold;
-            font-size: 14px;
-            flex-shrink: 0;
-        }}
-
-        .hotword {{
-            font-weight: 600;
-            font-size: 16px;
-            flex: 1;
-            overflow: hidden;
-            text-overflow: ellipsis;
-        }}
-
-        .hotness {{
-            font-size: 13px;
-            color: #666;
-        }}
-
-        .tag {{
-            background: var(--primary-color);
-            color: white;
-            padding: 2px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-            font-weight: 500;
-        }}
-
-        .hotspot-detail {{
-            background: var(--card-bg);
-            padding: 24px;
-            border-radius: 12px;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
-            margin-bottom: 24px;
-        }}
-
-        .hotspot-title {{
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            margin-bottom: 16px;
-            padding-bottom: 16px;
-            border-bottom: 2px solid #f0f0f0;
-        }}
-
-        .idea-card {{
-            background: var(--bg-color);
-            padding: 20px;
-            border-radius: 12px;
-            margin-bottom: 16px;
-            border-left: 5px solid #E0E0E0;
-            transition: all 0.2s;
-        }}
-
-        .idea-card:hover {{
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        }}
-
-        .idea-card.excellent {{
-            border-left-color: var(--accent-excellent);
-            background: linear-gradient(to right, rgba(255, 210, 63, 0.1), transparent);
-        }}
-
-        .idea-card.good {{
-            border-left-color: var(--accent-good);
-            background: linear-gradient(to right, rgba(6, 167, 125, 0.05), transparent);
-        }}
-
-        .idea-card.normal {{
-            border-left-color: var(--accent-normal);
-        }}
-
-        .idea-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 12px;
-            flex-wrap: wrap;
-            gap: 8px;
-        }}
-
-        .idea-name {{
-            font-size: 18px;
-            font-weight: 600;
-            color: var(--text-color);
-        }}
-
-        .score-info {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-
-        .score {{
-            font-size: 20px;
-            font-weight: 700;
-            color: var(--primary-color);
-        }}
-
-        .badge {{
-            display: inline-block;
-            padding: 4px 12px;
-            border-radius: 12px;
-            font-size: 12px;
-            font-weight: 600;
-        }}
-
-        .badge.excellent {{
-            background: var(--accent-excellent);
-            color: #333;
-        }}
-
-        .badge.good {{
-            background: var(--accent-good);
-            color: white;
-        }}
-
-        .badge.normal {{
-            background: var(--accent-normal);
-            color: white;
-        }}
-
-        .idea-body p {{
-            margin-bottom: 8px;
-            font-size: 14px;
-        }}
-
-        .idea-body strong {{
-            color: var(--primary-color);
-            font-weight: 600;
-        }}
-
-        .idea-body ul {{
-            margin-left: 20px;
-            margin-bottom: 12px;
-        }}
-
-        .idea-body li {{
-            margin-bottom: 4px;
-            font-size: 14px;
-        }}
-
-        .score-breakdown {{
-            font-size: 13px;
-            color: #666;
-            font-style: italic;
-        }}
-
-        .statistics {{
-            background: linear-gradient(135deg, var(--secondary-color), var(--primary-color));
-            color: white;
-            padding: 32px;
-            border-radius: 16px;
-            margin-bottom: 32px;
-            box-shadow: 0 4px 12px rgba(255, 107, 53, 0.3);
-        }}
-
-        .statistics h2 {{
-            color: white;
-            border-left-color: white;
-            margin-top: 0;
-        }}
-
-        .stat-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 24px;
-        }}
-
-        .stat-item {{
-            text-align: center;
-            padding: 20px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 12px;
-            backdrop-filter: blur(10px);
-        }}
-
-        .stat-value {{
-            font-size: 36px;
-            font-weight: 700;
-            display: block;
-            margin-bottom: 8px;
-        }}
-
-        .stat-label {{
-            font-size: 14px;
-            opacity: 0.9;
-        }}
-
-        .ranking-list {{
-            display: flex;
-            flex-direction: column;
-            gap: 12px;
-        }}
-
-        .ranking-item {{
-            background: var(--card-bg);
-            padding: 16px 20px;
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            gap: 16px;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
-        }}
-
-        .ranking-rank {{
-            font-size: 24px;
-            font-weight: 700;
-            width: 40px;
-            text-align: center;
-        }}
-
-        .ranking-rank.gold {{ color: #FFD700; }}
-        .ranking-rank.silver {{ color: #C0C0C0; }}
-        .ranking-rank.bronze {{ color: #CD7F32; }}
-
-        .ranking-info {{
-            flex: 1;
-        }}
-
-        .ranking-name {{
-            font-weight: 600;
-            font-size: 16px;
-            margin-bottom: 4px;
-        }}
-
-        .ranking-hotword {{
-            font-size: 13px;
-            color: #666;
-        }}
-
-        .ranking-score {{
-            font-size: 24px;
-            font-weight: 700;
-            color: var(--primary-color);
-        }}
-
-        .footer {{
-            text-align: center;
-            padding: 32px;
-            color: #666;
-            font-size: 14px;
-        }}
-
-        @media (max-width: 768px) {{
-            .report-header {{ padding: 24px; }}
-            .report-header h1 {{ font-size: 24px; }}
-            .hotspot-list {{ grid-template-columns: 1fr; }}
-            .idea-header {{ flex-direction: column; align-items: flex-start; }}
-            .stat-grid {{ grid-template-columns: 1fr; }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header class="report-header">
-            <h1>🤖 微博热搜产品创意分析报告</h1>
-            <div class="meta-info">
-                <span>📅 生成日期：{datetime.now().strftime('%Y-%m-%d')}</span>
-                <span>🔥 热搜总数：{len(self.ideas_data.get('ideas', [])) // 3 if self.ideas_data else 0}</span>
-                <span>💡 创意总数：{self.ideas_data.get('statistics', {}).get('total', 0) if self.ideas_data else 0}</span>
-                <span>⏰ 生成时间：{generate_time}</span>
-            </div>
-        </header>
-'''
-
-    def _generate_overview_section(self, top_hotspots) -> str:
-        """生成概览部分"""
-        html = '''
-        <h2>📊 热搜TOP10概览</h2>
-        <div class="hotspot-list">
-'''
-
-        for hotword, ideas in top_hotspots:
-            if not ideas:
-                continue
-
-            idea = ideas[0]
-            hotspot_info = self.get_hotspot_info(hotword)
-            tag = hotspot_info.get('hot_tag', '')
-            hotness = hotspot_info.get('hotword_num', idea.get('hotness', ''))
-
-            tag_html = f'<span class="tag">{tag}</span>' if tag else ''
-
-            html += f'''
-            <div class="hotspot-card">
-                <div class="hotspot-header">
-                    <span class="rank">{idea.get('rank', '?')}</span>
-                    <span class="hotword">{hotword}</span>
-                </div>
-                <div class="hotness">热度：{hotness} {tag_html}</div>
-            </div>
-'''
-
-        html += '\n        </div>\n'
-        return html
-
-    def _generate_details_section(self, sorted_hotspots) -> str:
-        """生成详细分析部分"""
-        html = '\n        <h2>🔍 详细产品创意分析</h2>\n'
-
-        for hotword, ideas in sorted_hotspots:
-            if not ideas:
-                continue
-
-            idea = ideas[0]
-            hotspot_info = self.get_hotspot_info(hotword)
-            tag = hotspot_info.get('hot_tag', '')
-            hotness = hotspot_info.get('hotword_num_int', idea.get('hotness', 0))
-
-            tag_display = f' <span class="tag">{tag}</span>' if tag else ''
-
-            html += f'''
-        <div class="hotspot-detail">
-            <div class="hotspot-title">
-                <span class="rank">{idea.get('rank', '?')}</span>
-                <span class="hotword" style="font-size: 18px;">{hotword}{tag_display}</span>
-            </div>
-            <p><strong>🔥 热度指数：</strong>{hotness:,}</p>
-            <div class="product-ideas">
-'''
-
-            for idea_data in ideas:
-                score = idea_data.get('score', 0)
-                badge_class = 'excellent' if score > 80 else 'good' if score >= 60 else 'normal'
-                badge_text = '优秀' if score > 80 else '良好' if score >= 60 else '普通'
-
-                features = idea_data.get('features', [])
-                features_html = '\n                    '.join([f'<li>{f}</li>' for f in features])
-
-                html += f'''
-                <div class="idea-card {badge_class}">
-                    <div class="idea-header">
-                        <span class="idea-name">{idea_data.get('name', '未知创意')}</span>
-                        <div class="score-info">
-                            <span class="score">{score}分</span>
-                            <span class="badge {badge_class}">{badge_text}</span>
-                        </div>
-                    </div>
-                    <div class="idea-body">
-                        <p><strong>💎 核心功能：</strong></p>
-                        <ul>
-                            {features_html}
-                        </ul>
-                        <p><strong>👥 目标用户：</strong>{idea_data.get('target_users', '未指定')}</p>
-                        <p><strong>📝 产品描述：</strong>{idea_data.get('description', '无描述')}</p>
-                        <p class="score-breakdown">
-                            评分：有趣度 {idea_data.get('fun_score', 0)}分 × 80% + 有用度 {idea_data.get('use_score', 0)}分 × 20%
-                        </p>
-                    </div>
-                </div>
-'''
-
-            html += '\n            </div>\n        </div>\n'
-
-        return html
-
-    def _generate_ranking_section(self, ideas: List[Dict]) -> str:
-        """生成排行榜部分"""
-        # 按评分排序
-        sorted_ideas = sorted(ideas, key=lambda x: x.get('score', 0), reverse=True)[:20]
-
-        html = '\n        <h2>🏆 产品创意排行榜 (TOP20)</h2>\n        <div class="ranking-list">\n'
-
-        for idx, idea in enumerate(sorted_ideas, 1):
-            rank_class = ''
-            if idx == 1:
-                rank_class = 'gold'
-            elif idx == 2:
-                rank_class = 'silver'
-            elif idx == 3:
-                rank_class = 'bronze'
-
-            rank_display = f'#{idx}' if idx <= 3 else f'{idx}'
-
-            html += f'''
-            <div class="ranking-item">
-                <span class="ranking-rank {rank_class}">{rank_display}</span>
-                <div class="ranking-info">
-                    <div class="ranking-name">{idea.get('name', '未知')}</div>
-                    <div class="ranking-hotword">来源：{idea.get('hotword', '未知热搜')}</div>
-                </div>
-                <span class="ranking-score">{idea.get('score', 0)}分</span>
-            </div>
-'''
-
-        html += '\n        </div>\n'
-        return html
-
-    def _generate_statistics_section(self, stats: Dict) -> str:
-        """生成统计部分"""
-        html = f'''
-        <div class="statistics">
-            <h2>📈 数据统计</h2>
-            <div class="stat-grid">
-                <div class="stat-item">
-                    <span class="stat-value">{stats.get('total', 0)}</span>
-                    <span class="stat-label">创意总数</span>
-                </div>
-                <div class="stat-item">
-                    <span class="stat-value">{stats.get('excellent', 0)}</span>
-                    <span class="stat-label">优秀创意 (&gt;80分)</span>
-                </div>
-                <div class="stat-item">
-                    <span class="stat-value">{stats.get('good', 0)}</span>
-                    <span class="stat-label">良好创意 (60-80分)</span>
-                </div>
-                <div class="stat-item">
-                    <span class="stat-value">{stats.get('avg_score', 0):.1f}</span>
-                    <span class="stat-label">平均评分</span>
-                </div>
-            </div>
-        </div>
-'''
-        return html
-
-    def _generate_footer(self) -> str:
-        """生成页脚"""
-        return '''
-        <footer class="footer">
-            <p>🤖 本报告由 AI 自动生成 | 仅供参考</p>
-            <p>数据来源：天聚数行 API | AI 分析：Claude 3.5 Sonnet</p>
-            <p>生成时间：{generate_time}</p>
-        </footer>
-    </div>
-</body>
-</html>
-'''.format(generate_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        # duplicate_of 只在代表话题也在本报告中时生效，否则照常展示创意卡片
+        for idea in ideas:
+            if idea.duplicate_of and idea.duplicate_of not in ideas_by_hotspot:
+                idea.reused_from, idea.duplicate_of = idea.duplicate_of, None
+
+        details = []
+        for hotword, group in sorted_hotspots:
+            idea = group[0]
+            hotspot = self.get_hotspot_info(hotword)
+            details.append({
+                'rank': '?' if idea.rank is None else idea.rank,
+                'hotword': hotword,
+                'tag': hotspot.hot_tag if hotspot else '',
+                'hotness': hotspot.hotness if hotspot else idea.hotness,
+                'hotness_text': hotspot.hotword_num if hotspot else idea.hotness,
+                'duplicate_of': idea.duplicate_of,
+                'reused_from': idea.reused_from,
+                'ideas': [self._idea_view(idea_data) for idea_data in group]
+            })
+
+        # 近似重复热搜分发的创意不重复进入排行榜；按评分排序
+        ranked = sorted((i for i in ideas if not i.duplicate_of),
+                        key=lambda x: x.score, reverse=True)[:20]
+        ranking = [{
+            'rank_class': RANK_CLASSES.get(idx, ''),
+            'rank_display': f'#{idx}' if idx <= 3 else f'{idx}',
+            'name': idea.name or '未知',
+            'hotword': idea.hotword or '未知热搜',
+            'score': idea.score
+        } for idx, idea in enumerate(ranked, 1)]
+
+        if self.asset_dir:
+            stylesheet_href, stylesheet = self.asset_prefix + self.write_assets(), ''
+        else:
+            stylesheet_href, stylesheet = '', textwrap.indent(load_stylesheet(self.stylesheet_path), ' ' * 8)
+
+        now = datetime.now()
+        return {
+            'stylesheet_href': stylesheet_href,
+            'stylesheet': stylesheet,
+            'title_date': now.strftime('%Y年%m月%d日'),
+            'report_date': now.strftime('%Y-%m-%d'),
+            'generate_time': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'hotspot_count': len(ideas) // 3,
+            'idea_count': stats.get('total', 0),
+            'overview': details[:10],
+            'details': details,
+            'ranking': ranking,
+            'stats': stats
+        }
+
+    @staticmethod
+    def _idea_view(idea: Idea) -> Dict:
+        """单个创意的模板变量"""
+        score = idea.score
+        return {
+            'name': idea.name or '未知创意',
+            'score': score,
+            'badge_class': 'excellent' if score > 80 else 'good' if score >= 60 else 'normal',
+            'badge_text': '优秀' if score > 80 else '良好' if score >= 60 else '普通',
+            'features': idea.features,
+            'target_users': idea.target_users or '未指定',
+            'description': idea.description or '无描述',
+            'fun_score': idea.fun_score,
+            'use_score': idea.use_score
+        }
+
+    def render_to(self, sink: TextIO) -> int:
+        """
+        把 HTML 逐段写入文本流
+
+        Args:
+            sink: 可写的文本流（文件、gzip 文本流、sys.stdout 等）
+
+        Returns:
+            写入的字符数
+        """
+        written = 0
+        for chunk in self.iter_html():
+            sink.write(chunk)
+            written += len(chunk)
+        return written
+
+    def write_report(self, filename: str = None, compress: bool = False) -> str:
+        """
+        流式生成 HTML 报告并写入文件
+
+        Args:
+            filename: 输出文件名（可选）
+            compress: 是否 gzip 压缩（文件名以 .gz 结尾时自动启用）
+
+        Returns:
+            输出文件名
+        """
+        if filename is None:
+            filename = f"weibo_hotspot_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        compress = compress or filename.endswith('.gz')
+        if compress and not filename.endswith('.gz'):
+            filename += '.gz'
+
+        if compress:
+            # mtime=0 使相同内容的压缩结果字节一致
+            with open(filename, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as gz, \
+                    io.TextIOWrapper(gz, encoding='utf-8') as f:
+                self.render_to(f)
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                self.render_to(f)
+
+        self._report_written(filename, precompress=self.precompress and not compress)
+        return filename
+
+    def _report_written(self, filename: str, precompress: bool):
+        """打印文件大小，按需预压缩并打印节省的字节数"""
+        print(f"\n✅ HTML 报告已生成: {filename}")
+        print(f"📊 文件大小: {os.path.getsize(filename) / 1024:.1f} KB")
+        if precompress:
+            print(f"📦 预压缩: {format_savings(precompress_file(filename))}")
 
     def save_to_file(self, html_content: str, filename: str = None):
         """保存 HTML 到文件"""
@@ -651,43 +350,59 @@ class HTMLReportGenerator:
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(html_content)
 
-        print(f"\n✅ HTML 报告已生成: {filename}")
-        print(f"📊 文件大小: {os.path.getsize(filename) / 1024:.1f} KB")
-
+        self._report_written(filename, precompress=self.precompress)
         return filename
 
 
 def main():
     """主函数"""
-    print("=" * 60)
-    print("HTML 报告生成器")
-    print("=" * 60)
-
-    try:
-        generator = HTMLReportGenerator()
-
-        # 加载数据
-        print("\n📂 加载数据...")
-        generator.load_latest_data()
-
-        # 生成 HTML
-        print("\n🎨 生成 HTML 报告...")
-        html_content = generator.generate_html()
-
-        # 保存文件
-        output_file = generator.save_to_file(html_content)
-
-        print("\n✅ 报告生成完成!")
-        sys.exit(0)
-
-    except FileNotFoundError as e:
-        print(f"\n❌ 错误: {str(e)}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"\n❌ 错误: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="HTML 报告生成器")
+    parser.add_argument('--output', default=None,
+                        help="输出文件名，'-' 表示标准输出 (默认: weibo_hotspot_report_YYYYMMDD_HHMMSS.html)")
+    parser.add_argument('--gzip', action='store_true',
+                        help="gzip 压缩输出")
+    parser.add_argument('--asset-dir', default=os.environ.get('REPORT_ASSET_DIR') or None,
+                        help="样式表输出目录，设置后报告以 <link> 引用 report.<hash>.css (默认: 内联样式)")
+    parser.add_argument('--asset-prefix', default=os.environ.get('REPORT_ASSET_PREFIX', ''),
+                        help="样式表 href 前缀，相对报告最终所在位置 (如 ../../assets/)")
+    parser.add_argument('--precompress', action='store_true', default=precompress_enabled(),
+                        help="写出后压缩 HTML 并生成 .gz / .br 兄弟文件")
+    args = parser.parse_args()
+
+    # 报告写到标准输出时，进度信息改写到标准错误
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr if args.output == '-' else stdout):
+        print("=" * 60)
+        print("HTML 报告生成器")
+        print("=" * 60)
+
+        try:
+            generator = HTMLReportGenerator(asset_dir=args.asset_dir, asset_prefix=args.asset_prefix,
+                                            precompress=args.precompress)
+
+            # 加载数据
+            print("\n📂 加载数据...")
+            generator.load_latest_data()
+
+            # 流式生成并写出 HTML
+            print("\n🎨 生成 HTML 报告...")
+            if args.output == '-':
+                generator.render_to(stdout)
+                stdout.flush()
+            else:
+                generator.write_report(args.output, compress=args.gzip)
+
+            print("\n✅ 报告生成完成!")
+            sys.exit(0)
+
+        except FileNotFoundError as e:
+            print(f"\n❌ 错误: {str(e)}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"\n❌ 错误: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,210 @@
 #!/usr/bin/env python3
-"""生成历史报告列表页面"""
+"""
+生成历史报告列表页面
+
+报告元数据（路径、生成时间、热门热搜、创意数、平均分）记录在清单文件
+reports_manifest.json 中，每次只解析新增的报告，列表页直接由清单渲染，
+不再遍历整个归档目录。
 
+用法：
+python scripts/generate_reports_list.py                              # 由 pages/reports_manifest.json 渲染 pages/reports.html
+python scripts/generate_reports_list.py --add reports/2026/01/x.html --manifest reports/reports_manifest.json --no-render
+python scripts/generate_reports_list.py --rescan                     # 全量扫描，补录新报告并移除已删除的报告
+
+输出：
+- reports.html, reports-page-2.html, ...: 分页的历史报告列表（每页 --limit 个）
+- search/docs.json, search/shard-NN.json: 热搜词与创意名称的检索索引，
+  页面在首次搜索时按需加载（按二元组首字分片，只加载查询涉及的分片）
+"""
+
+import argparse
+import html
+import json
 import os
+import re
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from precompress import format_savings, precompress_enabled, precompress_file
+from text_utils import normalize_hotword
+
+MANIFEST_NAME = "reports_manifest.json"
+MANIFEST_VERSION = 2
+
+# 检索索引目录与分片数（分片 = 二元组首字码位 % 分片数，页面脚本使用同一规则）
+SEARCH_DIR = "search"
+SEARCH_SHARDS = 16
+
+# 不属于历史报告的页面
+EXCLUDED_PAGES = ("index.html", "reports.html")
+EXCLUDED_PREFIXES = ("latest_", "reports-page-")
+
+# 从报告 HTML 中提取元数据（兼容压缩后的 HTML）
+_FILENAME_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2})(?:_(\d{2})(\d{2})(\d{2}))?')
+_GENERATE_TIME_RE = re.compile(r'生成时间：\s*(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
+_HOTSPOT_COUNT_RE = re.compile(r'热搜总数：\s*(\d+)')
+_IDEA_COUNT_RE = re.compile(r'创意总数：\s*(\d+)')
+_AVG_SCORE_RE = re.compile(r'stat-value">\s*([\d.]+)\s*</span>\s*<span class="stat-label">\s*平均评分')
+_HOTWORD_RE = re.compile(r'<span class="hotword">([^<]+)</span>')
+_ALL_HOTWORDS_RE = re.compile(r'<span class="hotword"[^>]*>([^<]+)')
+_IDEA_NAME_RE = re.compile(r'<span class="idea-name">([^<]+)</span>')
+
+
+def extract_report_metadata(path: Path, top: int = 3) -> Dict:
+    """
+    从报告 HTML 中提取元数据
+
+    Args:
+        path: 报告文件路径
+        top: 记录的热门热搜数量
+
+    Returns:
+        元数据字典（不含 path）
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+
+    match = _GENERATE_TIME_RE.search(content)
+    if match:
+        timestamp = match.group(1)
+    else:
+        match = _FILENAME_TIME_RE.search(path.stem)
+        if match and match.group(2):
+            timestamp = f"{match.group(1)} {match.group(2)}:{match.group(3)}:{match.group(4)}"
+        elif match:
+            timestamp = f"{match.group(1)} 00:00:00"
+        else:
+            timestamp = datetime.fromtimestamp(path.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+
+    def number(pattern, cast):
+        found = pattern.search(content)
+        return cast(found.group(1)) if found else None
+
+    def texts(pattern):
+        return list(dict.fromkeys(html.unescape(text.strip()) for text in pattern.findall(content)))
+
+    return {
+        'timestamp': timestamp,
+        'top_hotwords': [html.unescape(word.strip()) for word in _HOTWORD_RE.findall(content)[:top]],
+        'hotwords': texts(_ALL_HOTWORDS_RE),
+        'ideas': [name for name in texts(_IDEA_NAME_RE) if '分析失败' not in name],
+        'hotspot_count': number(_HOTSPOT_COUNT_RE, int),
+        'idea_count': number(_IDEA_COUNT_RE, int),
+        'avg_score': number(_AVG_SCORE_RE, float),
+        'size': path.stat().st_size,
+    }
+
+
+def is_report_page(path: Path) -> bool:
+    """是否为历史报告页面"""
+    return (path.suffix == '.html' and path.name not in EXCLUDED_PAGES
+            and not path.name.startswith(EXCLUDED_PREFIXES))
+
+
+class ReportsManifest:
+    """报告清单（JSON 文件，路径相对清单所在目录）"""
+
+    def __init__(self, path: Path):
+        """
+        初始化清单
+
+        Args:
+            path: 清单文件路径，不存在时为空清单
+        """
+        self.path = Path(path)
+        self.root = self.path.parent
+        self.reports: Dict[str, Dict] = {}
+        self.exists = self.path.exists()
+        # 旧版本清单缺少字段，需要全量重新解析
+        self.stale = False
+        if self.exists:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.stale = data.get('version') != MANIFEST_VERSION
+            for entry in data.get('reports', []):
+                self.reports[entry['path']] = entry
+
+    def __len__(self) -> int:
+        return len(self.reports)
+
+    def relative(self, report: Path) -> str:
+        """报告相对清单目录的路径（统一使用 /）"""
+        return Path(os.path.relpath(report, self.root)).as_posix()
 
-def generate_reports_list():
-    """生成报告列表 HTML 页面"""
-    
-    pages_dir = Path("pages")
-    
-    # HTML 头部
-    html_header = """<!DOCTYPE html>
+    def add(self, report: Path) -> Dict:
+        """
+        解析报告并加入清单（已存在时覆盖）
+
+        Returns:
+            清单条目
+        """
+        entry = {'path': self.relative(report)}
+        entry.update(extract_report_metadata(Path(report)))
+        self.reports[entry['path']] = entry
+        return entry
+
+    def rescan(self) -> int:
+        """
+        全量扫描清单目录：补录清单中没有的报告，移除已不存在的报告
+        （旧版本清单的条目全部重新解析）
+
+        Returns:
+            新增（或重新解析）的报告数
+        """
+        found = {self.relative(p): p for p in self.root.rglob("*.html") if is_report_page(p)}
+        for relative in list(self.reports):
+            if relative not in found:
+                del self.reports[relative]
+        added = 0
+        for relative, report in found.items():
+            if self.stale or relative not in self.reports:
+                self.add(report)
+                added += 1
+        self.stale = False
+        return added
+
+    def latest(self, limit: int = None) -> List[Dict]:
+        """按生成时间倒序返回条目"""
+        entries = sorted(self.reports.values(), key=lambda e: (e['timestamp'], e['path']), reverse=True)
+        return entries[:limit] if limit else entries
+
+    def save(self):
+        """原子写入清单（条目按生成时间倒序）"""
+        data = {
+            'version': MANIFEST_VERSION,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'reports': self.latest(),
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+
+def update_manifest(manifest: ReportsManifest, add: Iterable[str] = (), rescan: bool = False) -> int:
+    """
+    更新清单：首次运行或 rescan 时全量扫描，否则只解析 add 中的报告
+
+    Returns:
+        新增（或更新）的报告数
+    """
+    changed = 0
+    if rescan or manifest.stale or not manifest.exists:
+        changed += manifest.rescan()
+        print(f"🔍 全量扫描 {manifest.root}: 新增 {changed} 个报告")
+    for report in add:
+        manifest.add(Path(report))
+        changed += 1
+        print(f"➕ 已加入清单: {report}")
+    if changed or not manifest.exists:
+        manifest.save()
+    return changed
+
+
+# 列表页头部
+PAGE_HEADER = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -68,6 +261,18 @@ def generate_reports_list():
             margin-bottom: 12px;
             font-size: 18px;
         }
+        .report-meta {
+            font-size: 14px;
+            color: #666;
+        }
+        .report-hotwords {
+            list-style: none;
+            margin-top: 8px;
+            font-size: 14px;
+        }
+        .report-hotwords li::before {
+            content: "🔥 ";
+        }
         .report-card a {
             display: inline-block;
             margin-top: 12px;
@@ -81,6 +286,40 @@ def generate_reports_list():
         .report-card a:hover {
             background: #FF8C42;
         }
+        .search-box {
+            margin-bottom: 24px;
+        }
+        .search-box input {
+            width: 100%;
+            padding: 14px 20px;
+            border: none;
+            border-radius: 12px;
+            font-size: 16px;
+            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
+        }
+        .search-status {
+            color: white;
+            margin: 0 0 16px 4px;
+        }
+        .pagination {
+            display: flex;
+            justify-content: center;
+            flex-wrap: wrap;
+            gap: 8px;
+            margin-top: 32px;
+        }
+        .pagination a, .pagination span {
+            padding: 8px 14px;
+            border-radius: 8px;
+            background: white;
+            color: #FF6B35;
+            text-decoration: none;
+            font-size: 14px;
+        }
+        .pagination .current {
+            background: #2D3142;
+            color: white;
+        }
         .footer {
             text-align: center;
             margin-top: 40px;
@@ -95,56 +334,280 @@ def generate_reports_list():
             <h1>🤖 微博热搜产品创意分析报告</h1>
             <p>历史报告列表 - 每日自动更新</p>
         </div>
-        <div class="reports-grid">
+        <div class="search-box">
+            <input type="search" id="search-input" placeholder="🔍 搜索全部历史报告中的热搜词或产品创意…" autocomplete="off">
+        </div>
+        <p class="search-status" id="search-status" hidden></p>
+        <div class="reports-grid" id="search-results" hidden></div>
+        <div class="reports-grid" id="reports-grid">
+"""
+
+# 页面检索脚本：首次输入时加载 docs.json，每个查询只加载涉及的分片
+SEARCH_SCRIPT = """    <script>
+    (function () {
+        var SHARDS = __SHARDS__, BASE = '__BASE__', MAX_RESULTS = 50;
+        var input = document.getElementById('search-input');
+        var status = document.getElementById('search-status');
+        var results = document.getElementById('search-results');
+        var grid = document.getElementById('reports-grid');
+        var pagination = document.getElementById('pagination');
+        var cache = {}, timer = null;
+
+        function load(name) {
+            if (!cache[name]) {
+                cache[name] = fetch(BASE + name).then(function (r) { return r.json(); });
+            }
+            return cache[name];
+        }
+        // 与 text_utils.normalize_hotword 一致：NFKC、小写、只保留文字和数字
+        function normalize(text) {
+            return text.normalize('NFKC').toLowerCase().replace(/[^\\p{L}\\p{N}]/gu, '');
+        }
+        function terms(text) {
+            var chars = Array.from(text), out = [];
+            if (chars.length === 1) return chars;
+            for (var i = 0; i + 1 < chars.length; i++) out.push(chars[i] + chars[i + 1]);
+            return out;
+        }
+        function shardOf(term) {
+            var n = term.codePointAt(0) % SHARDS;
+            return 'shard-' + (n < 10 ? '0' : '') + n + '.json';
+        }
+        function postings(term) {
+            return load(shardOf(term)).then(function (shard) {
+                if (Array.from(term).length > 1) return shard[term] || [];
+                // 单字查询：合并以该字开头的所有二元组
+                var ids = {};
+                Object.keys(shard).forEach(function (key) {
+                    if (key.indexOf(term) === 0) shard[key].forEach(function (id) { ids[id] = true; });
+                });
+                return Object.keys(ids).map(Number).sort(function (a, b) { return a - b; });
+            });
+        }
+        function escape(text) {
+            var div = document.createElement('div');
+            div.textContent = text;
+            return div.innerHTML;
+        }
+        function show(searching) {
+            grid.hidden = searching;
+            if (pagination) pagination.hidden = searching;
+            results.hidden = status.hidden = !searching;
+        }
+        function search() {
+            var query = normalize(input.value);
+            if (!query) { show(false); return; }
+            var unique = Array.from(new Set(terms(query)));
+            Promise.all([load('docs.json')].concat(unique.map(postings))).then(function (lists) {
+                if (normalize(input.value) !== query) return;
+                var docs = lists.shift();
+                var ids = lists.reduce(function (acc, list) {
+                    var set = new Set(list);
+                    return acc.filter(function (id) { return set.has(id); });
+                });
+                status.textContent = '找到 ' + ids.length + ' 个相关报告' +
+                    (ids.length > MAX_RESULTS ? '，显示最近 ' + MAX_RESULTS + ' 个' : '');
+                results.innerHTML = ids.slice(0, MAX_RESULTS).map(function (id) {
+                    var doc = docs[id];
+                    return '<div class="report-card"><h3>📅 ' + escape(doc[1]) + '</h3>' +
+                        '<ul class="report-hotwords">' + doc[2].map(function (w) {
+                            return '<li>' + escape(w) + '</li>';
+                        }).join('') + '</ul><a href="' + escape(doc[0]) + '">查看报告 →</a></div>';
+                }).join('');
+                show(true);
+            }).catch(function () {
+                status.textContent = '⚠️ 检索索引加载失败';
+                show(true);
+            });
+        }
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(search, 200);
+        });
+    })();
+    </script>
+"""
+
+
+def page_filename(page: int) -> str:
+    """第 page 页（从 1 开始）的文件名"""
+    return "reports.html" if page == 1 else f"reports-page-{page}.html"
+
+
+def search_terms(text: str) -> set:
+    """检索词：归一化文本的二元组（只有一个字时为该字）"""
+    chars = list(normalize_hotword(text))
+    if len(chars) == 1:
+        return set(chars)
+    return {chars[i] + chars[i + 1] for i in range(len(chars) - 1)}
+
+
+def write_search_index(entries: List[Dict], search_dir: Path, prefix: str = '') -> int:
+    """
+    生成检索索引
+
+    docs.json 为 [[链接, 生成时间, 热门热搜], ...]（按生成时间倒序，下标即文档编号）；
+    shard-NN.json 为 {二元组: [文档编号, ...]}，按二元组首字码位 % SEARCH_SHARDS 分片。
+
+    Args:
+        entries: 清单条目（按生成时间倒序）
+        search_dir: 索引输出目录
+        prefix: 报告链接前缀（清单目录相对站点目录的路径）
+
+    Returns:
+        检索词数量
+    """
+    docs = []
+    shards: List[Dict[str, List[int]]] = [{} for _ in range(SEARCH_SHARDS)]
+    for doc_id, entry in enumerate(entries):
+        docs.append([prefix + entry['path'], entry['timestamp'][:16], entry.get('top_hotwords', [])])
+        terms = set()
+        for text in entry.get('hotwords', []) + entry.get('ideas', []):
+            terms |= search_terms(text)
+        for term in terms:
+            shards[ord(term[0]) % SEARCH_SHARDS].setdefault(term, []).append(doc_id)
+
+    search_dir.mkdir(parents=True, exist_ok=True)
+    outputs = [('docs.json', docs)] + [(f"shard-{n:02d}.json", shard) for n, shard in enumerate(shards)]
+    for name, data in outputs:
+        with open(search_dir / name, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    return sum(len(shard) for shard in shards)
+
+
+def render_pagination(page: int, total_pages: int) -> str:
+    """生成分页导航"""
+    if total_pages <= 1:
+        return ""
+    links = []
+    if page > 1:
+        links.append(f'<a href="{page_filename(page - 1)}">← 上一页</a>')
+    for n in range(1, total_pages + 1):
+        if n == page:
+            links.append(f'<span class="current">{n}</span>')
+        else:
+            links.append(f'<a href="{page_filename(n)}">{n}</a>')
+    if page < total_pages:
+        links.append(f'<a href="{page_filename(page + 1)}">下一页 →</a>')
+    return f"""        <nav class="pagination" id="pagination">
+            {''.join(links)}
+        </nav>
 """
 
-    # 查找所有报告文件
-    report_files = []
-    for html_file in pages_dir.rglob("*.html"):
-        if html_file.name not in ["index.html", "reports.html"]:
-            relative_path = html_file.relative_to(pages_dir)
-            # 从文件名提取日期
-            filename = html_file.stem
-            date_str = filename.replace("_weibo_hotspot_report", "")
-            report_files.append((date_str, str(relative_path)))
-    
-    # 按日期倒序排序
-    report_files.sort(reverse=True, key=lambda x: x[0])
-    
-    # 只保留最近30个报告
-    report_files = report_files[:30]
-    
-    # 生成报告卡片
-    cards_html = ""
-    for date_str, relative_path in report_files:
-        cards_html += f"""            <div class="report-card">
-                <h3>📅 {date_str}</h3>
-                <p>微博热搜产品创意分析报告</p>
-                <a href="{relative_path}">查看报告 →</a>
+
+def render_card(entry: Dict) -> str:
+    """生成单个报告卡片"""
+    meta = []
+    if entry.get('idea_count') is not None:
+        meta.append(f"💡 {entry['idea_count']} 个创意")
+    if entry.get('avg_score') is not None:
+        meta.append(f"⭐ 平均 {entry['avg_score']:.1f} 分")
+    hotwords = ''.join(f"<li>{html.escape(word)}</li>" for word in entry.get('top_hotwords', []))
+    return f"""            <div class="report-card">
+                <h3>📅 {entry['timestamp'][:16]}</h3>
+                <p class="report-meta">{' · '.join(meta) or '微博热搜产品创意分析报告'}</p>
+                <ul class="report-hotwords">{hotwords}</ul>
+                <a href="{html.escape(entry['path'])}">查看报告 →</a>
             </div>
 """
-    
-    # HTML 尾部
+
+
+def generate_reports_list(precompress: bool = None, pages_dir: str = "pages", manifest_path: str = None,
+                          limit: int = 30, manifest: Optional[ReportsManifest] = None):
+    """
+    由清单生成分页的报告列表 HTML 页面与检索索引
+
+    Args:
+        precompress: 是否压缩列表页并生成 .gz / .br 兄弟文件（默认读取 REPORT_PRECOMPRESS）
+        pages_dir: 站点目录
+        manifest_path: 清单路径（默认：<pages_dir>/reports_manifest.json）
+        limit: 每页的报告数量
+        manifest: 已加载的清单（可选）
+    """
+    if precompress is None:
+        precompress = precompress_enabled()
+
+    pages_dir = Path(pages_dir)
+    if manifest is None:
+        manifest = ReportsManifest(Path(manifest_path) if manifest_path else pages_dir / MANIFEST_NAME)
+        update_manifest(manifest)
+
+    # 清单已按生成时间倒序（链接相对站点目录）
+    prefix = Path(os.path.relpath(manifest.root, pages_dir)).as_posix()
+    prefix = '' if prefix == '.' else prefix + '/'
+    entries = manifest.latest()
+
+    # 检索索引
+    term_count = write_search_index(entries, pages_dir / SEARCH_DIR, prefix)
+    script = SEARCH_SCRIPT.replace('__SHARDS__', str(SEARCH_SHARDS)).replace('__BASE__', f"{SEARCH_DIR}/")
+
+    # 分页写出列表页
     current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    html_footer = f"""        </div>
-        <div class="footer">
-            <p>自动生成时间: {current_time}</p>
+    total_pages = max(1, (len(entries) + limit - 1) // limit)
+    for page in range(1, total_pages + 1):
+        cards_html = "".join(render_card(dict(entry, path=prefix + entry['path']))
+                             for entry in entries[(page - 1) * limit:page * limit])
+
+        # HTML 尾部
+        html_footer = f"""        </div>
+{render_pagination(page, total_pages)}        <div class="footer">
+            <p>共 {len(manifest)} 个历史报告 | 第 {page}/{total_pages} 页 | 自动生成时间: {current_time}</p>
             <p>Powered by Claude AI & GitHub Actions</p>
         </div>
     </div>
-</body>
+{script}</body>
 </html>
 """
-    
-    # 写入文件
-    output_file = pages_dir / "reports.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_header)
-        f.write(cards_html)
-        f.write(html_footer)
-    
-    print(f"✅ 已生成报告列表页面: {output_file}")
-    print(f"   共找到 {len(report_files)} 个历史报告")
+
+        # 写入文件
+        output_file = pages_dir / page_filename(page)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(PAGE_HEADER)
+            f.write(cards_html)
+            f.write(html_footer)
+        if precompress:
+            savings = precompress_file(str(output_file))
+            if page == 1:
+                first_savings = savings
+
+    # 移除报告减少后多出的旧分页
+    for stale in pages_dir.glob("reports-page-*.html"):
+        match = re.fullmatch(r'reports-page-(\d+)\.html', stale.name)
+        if match and int(match.group(1)) > total_pages:
+            stale.unlink()
+
+    first_page = pages_dir / page_filename(1)
+    print(f"✅ 已生成报告列表页面: {first_page} 等 {total_pages} 页（每页 {limit} 个）")
+    print(f"   清单中共 {len(manifest)} 个历史报告，检索索引 {term_count} 个词")
+    print(f"📊 首页大小: {first_page.stat().st_size / 1024:.1f} KB")
+    if precompress:
+        print(f"📦 首页预压缩: {format_savings(first_savings)}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="生成历史报告列表页面")
+    parser.add_argument('--pages-dir', default="pages",
+                        help="站点目录 (默认: pages)")
+    parser.add_argument('--manifest', default=os.environ.get('REPORTS_MANIFEST') or None,
+                        help=f"清单路径 (默认: <pages-dir>/{MANIFEST_NAME})")
+    parser.add_argument('--add', nargs='+', default=[], metavar='REPORT',
+                        help="解析并加入清单的新报告")
+    parser.add_argument('--rescan', action='store_true',
+                        help="全量扫描清单目录，补录新报告并移除已删除的报告")
+    parser.add_argument('--no-render', action='store_true',
+                        help="只更新清单，不生成列表页与检索索引")
+    parser.add_argument('--limit', type=int, default=30,
+                        help="每页的报告数量 (默认: 30)")
+    args = parser.parse_args()
+
+    manifest = ReportsManifest(Path(args.manifest) if args.manifest else Path(args.pages_dir) / MANIFEST_NAME)
+    update_manifest(manifest, add=args.add, rescan=args.rescan)
+    print(f"🗂️  清单: {manifest.path} ({len(manifest)} 个报告)")
+
+    if not args.no_render:
+        generate_reports_list(pages_dir=args.pages_dir, limit=args.limit, manifest=manifest)
+
 
 if __name__ == "__main__":
-    generate_reports_list()
+    main()
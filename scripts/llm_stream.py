@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式（SSE）补全响应的解析工具
+
+功能：
+- 从 OpenAI 兼容接口的 server-sent events 中提取增量文本
+- 增量解析 "ideas" 数组：每个创意对象一闭合就立即产出，无需等待完整响应
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import json
+from typing import Dict, Iterable, Iterator, List
+
+
+def iter_sse_data(lines: Iterable[str]) -> Iterator[str]:
+    """
+    解析 SSE 事件流
+
+    Args:
+        lines: 响应的文本行
+
+    Yields:
+        每个事件的 data 字段（多行 data 以换行拼接），遇到 [DONE] 时结束
+    """
+    data_lines = []
+    for line in lines:
+        if not line:
+            if data_lines:
+                data = '\n'.join(data_lines)
+                data_lines = []
+                if data.strip() == '[DONE]':
+                    return
+                yield data
+            continue
+        if line.startswith(':'):
+            continue
+        if line.startswith('data:'):
+            data_lines.append(line[5:].lstrip(' '))
+
+    if data_lines:
+        data = '\n'.join(data_lines)
+        if data.strip() != '[DONE]':
+            yield data
+
+
+def iter_completion_deltas(lines: Iterable[str]) -> Iterator[str]:
+    """
+    从 OpenAI 兼容的流式响应中提取增量文本
+
+    Yields:
+        choices[0].delta.content 片段
+    """
+    for data in iter_sse_data(lines):
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        choices = event.get('choices') or []
+        if not choices:
+            continue
+        delta = choices[0].get('delta') or choices[0].get('message') or {}
+        content = delta.get('content')
+        if content:
+            yield content
+
+
+class IncrementalIdeasParser:
+    """增量解析响应文本中的 "ideas" 数组"""
+
+    def __init__(self):
+        self.buffer = ''
+        self.ideas: List[Dict] = []
+        self.done = False
+        self._pos = 0
+        self._in_array = False
+        self._depth = 0
+        self._obj_start = -1
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> List[Dict]:
+        """
+        追加一段文本
+
+        Args:
+            text: 新收到的文本片段
+
+        Returns:
+            本次新闭合的创意对象列表
+        """
+        self.buffer += text
+        if self.done:
+            return []
+
+        if not self._in_array and not self._find_array():
+            return []
+
+        new_ideas = []
+        buffer = self.buffer
+        i = self._pos
+        end = len(buffer)
+        while i < end:
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                if self._depth == 0:
+                    self._obj_start = i
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0 and self._obj_start >= 0:
+                    try:
+                        idea = json.loads(buffer[self._obj_start:i + 1])
+                    except json.JSONDecodeError:
+                        idea = None
+                    if isinstance(idea, dict):
+                        self.ideas.append(idea)
+                        new_ideas.append(idea)
+                    self._obj_start = -1
+            elif ch == ']' and self._depth == 0:
+                self.done = True
+                i += 1
+                break
+            i += 1
+
+        self._pos = i
+        return new_ideas
+
+    def _find_array(self) -> bool:
+        """定位 "ideas": [ 的起始位置"""
+        marker = '"ideas"'
+        while True:
+            key = self.buffer.find(marker, max(0, self._pos - len(marker) + 1))
+            if key < 0:
+                self._pos = len(self.buffer)
+                return False
+
+            i = key + len(marker)
+            while i < len(self.buffer) and self.buffer[i] in ' \t\r\n:':
+                i += 1
+            if i >= len(self.buffer):
+                self._pos = key
+                return False
+            if self.buffer[i] == '[':
+                self._in_array = True
+                self._pos = i + 1
+                return True
+
+            # 文本中出现的 "ideas" 并非数组键，继续向后查找
+            self._pos = key + len(marker)
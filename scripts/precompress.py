@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态页面预压缩
+
+功能：
+- 压缩 HTML：去掉注释、缩进与块级标签之间的空白，<style> 内的 CSS 同时压缩
+- 为 HTML / CSS / JSON 生成最高压缩级别的 .gz（以及 .br，需安装 brotli）兄弟文件，
+  供支持预压缩文件的静态服务器（nginx gzip_static / brotli_static 等）直接发送
+- 压缩结果与内容一一对应（gzip 头中 mtime 固定为 0），内容不变时文件字节一致
+
+用法：
+python scripts/precompress.py [目录或文件 ...]       # 默认: pages
+python scripts/precompress.py pages --no-minify
+
+环境变量：
+- REPORT_PRECOMPRESS: 设为 1 时报告生成器与报告列表在写出 HTML 后立即预压缩（可选）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import argparse
+import gzip
+import os
+import re
+import sys
+from typing import Dict, Iterable, List
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 参与预压缩的文件类型
+PRECOMPRESS_SUFFIXES = ('.html', '.css', '.json')
+
+# 前后空白可以安全删除的块级标签
+_BLOCK_TAGS = frozenset((
+    'html', 'head', 'body', 'title', 'meta', 'link', 'style', 'script', 'div', 'header', 'footer',
+    'main', 'section', 'article', 'nav', 'aside', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul',
+    'ol', 'li', 'table', 'thead', 'tbody', 'tr', 'td', 'th', 'br', 'hr', 'form', '!doctype',
+))
+
+# 内容需原样保留的元素
+_PRESERVE_RE = re.compile(r'(<(pre|textarea|script)\b.*?</\2\s*>)', re.S | re.I)
+_STYLE_RE = re.compile(r'(<style\b[^>]*>)(.*?)(</style\s*>)', re.S | re.I)
+_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+_GAP_RE = re.compile(r'(<[^<>]*>)(\s+)(?=(<[^<>]*>))')
+_TAG_NAME_RE = re.compile(r'</?\s*([!\w-]+)')
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def _is_block(tag: str) -> bool:
+    match = _TAG_NAME_RE.match(tag)
+    return bool(match) and match.group(1).lower() in _BLOCK_TAGS
+
+
+def minify_css(css: str) -> str:
+    """压缩 CSS：去掉注释与标点前后的空白"""
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = re.sub(r'\s+', ' ', css)
+    css = _CSS_PUNCT_RE.sub(r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def _minify_markup(html: str) -> str:
+    html = _COMMENT_RE.sub('', html)
+    html = _STYLE_RE.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), html)
+
+    # 块级标签之间的空白直接删除；行内元素之间保留一个空格，避免改变排版
+    def gap(match):
+        if _is_block(match.group(1)) or _is_block(match.group(3)):
+            return match.group(1)
+        return match.group(1) + ' '
+
+    html = _GAP_RE.sub(gap, html)
+    return re.sub(r'\s+', ' ', html)
+
+
+def minify_html(html: str) -> str:
+    """
+    压缩 HTML
+
+    <pre>、<textarea>、<script> 的内容原样保留；其余文本中的连续空白
+    折叠为一个空格（浏览器渲染时本就如此处理）。
+
+    Args:
+        html: HTML 文本
+
+    Returns:
+        压缩后的 HTML
+    """
+    parts = _PRESERVE_RE.split(html)
+    # split 的结果按 [普通, 保留块, 标签名, 普通, ...] 排列
+    result = []
+    for i in range(0, len(parts), 3):
+        result.append(_minify_markup(parts[i]))
+        if i + 1 < len(parts):
+            result.append(parts[i + 1])
+    return ''.join(result).strip() + '\n'
+
+
+def precompress_file(path: str, minify: bool = True) -> Dict[str, int]:
+    """
+    预压缩单个文件
+
+    Args:
+        path: 文件路径（HTML 会先原地压缩）
+        minify: 是否压缩 HTML / CSS
+
+    Returns:
+        各变体的字节数：{'original': ..., 'minified': ..., 'gzip': ..., 'brotli': ...}
+        （未安装 brotli 时没有 'brotli'）
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    sizes = {'original': len(raw)}
+
+    data = raw
+    if minify and path.endswith(('.html', '.css')):
+        text = raw.decode('utf-8')
+        text = minify_html(text) if path.endswith('.html') else minify_css(text) + '\n'
+        data = text.encode('utf-8')
+        if data != raw:
+            _write_atomic(path, data)
+    sizes['minified'] = len(data)
+
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    _write_atomic(path + '.gz', compressed)
+    sizes['gzip'] = len(compressed)
+
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+        _write_atomic(path + '.br', compressed)
+        sizes['brotli'] = len(compressed)
+
+    return sizes
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def format_savings(sizes: Dict[str, int]) -> str:
+    """把 precompress_file 的结果格式化为一行说明"""
+    original = sizes['original'] or 1
+    parts = [f"压缩 HTML {sizes['minified'] / 1024:.1f} KB"]
+    for key, label in (('gzip', 'gzip'), ('brotli', 'brotli')):
+        if key in sizes:
+            parts.append(f"{label} {sizes[key] / 1024:.1f} KB (-{(1 - sizes[key] / original) * 100:.0f}%)")
+    return ' | '.join(parts)
+
+
+def precompress_enabled() -> bool:
+    """是否通过环境变量 REPORT_PRECOMPRESS 启用预压缩"""
+    return os.environ.get('REPORT_PRECOMPRESS', '').lower() in ('1', 'true', 'yes')
+
+
+def iter_targets(paths: Iterable[str]) -> Iterable[str]:
+    """遍历目录，产出需要预压缩的文件"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith(PRECOMPRESS_SUFFIXES):
+                    yield os.path.join(root, name)
+
+
+def precompress_tree(paths: List[str], minify: bool = True) -> Dict[str, int]:
+    """
+    预压缩目录中的所有 HTML / CSS / JSON 文件
+
+    Returns:
+        全部文件各变体字节数之和，另含 'files'（文件数）
+    """
+    totals = {'files': 0, 'original': 0, 'minified': 0, 'gzip': 0}
+    if brotli is not None:
+        totals['brotli'] = 0
+    for path in iter_targets(paths):
+        for key, value in precompress_file(path, minify).items():
+            totals[key] += value
+        totals['files'] += 1
+    return totals
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="静态页面预压缩")
+    parser.add_argument('paths', nargs='*', default=['pages'],
+                        help="要预压缩的目录或文件 (默认: pages)")
+    parser.add_argument('--no-minify', action='store_true',
+                        help="不压缩 HTML / CSS，只生成压缩变体")
+    args = parser.parse_args()
+
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    if missing:
+        print(f"❌ 路径不存在: {', '.join(missing)}")
+        sys.exit(1)
+
+    if brotli is None:
+        print("ℹ️  未安装 brotli，只生成 .gz 变体")
+
+    totals = precompress_tree(args.paths, minify=not args.no_minify)
+    print(f"✅ 已预压缩 {totals['files']} 个文件，原始 {totals['original'] / 1024:.1f} KB")
+    print(f"📦 {format_savings(totals)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 中转服务的客户端限流
+
+功能：
+- 令牌桶限流：同时限制每分钟请求数与每分钟 token 数
+- 遵守服务端返回的 Retry-After
+- AIMD 自适应并发：被限流时并发减半，服务正常时逐步加一
+
+环境变量：
+- LLM_RPM: 每分钟最大请求数（可选，默认：0，不限制）
+- LLM_TPM: 每分钟最大 token 数（可选，默认：0，不限制）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class ThrottledError(Exception):
+    """服务端限流（HTTP 429 / 503）"""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数或 HTTP 日期
+
+    Returns:
+        需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """令牌桶，rate_per_min <= 0 表示不限制"""
+
+    def __init__(self, rate_per_min: float, capacity: float = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity if capacity is not None else max(rate_per_min, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """
+        预留令牌（允许透支），调用方需在锁内调用
+
+        Returns:
+            需要等待的秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """归还（正数）或追加扣除（负数）令牌"""
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """请求数 + token 数双令牌桶限流器，线程安全"""
+
+    def __init__(self, requests_per_min: float = 0, tokens_per_min: float = 0):
+        """
+        初始化限流器
+
+        Args:
+            requests_per_min: 每分钟最大请求数（<= 0 不限制）
+            tokens_per_min: 每分钟最大 token 数（<= 0 不限制）
+        """
+        self.requests = TokenBucket(requests_per_min)
+        self.tokens = TokenBucket(tokens_per_min)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        """根据环境变量创建限流器"""
+        return cls(
+            requests_per_min=float(os.environ.get('LLM_RPM', '0')),
+            tokens_per_min=float(os.environ.get('LLM_TPM', '0'))
+        )
+
+    def acquire(self, tokens: float = 0):
+        """阻塞直到允许发送一个预计消耗 tokens 的请求"""
+        with self._lock:
+            wait = max(self.requests.reserve(1), self.tokens.reserve(tokens),
+                       self._paused_until - time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+
+    def record_usage(self, estimated: float, actual: float):
+        """用服务端返回的实际 token 数修正预估值"""
+        with self._lock:
+            self.tokens.refund(estimated - actual)
+
+    def pause(self, seconds: float):
+        """在 seconds 秒内暂停所有请求（用于 Retry-After）"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """AIMD 自适应并发限制，可作为上下文管理器使用"""
+
+    def __init__(self, max_limit: int, min_limit: int = 1, cooldown: float = 1.0):
+        """
+        初始化并发限制
+
+        Args:
+            max_limit: 并发上限（初始值）
+            min_limit: 并发下限
+            cooldown: 两次减半之间的最小间隔（秒），避免同一波限流被重复惩罚
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(self.max_limit)
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def on_success(self):
+        """加性增：每个成功请求增加 1/limit，约每轮并发 +1"""
+        with self._cond:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def on_throttle(self):
+        """乘性减：并发减半"""
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._last_decrease = now
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热搜与创意记录类型
+
+功能：
+- Hotspot / Idea：带 __slots__ 的数据类，替代逐条构造的字典
+- 热搜词经 sys.intern 驻留，同一热搜词在抓取、历史、索引间共享一个字符串对象
+- weibo_url 等派生字段首次访问时才计算
+- to_dict / from_dict 与现有 JSON 文件（weibo_hotspots_*.json / weibo_ideas_*.json）字段一致；
+  Hotspot 同时支持 hotspot['hotword'] / hotspot.get(...) 形式的只读访问，兼容按字典读取的代码
+
+用法：
+from records import Hotspot, Idea, to_json
+
+hotspot = Hotspot.from_dict(item)
+json.dump(result, f, default=to_json)
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+WEIBO_SEARCH_URL = "https://s.weibo.com/weibo?q="
+
+
+@dataclass(slots=True)
+class Hotspot:
+    """单条热搜"""
+
+    rank: int
+    hotword: str
+    hotness: int = 0
+    hotword_num: str = ''
+    hot_tag: str = ''
+    _weibo_url: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    # 旧字典字段名 → 属性名
+    FIELDS = {
+        'rank': 'rank',
+        'hotword': 'hotword',
+        'hotword_num': 'hotword_num',
+        'hotword_num_int': 'hotness',
+        'hot_tag': 'hot_tag',
+        'weibo_url': 'weibo_url',
+    }
+
+    def __post_init__(self):
+        self.hotword = sys.intern(self.hotword)
+
+    @property
+    def weibo_url(self) -> str:
+        """微博搜索链接（首次访问时生成）"""
+        if self._weibo_url is None:
+            self._weibo_url = WEIBO_SEARCH_URL + quote(self.hotword)
+        return self._weibo_url
+
+    @classmethod
+    def from_dict(cls, item: Dict, rank: int = 0) -> 'Hotspot':
+        """
+        由热搜字典创建记录
+
+        Args:
+            item: fetch() 返回的 data 中的一项（或 JSON 文件中读出的同结构字典）
+            rank: 字典中没有 rank 时使用的排名
+
+        Returns:
+            Hotspot
+        """
+        hotness = item.get('hotword_num_int', 0)
+        value = item.get('rank')
+        return cls(
+            rank=value if isinstance(value, int) and value > 0 else rank,
+            hotword=item.get('hotword', ''),
+            hotness=int(hotness),
+            hotword_num=item.get('hotword_num', str(hotness)),
+            hot_tag=item.get('hot_tag') or '',
+        )
+
+    @classmethod
+    def coerce(cls, item, rank: int = 0) -> 'Hotspot':
+        """记录原样返回，字典转换为记录"""
+        return item if isinstance(item, cls) else cls.from_dict(item, rank)
+
+    def to_dict(self) -> Dict:
+        """转换为 JSON 文件中的热搜字典"""
+        return {
+            'rank': self.rank,
+            'hotword': self.hotword,
+            'hotword_num': self.hotword_num,
+            'hotword_num_int': self.hotness,
+            'hot_tag': self.hot_tag,
+            'weibo_url': self.weibo_url,
+        }
+
+    def idea_fields(self) -> Dict:
+        """创意中记录的热搜关联字段"""
+        return {'hotword': self.hotword, 'hotness': self.hotness, 'rank': self.rank}
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, self.FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def get(self, key: str, default: Any = None):
+        """按旧字典字段名读取"""
+        name = self.FIELDS.get(key)
+        return default if name is None else getattr(self, name)
+
+
+@dataclass(slots=True)
+class Idea:
+    """单个产品创意（含所属热搜）"""
+
+    name: str = ''
+    score: int = 0
+    fun_score: int = 0
+    use_score: int = 0
+    features: List[str] = field(default_factory=list)
+    target_users: str = ''
+    description: str = ''
+    hotword: Optional[str] = None
+    hotness: int = 0
+    rank: Optional[int] = None
+    duplicate_of: Optional[str] = None
+    reused_from: Optional[str] = None
+
+    def __post_init__(self):
+        if self.hotword is not None:
+            self.hotword = sys.intern(self.hotword)
+
+    @classmethod
+    def from_dict(cls, item: Dict) -> 'Idea':
+        """
+        由创意字典创建记录
+
+        Args:
+            item: weibo_ideas_*.json 中 ideas 的一项
+
+        Returns:
+            Idea（rank 不是整数时为 None，即旧数据中的 "?"）
+        """
+        rank = item.get('rank')
+        hotword = item.get('hotword')
+        return cls(
+            name=item.get('name', ''),
+            score=item.get('score', 0),
+            fun_score=item.get('fun_score', 0),
+            use_score=item.get('use_score', 0),
+            features=item.get('features', []),
+            target_users=item.get('target_users', ''),
+            description=item.get('description', ''),
+            hotword=hotword if isinstance(hotword, str) else None,
+            hotness=item.get('hotness', 0),
+            rank=rank if isinstance(rank, int) else None,
+            duplicate_of=item.get('duplicate_of'),
+            reused_from=item.get('reused_from'),
+        )
+
+    def to_dict(self) -> Dict:
+        """转换为 JSON 文件中的创意字典（未设置的关联字段不输出）"""
+        data = {
+            'name': self.name,
+            'score': self.score,
+            'fun_score': self.fun_score,
+            'use_score': self.use_score,
+            'features': self.features,
+            'target_users': self.target_users,
+            'description': self.description,
+        }
+        if self.hotword is not None:
+            data.update(hotword=self.hotword, hotness=self.hotness,
+                        rank='?' if self.rank is None else self.rank)
+        if self.duplicate_of:
+            data['duplicate_of'] = self.duplicate_of
+        if self.reused_from:
+            data['reused_from'] = self.reused_from
+        return data
+
+
+def to_json(obj):
+    """json.dump 的 default 钩子：把记录转换为字典"""
+    if isinstance(obj, (Hotspot, Idea)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
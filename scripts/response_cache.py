@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 响应磁盘缓存（内容寻址）
+
+功能：
+- 以 (键文本, 模型, 端点) 的 SHA-256 作为键缓存模型返回内容；键文本由调用方给出，
+  可以是完整提示词，也可以是去掉易变内容（如热度）的稳定形式
+- 支持 TTL 过期与按条目数 / 字节数的 LRU 淘汰
+- 统计命中 / 未命中次数
+
+环境变量：
+- LLM_CACHE: 设为 0 / off 关闭缓存（可选，默认：开启）
+- LLM_CACHE_DIR: 缓存目录（可选，默认：.cache/llm_responses）
+- LLM_CACHE_TTL: 缓存有效期，单位秒（可选，默认：604800，即 7 天）
+- LLM_CACHE_MAX_ENTRIES: 最大条目数（可选，默认：2000）
+- LLM_CACHE_MAX_BYTES: 最大总字节数（可选，默认：52428800，即 50 MB）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    """基于文件的 LLM 响应缓存，线程安全"""
+
+    def __init__(self, cache_dir: str = '.cache/llm_responses', ttl: float = 7 * 24 * 3600,
+                 max_entries: int = 2000, max_bytes: int = 50 * 1024 * 1024):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl: 有效期（秒），<= 0 表示永不过期
+            max_entries: 最大条目数
+            max_bytes: 最大总字节数
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional['ResponseCache']:
+        """根据环境变量创建缓存，LLM_CACHE=0/off 时返回 None"""
+        if os.environ.get('LLM_CACHE', '1').lower() in ('0', 'off', 'false', 'no'):
+            return None
+        return cls(
+            cache_dir=os.environ.get('LLM_CACHE_DIR', '.cache/llm_responses'),
+            ttl=float(os.environ.get('LLM_CACHE_TTL', str(7 * 24 * 3600))),
+            max_entries=int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '2000')),
+            max_bytes=int(os.environ.get('LLM_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+        )
+
+    @staticmethod
+    def make_key(key_text: str, model: str, endpoint: str) -> str:
+        """计算缓存键"""
+        digest = hashlib.sha256()
+        for part in (endpoint, model, key_text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key_text: str, model: str, endpoint: str) -> Optional[str]:
+        """
+        读取缓存
+
+        Returns:
+            缓存的响应内容，未命中或已过期时返回 None
+        """
+        path = self._path(self.make_key(key_text, model, endpoint))
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is not None and self.ttl > 0 and time.time() - entry.get('created', 0) > self.ttl:
+            self._remove(path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        # 更新 mtime 作为 LRU 的访问时间
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return entry.get('content')
+
+    def put(self, key_text: str, model: str, endpoint: str, content: str):
+        """写入缓存（原子替换），并在超出上限时淘汰最久未使用的条目"""
+        path = self._path(self.make_key(key_text, model, endpoint))
+        entry = {
+            'created': time.time(),
+            'model': model,
+            'endpoint': endpoint,
+            'content': content
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """按 LRU 淘汰超出条目数或字节数上限的缓存"""
+        with self._lock:
+            entries = []
+            total_bytes = 0
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_bytes += stat.st_size
+
+            if len(entries) <= self.max_entries and total_bytes <= self.max_bytes:
+                return
+
+            entries.sort()
+            count = len(entries)
+            for _, size, path in entries:
+                if count <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+                self._remove(path)
+                count -= 1
+                total_bytes -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        """命中统计"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
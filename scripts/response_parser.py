@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型响应中的 JSON 提取
+
+功能：
+- 定位第一个顶层包含指定键（如 "ideas"）且其值为数组的 JSON 对象，
+  兼容纯 JSON、```json 代码块以及前后夹带说明文字的响应
+- 快速路径：从每个候选 '{' 起用 json 的 C 扫描器（JSONDecoder.raw_decode）原地解析，
+  不复制子串、不回溯；不含该键的对象整体跳过，因此通常只需一遍
+- 修复路径（仅在解析失败时）：单遍括号匹配（预编译正则直接跳到下一个括号 / 引号，
+  字符串内容整段跳过）定位对象边界；响应在对象中途被截断（如达到 max_tokens）时，
+  保留最后一个完整的数组元素 / 成员并补齐括号；另外容忍多余的结尾逗号
+
+用法：
+from response_parser import extract_json
+
+data = extract_json(content, 'ideas')
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import json
+import re
+from typing import Dict, Optional, Tuple
+
+# 字符串外需要关注的字符
+_STRUCTURE_RE = re.compile(r'[{}\[\]"]')
+# 字符串内需要关注的字符
+_STRING_RE = re.compile(r'["\\]')
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+_DECODER = json.JSONDecoder()
+
+# _match_object 的返回状态
+_COMPLETE, _TRUNCATED, _MISMATCHED = 0, 1, 2
+
+
+def _match_object(text: str, start: int) -> Tuple[int, int, int, str]:
+    """
+    从 text[start] 的 '{' 开始匹配到对应的 '}'
+
+    Returns:
+        (状态, 结束位置, 截断时可安全截取的位置, 该位置需补齐的括号)
+        结束位置为对象闭合后的下标；可安全截取的位置是顶层对象的成员
+        或其数组值中最后一个完整元素之后（没有时为 -1）
+    """
+    stack = []
+    safe, safe_closers = -1, ''
+    structure = _STRUCTURE_RE.search
+    string = _STRING_RE.search
+    i = start
+
+    while True:
+        match = structure(text, i)
+        if match is None:
+            return _TRUNCATED, len(text), safe, safe_closers
+        ch = match.group()
+        i = match.end()
+
+        if ch == '"':
+            while True:
+                match = string(text, i)
+                if match is None:
+                    return _TRUNCATED, len(text), safe, safe_closers
+                i = match.end()
+                if match.group() == '"':
+                    break
+                i += 1  # 跳过被转义的字符
+        elif ch in '{[':
+            stack.append(ch)
+        else:
+            if not stack or _CLOSERS[stack.pop()] != ch:
+                return _MISMATCHED, i, safe, safe_closers
+            if not stack:
+                return _COMPLETE, i, safe, safe_closers
+            if len(stack) <= 2:
+                safe = i
+                safe_closers = ''.join(_CLOSERS[c] for c in reversed(stack))
+
+
+def _loads(text: str) -> Optional[Dict]:
+    """解析 JSON 对象，失败时去掉结尾逗号再试一次"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        fixed = _TRAILING_COMMA_RE.sub(r'\1', text)
+        if fixed == text:
+            return None
+        try:
+            data = json.loads(fixed)
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def _repair(content: str, start: int, repair: bool) -> Optional[Dict]:
+    """解析失败的对象：去掉结尾逗号，或截取被截断对象中完整的部分"""
+    status, end, safe, closers = _match_object(content, start)
+    if status == _COMPLETE:
+        return _loads(content[start:end])
+    if status == _TRUNCATED and repair and safe > 0:
+        return _loads(content[start:safe] + closers)
+    return None
+
+
+def _has_list(data, key: str) -> bool:
+    """对象的顶层 key 是否为数组（如 {"meta": {"ideas": "no"}} 中的内层对象不算）"""
+    return isinstance(data, dict) and isinstance(data.get(key), list)
+
+
+def extract_json(content: str, key: str, repair: bool = True) -> Dict:
+    """
+    从响应文本中提取包含指定键的 JSON 对象
+
+    Args:
+        content: 模型返回的文本
+        key: 对象必须包含的顶层键（如 'ideas' / 'results'）
+        repair: 是否尝试修复被截断的对象
+
+    Returns:
+        第一个顶层 key 的值为数组的 JSON 对象（整段文本本身即是这样的对象时直接返回；
+        key 只出现在内层时返回内层对象，与夹带说明文字的响应一致）
+
+    Raises:
+        ValueError: 未找到 key 的值为数组的 JSON 对象
+    """
+    stripped = content.strip()
+    if stripped.startswith('{') and stripped.endswith('}'):
+        try:
+            data = json.loads(stripped)
+            if _has_list(data, key):
+                return data
+        except ValueError:
+            pass
+
+    marker = f'"{key}"'
+    found = False
+    pos = 0
+    while True:
+        start = content.find('{', pos)
+        if start < 0:
+            break
+        try:
+            data, end = _DECODER.raw_decode(content, start)
+        except ValueError:
+            if content.find(marker, start) < 0:
+                break
+            found = True
+            data = _repair(content, start, repair)
+            if data is not None and _has_list(data, key):
+                return data
+            pos = start + 1
+            continue
+
+        if _has_list(data, key):
+            return data
+        # 键在更深层时到对象内部继续查找，否则整体跳过
+        pos = start + 1 if content.find(marker, start, end) >= 0 else end
+
+    if found:
+        raise ValueError(f'响应中包含 "{key}"，但无法解析为 JSON 对象')
+    raise ValueError("响应中未找到有效的 JSON 数据")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 调用的重试与对冲请求
+
+功能：
+- 按错误类别（网络错误 / 5xx / JSON 解析失败）分别配置重试次数
+- 带全抖动（full jitter）的指数退避
+- 记录请求耗时并计算 p95，用作对冲请求的触发延迟
+- 对冲请求：首个请求超过延迟仍未返回时再发一个，取先成功的结果
+
+环境变量：
+- LLM_RETRY_NETWORK: 网络错误的重试次数（可选，默认：3）
+- LLM_RETRY_SERVER: 5xx 错误的重试次数（可选，默认：2）
+- LLM_RETRY_PARSE: JSON 解析失败的重试次数（可选，默认：1）
+- LLM_RETRY_BASE_DELAY / LLM_RETRY_MAX_DELAY: 退避基数与上限，单位秒（可选，默认：1 / 30）
+- LLM_HEDGE: 设为 1 启用对冲请求（可选，默认：关闭）
+- LLM_HEDGE_DELAY: 样本不足时的对冲延迟，单位秒（可选，默认：20）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import os
+import queue
+import random
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from http_client import HTTPStatusError, NetworkError
+from rate_limit import ThrottledError
+
+NETWORK = 'network'
+SERVER = 'server'
+PARSE = 'parse'
+
+
+class RetryPolicy:
+    """按错误类别区分的重试策略"""
+
+    def __init__(self, max_retries: Dict[str, int] = None, base_delay: float = 1.0,
+                 max_delay: float = 30.0):
+        """
+        初始化重试策略
+
+        Args:
+            max_retries: 错误类别 -> 最大重试次数
+            base_delay: 退避基数（秒）
+            max_delay: 单次退避上限（秒）
+        """
+        self.max_retries = {NETWORK: 3, SERVER: 2, PARSE: 1}
+        self.max_retries.update(max_retries or {})
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls) -> 'RetryPolicy':
+        """根据环境变量创建重试策略"""
+        return cls(
+            max_retries={
+                NETWORK: int(os.environ.get('LLM_RETRY_NETWORK', '3')),
+                SERVER: int(os.environ.get('LLM_RETRY_SERVER', '2')),
+                PARSE: int(os.environ.get('LLM_RETRY_PARSE', '1'))
+            },
+            base_delay=float(os.environ.get('LLM_RETRY_BASE_DELAY', '1')),
+            max_delay=float(os.environ.get('LLM_RETRY_MAX_DELAY', '30'))
+        )
+
+    @staticmethod
+    def classify(error: Exception) -> Optional[str]:
+        """
+        判断错误类别
+
+        Returns:
+            network / server / parse，不可重试的错误返回 None
+        """
+        if isinstance(error, ThrottledError):
+            # 限流已在 _call_throttled 中按 Retry-After 重试过
+            return None
+        if isinstance(error, NetworkError):
+            return NETWORK
+        if isinstance(error, HTTPStatusError):
+            return SERVER if error.status >= 500 else None
+        if isinstance(error, ValueError):
+            return PARSE
+        return None
+
+    def should_retry(self, kind: Optional[str], retries: int) -> bool:
+        """该类别已重试 retries 次后是否还能继续重试"""
+        return kind is not None and retries < self.max_retries.get(kind, 0)
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（全抖动指数退避）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """最近 N 次请求耗时的滑动窗口，线程安全"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """返回 p 分位耗时（0 < p < 1），没有样本时返回 None"""
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def hedged_call(fn: Callable, delay: float, backup: Callable = None):
+    """
+    对冲调用：fn 在 delay 秒内未返回时再并发调用一次，取先成功的结果
+
+    落后的请求在后台线程中自然结束（其连接会归还连接池）。
+
+    Args:
+        fn: 无参调用
+        delay: 触发对冲的等待时间（秒）
+        backup: 对冲时使用的调用（可选，默认与 fn 相同）
+
+    Returns:
+        fn 的返回值
+
+    Raises:
+        Exception: 所有已发出的请求都失败时，抛出第一个错误
+    """
+    outcomes = queue.Queue()
+
+    def attempt(call: Callable):
+        try:
+            outcomes.put((None, call()))
+        except Exception as e:
+            outcomes.put((e, None))
+
+    threading.Thread(target=attempt, args=(fn,), daemon=True).start()
+    launched = 1
+
+    try:
+        error, result = outcomes.get(timeout=delay)
+    except queue.Empty:
+        threading.Thread(target=attempt, args=(backup or fn,), daemon=True).start()
+        launched = 2
+        error, result = outcomes.get()
+
+    if error is None:
+        return result
+
+    if launched == 2:
+        second_error, second_result = outcomes.get()
+        if second_error is None:
+            return second_result
+
+    raise error
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+微博热搜分析流水线（单进程）
+
+功能：
+- 在一个进程内依次执行 抓取 → 分析 → 生成报告
+- 各阶段之间直接传递内存对象，不再通过 glob 查找并反序列化中间 JSON
+- 可单独选择要执行的阶段；未执行的上游阶段会回退为读取最新的 JSON 文件
+- 中间 JSON 的持久化可关闭
+- 常驻轮询模式：榜单变化时才保存快照，且只分析新进入前 N 名的热搜
+- 可按上升趋势（trend_engine.py）而非排名选取待分析的热搜
+
+用法：
+python scripts/run_pipeline.py [--stages fetch,analyze,render] [--no-persist] [--resume] [--incremental] [--limit 10]
+                              [--select top|rising]
+python scripts/run_pipeline.py --watch [--interval 60] [--max-polls N]
+
+环境变量：
+- TIANAPI_KEY / WEIBO_HISTORY_DB / WEIBO_ARCHIVE_DIR / WEIBO_POLL_INTERVAL: 见 fetch_weibo_hot.py
+- API_ENDPOINT / API_KEY / API_MODEL 等: 见 claude_analysis.py
+- HOTSPOT_SELECTION: 待分析热搜的选取方式，top（默认，按排名）或 rising（按上升趋势，需要历史库或列式归档与 numpy，设置了 WEIBO_ARCHIVE_DIR 时优先使用归档）
+- TREND_HISTORY / TREND_ALPHA / TREND_MIN_Z: 见 trend_engine.py
+- REPORT_ASSET_DIR / REPORT_ASSET_PREFIX / REPORT_PRECOMPRESS: 见 generate_html_report.py
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from claude_analysis import create_analyzer_from_env, incremental_from_env
+from fetch_weibo_hot import WeiboHotspotFetcher
+from generate_html_report import HTMLReportGenerator
+from records import Hotspot
+from text_utils import normalize_hotword
+from trend_engine import TrendEngine, history_source_exists, open_history_source, select_rising
+
+STAGES = ('fetch', 'analyze', 'render')
+SELECTIONS = ('top', 'rising')
+
+
+class Pipeline:
+    """抓取 → 分析 → 渲染 流水线"""
+
+    def __init__(self, stages: List[str], persist: bool = True, limit: int = 10,
+                 resume: bool = False, report_file: str = None, incremental: bool = False,
+                 selection: str = 'top'):
+        """
+        初始化流水线
+
+        Args:
+            stages: 要执行的阶段
+            persist: 是否写出中间 JSON（weibo_hotspots_*.json / weibo_ideas_*.json）
+            limit: 分析的热搜数量
+            resume: 分析阶段是否从检查点恢复
+            report_file: 报告输出路径（可选）
+            incremental: 分析阶段是否复用历史库中的分析结果
+            selection: 待分析热搜的选取方式（top: 按排名；rising: 按上升趋势）
+        """
+        self.stages = stages
+        self.persist = persist
+        self.limit = limit
+        self.resume = resume
+        self.report_file = report_file
+        self.incremental = incremental
+        self.selection = selection
+        self.hotspots_data: Optional[Dict] = None
+        self.hotspots_source = ''
+        self.ideas_data: Optional[Dict] = None
+
+    def run(self) -> Optional[str]:
+        """
+        执行所选阶段
+
+        Returns:
+            生成的报告路径（未执行 render 阶段时为 None）
+        """
+        report = None
+        for stage in STAGES:
+            if stage not in self.stages:
+                continue
+            print(f"\n{'=' * 60}\n▶️  阶段: {stage}\n{'=' * 60}")
+            started = time.monotonic()
+            if stage == 'fetch':
+                self.fetch()
+            elif stage == 'analyze':
+                self.analyze()
+            else:
+                report = self.render()
+            print(f"\n⏱️  阶段 {stage} 耗时 {time.monotonic() - started:.1f} 秒")
+        return report
+
+    def watch(self, interval: float, max_polls: int = None):
+        """
+        常驻轮询：榜单变化时执行分析与渲染
+
+        分析器在整个会话中复用；已成功分析过的热搜（按归一化热搜词）
+        直接复用创意，只有新进入前 limit 名的热搜才会调用 LLM。
+
+        Args:
+            interval: 轮询间隔（秒）
+            max_polls: 最多轮询次数（可选，默认不限制）
+        """
+        fetcher = WeiboHotspotFetcher(os.environ.get('TIANAPI_KEY', 'd67242c73185cde1f94039cb55e4a3ee'))
+        analyzer = self._create_analyzer() if 'analyze' in self.stages else None
+        analyzed: Dict[str, List[Dict]] = {}
+
+        def on_change(result: Dict, new_items: List[Dict]):
+            self.hotspots_data = result
+            if analyzer:
+                hotspots = self._select_hotspots(analyzer, result)
+                pending = [h for h in hotspots if normalize_hotword(h.hotword) not in analyzed]
+                by_hotword: Dict[str, List[Dict]] = {}
+                if pending:
+                    for idea in analyzer.analyze_batch(pending):
+                        by_hotword.setdefault(idea['hotword'], []).append(idea)
+                    for hotspot in pending:
+                        ideas = by_hotword.get(hotspot.hotword, [])
+                        # 失败的热搜不记录，下次变化时重新分析
+                        if ideas and all(idea['score'] > 0 for idea in ideas):
+                            analyzed[normalize_hotword(hotspot.hotword)] = ideas
+                else:
+                    print(f"\n♻️  前 {len(hotspots)} 名均已分析，跳过 LLM 调用")
+
+                ideas = []
+                for hotspot in hotspots:
+                    source = analyzed.get(normalize_hotword(hotspot.hotword)) \
+                        or by_hotword.get(hotspot.hotword, [])
+                    ideas.extend(dict(idea, **hotspot.idea_fields()) for idea in source)
+
+                if self.persist:
+                    self.ideas_data = analyzer.save_ideas(ideas)
+                else:
+                    self.ideas_data = analyzer.build_output(ideas)
+                    analyzer.print_statistics(self.ideas_data)
+            if 'render' in self.stages:
+                self.render()
+
+        try:
+            fetcher.poll(interval, on_change, max_polls=max_polls, persist=self.persist,
+                         db_path=os.environ.get('WEIBO_HISTORY_DB') or None)
+        finally:
+            if analyzer:
+                analyzer.close()
+
+    def fetch(self):
+        """抓取热搜"""
+        fetcher = WeiboHotspotFetcher(os.environ.get('TIANAPI_KEY', 'd67242c73185cde1f94039cb55e4a3ee'))
+        print("\n🌐 正在抓取微博热搜...")
+        result = fetcher.fetch()
+        fetcher.print_summary(result)
+
+        if self.persist:
+            self.hotspots_source = fetcher.save_to_file(result)
+        if os.environ.get('WEIBO_HISTORY_DB'):
+            fetcher.save_to_store(result, source=self.hotspots_source)
+        if os.environ.get('WEIBO_ARCHIVE_DIR'):
+            fetcher.save_to_archive(result)
+        self.hotspots_data = result
+
+    def _create_analyzer(self):
+        """创建分析器，按需启用增量分析"""
+        analyzer = create_analyzer_from_env()
+        print(f"\n📡 API 端点: {analyzer.endpoint}")
+        print(f"🤖 模型: {analyzer.model}")
+        if self.incremental:
+            analyzer.enable_incremental(float(os.environ.get('ANALYSIS_REANALYZE_RATIO', '2.0')))
+            print(f"🗄️  增量分析: {analyzer.history.path}")
+        return analyzer
+
+    def _select_hotspots(self, analyzer, data: Dict, source: str = '') -> List[Hotspot]:
+        """
+        选取待分析的热搜
+
+        rising 模式下按历史库（或列式归档）中的上升趋势重排后再截取前 limit 个；
+        未安装 numpy、数据源不存在或历史快照不足时回退为按排名选取。
+        """
+        if self.selection == 'rising':
+            trends = self._load_trends()
+            if trends is not None:
+                rising = trends.rising(self.limit)
+                print(f"\n🚀 按上升趋势选取（{len(trends.fetch_times)} 个快照，上升话题 {len(rising)} 个）")
+                data = dict(data, data=select_rising(data, trends, self.limit))
+        return analyzer.select_hotspots(data, self.limit, source)
+
+    def _load_trends(self):
+        """计算上升趋势，条件不满足时打印原因并返回 None"""
+        try:
+            engine = TrendEngine.from_env()
+        except ImportError as e:
+            print(f"\n⚠️  {str(e)}，按排名选取")
+            return None
+        if not history_source_exists():
+            print("\n⚠️  历史库 / 列式归档不存在，按排名选取")
+            return None
+
+        with open_history_source() as store:
+            trends = engine.from_store(store)
+        if len(trends.fetch_times) < 3:
+            print("\n⚠️  历史快照不足 3 个，按排名选取")
+            return None
+        return trends
+
+    def analyze(self):
+        """分析热搜并生成创意"""
+        analyzer = self._create_analyzer()
+
+        if self.hotspots_data is None:
+            self.hotspots_source = analyzer.find_latest_hotspot_data()
+            print(f"📂 读取热搜文件: {self.hotspots_source}")
+            with open(self.hotspots_source, 'r', encoding='utf-8') as f:
+                self.hotspots_data = json.load(f)
+
+        hotspots = self._select_hotspots(analyzer, self.hotspots_data, self.hotspots_source)
+        analyzer.enable_checkpoint(resume=self.resume)
+
+        try:
+            ideas = analyzer.analyze_batch(hotspots)
+            if self.persist:
+                self.ideas_data = analyzer.save_ideas(ideas)
+            else:
+                self.ideas_data = analyzer.build_output(ideas)
+                analyzer.print_statistics(self.ideas_data)
+        finally:
+            analyzer.close()
+
+    def render(self) -> str:
+        """生成 HTML 报告"""
+        generator = HTMLReportGenerator.from_env()
+        if self.ideas_data is None:
+            generator.load_latest_data()
+            if self.hotspots_data is not None:
+                generator.hotspots_data = self.hotspots_data
+        else:
+            generator.load_data(self.ideas_data, self.hotspots_data)
+
+        return generator.write_report(self.report_file)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="微博热搜分析流水线")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help="要执行的阶段，逗号分隔 (默认: fetch,analyze,render)")
+    parser.add_argument('--no-persist', action='store_true',
+                        help="不写出中间 JSON 文件")
+    parser.add_argument('--resume', action='store_true',
+                        help="分析阶段从检查点恢复")
+    parser.add_argument('--incremental', action='store_true',
+                        help="分析阶段复用历史库中已分析且热度未大幅变化的热搜")
+    parser.add_argument('--limit', type=int, default=10,
+                        help="分析的热搜数量 (默认: 10)")
+    parser.add_argument('--select', choices=SELECTIONS,
+                        default=os.environ.get('HOTSPOT_SELECTION', 'top'),
+                        help="待分析热搜的选取方式：top 按排名，rising 按上升趋势 (默认: top)")
+    parser.add_argument('--output', default=None,
+                        help="报告输出路径 (默认: weibo_hotspot_report_YYYYMMDD_HHMMSS.html)")
+    parser.add_argument('--watch', action='store_true',
+                        help="常驻轮询模式，榜单变化时才分析新上榜的热搜")
+    parser.add_argument('--interval', type=float,
+                        default=float(os.environ.get('WEIBO_POLL_INTERVAL', '60')),
+                        help="轮询间隔秒数 (默认: 60)")
+    parser.add_argument('--max-polls', type=int, default=None,
+                        help="最多轮询次数 (默认不限制)")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        print(f"\n❌ 错误: 未知阶段 {', '.join(unknown)}，可选: {', '.join(STAGES)}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("微博热搜分析流水线")
+    print("=" * 60)
+
+    try:
+        pipeline = Pipeline(stages, persist=not args.no_persist, limit=args.limit,
+                            resume=args.resume, report_file=args.output,
+                            incremental=args.incremental or incremental_from_env(),
+                            selection=args.select)
+        if args.watch:
+            pipeline.watch(args.interval, max_polls=args.max_polls)
+        else:
+            pipeline.run()
+
+        print("\n✅ 流水线完成!")
+        sys.exit(0)
+
+    except FileNotFoundError as e:
+        print(f"\n❌ 错误: {str(e)}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"\n❌ 错误: {str(e)}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ 未知错误: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
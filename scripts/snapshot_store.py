@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+微博热搜快照历史库（SQLite）
+
+功能：
+- 以 WAL 模式的 SQLite 保存每次抓取的热搜榜单
+- 热搜词归一化存储（hotwords 表），每个快照的排名 / 热度单独成表
+- 索引 (hotword_id, fetch_time) 与 (fetch_time, rank)，支撑数千个快照下的毫秒级查询
+- 批量导入已有的 weibo_hotspots_*.json 文件
+- 记录每个热搜词最近一次的分析结果，供增量分析复用
+- 按列加载热度数据点，供趋势分析（trend_engine.py）向量化处理
+
+用法：
+python scripts/snapshot_store.py ingest [weibo_hotspots_*.json ...]
+python scripts/snapshot_store.py history <热搜词>
+python scripts/snapshot_store.py stats
+
+环境变量：
+- WEIBO_HISTORY_DB: 历史库路径（可选，默认：weibo_history.db）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import sys
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from records import Hotspot
+from text_utils import normalize_hotword
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotwords (
+    id INTEGER PRIMARY KEY,
+    hotword TEXT NOT NULL UNIQUE,
+    normalized TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_hotwords_normalized ON hotwords (normalized);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    fetch_time TEXT NOT NULL UNIQUE,
+    source TEXT,
+    total INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS snapshot_items (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    rank INTEGER NOT NULL,
+    hotword_id INTEGER NOT NULL REFERENCES hotwords (id),
+    fetch_time TEXT NOT NULL,
+    hotness INTEGER NOT NULL,
+    hotword_num TEXT,
+    hot_tag TEXT,
+    PRIMARY KEY (snapshot_id, rank)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_items_hotword_time ON snapshot_items (hotword_id, fetch_time);
+CREATE INDEX IF NOT EXISTS idx_items_time_rank ON snapshot_items (fetch_time, rank);
+
+CREATE TABLE IF NOT EXISTS analyzed_ideas (
+    hotword_id INTEGER PRIMARY KEY REFERENCES hotwords (id),
+    analyzed_at TEXT NOT NULL,
+    hotness INTEGER NOT NULL,
+    model TEXT,
+    ideas TEXT NOT NULL
+);
+"""
+
+
+def default_db_path() -> str:
+    """历史库默认路径"""
+    return os.environ.get('WEIBO_HISTORY_DB') or 'weibo_history.db'
+
+
+class SnapshotStore:
+    """热搜快照历史库"""
+
+    def __init__(self, path: str = None):
+        """
+        打开（必要时创建）历史库
+
+        Args:
+            path: 数据库文件路径（可选，默认见 default_db_path）
+        """
+        self.path = path or default_db_path()
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+        self._hotword_ids: Dict[str, int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        事务：异常时回滚，并清空热搜词 id 缓存
+
+        回滚会撤销事务中新插入的热搜词，缓存里对应的 id 已不存在（或会被其他词复用）。
+        """
+        try:
+            with self.conn:
+                yield
+        except BaseException:
+            self._hotword_ids.clear()
+            raise
+
+    def _hotword_id(self, hotword: str) -> int:
+        """获取热搜词 id，不存在时插入"""
+        hotword_id = self._hotword_ids.get(hotword)
+        if hotword_id is None:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO hotwords (hotword, normalized) VALUES (?, ?)',
+                (hotword, normalize_hotword(hotword))
+            )
+            hotword_id = self.conn.execute(
+                'SELECT id FROM hotwords WHERE hotword = ?', (hotword,)
+            ).fetchone()[0]
+            self._hotword_ids[hotword] = hotword_id
+        return hotword_id
+
+    def _insert_snapshot(self, result: Dict, source: str) -> Optional[int]:
+        """插入一个快照（不提交事务），已存在同一抓取时间的快照时返回 None"""
+        if not result.get('success', True) or not result.get('data'):
+            return None
+
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO snapshots (fetch_time, source, total) VALUES (?, ?, ?)',
+            (result['fetch_time'], source, len(result['data']))
+        )
+        if cursor.rowcount == 0:
+            return None
+
+        snapshot_id = cursor.lastrowid
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO snapshot_items '
+            '(snapshot_id, rank, hotword_id, fetch_time, hotness, hotword_num, hot_tag) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [
+                (snapshot_id, hotspot.rank, self._hotword_id(hotspot.hotword), result['fetch_time'],
+                 hotspot.hotness, hotspot.hotword_num, hotspot.hot_tag)
+                for hotspot in (Hotspot.coerce(item, idx) for idx, item in enumerate(result['data'], 1))
+            ]
+        )
+        return snapshot_id
+
+    def add_snapshot(self, result: Dict, source: str = '') -> Optional[int]:
+        """
+        保存一次抓取结果
+
+        Args:
+            result: WeiboHotspotFetcher.fetch() 的返回值
+            source: 来源文件名（可选）
+
+        Returns:
+            快照 id，抓取失败或重复时返回 None
+        """
+        with self._transaction():
+            return self._insert_snapshot(result, source)
+
+    def ingest_files(self, paths: Iterable[str]) -> int:
+        """
+        批量导入热搜 JSON 文件（单个事务）
+
+        Args:
+            paths: 文件路径列表
+
+        Returns:
+            新导入的快照数量
+        """
+        added = 0
+        with self._transaction():
+            for path in paths:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        result = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"  ⚠️  跳过 {path}: {str(e)}")
+                    continue
+                if self._insert_snapshot(result, os.path.basename(path)) is not None:
+                    added += 1
+        return added
+
+    def _load_snapshot(self, row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        """把快照行还原为 fetch() 返回值的结构"""
+        if row is None:
+            return None
+
+        items = self.conn.execute(
+            'SELECT i.rank, h.hotword, i.hotword_num, i.hotness, i.hot_tag '
+            'FROM snapshot_items i JOIN hotwords h ON h.id = i.hotword_id '
+            'WHERE i.snapshot_id = ? ORDER BY i.rank',
+            (row['id'],)
+        ).fetchall()
+
+        data = [Hotspot(rank=item['rank'], hotword=item['hotword'], hotness=item['hotness'],
+                        hotword_num=item['hotword_num'], hot_tag=item['hot_tag']).to_dict()
+                for item in items]
+
+        return {
+            'success': True,
+            'code': 200,
+            'message': 'success',
+            'data': data,
+            'fetch_time': row['fetch_time'],
+            'total': len(data)
+        }
+
+    def latest_snapshot(self) -> Optional[Dict]:
+        """最近一次快照"""
+        return self._load_snapshot(self.conn.execute(
+            'SELECT id, fetch_time FROM snapshots ORDER BY fetch_time DESC LIMIT 1'
+        ).fetchone())
+
+    def snapshot_at(self, fetch_time: str) -> Optional[Dict]:
+        """不晚于指定时间的最近一次快照"""
+        return self._load_snapshot(self.conn.execute(
+            'SELECT id, fetch_time FROM snapshots WHERE fetch_time <= ? '
+            'ORDER BY fetch_time DESC LIMIT 1',
+            (fetch_time,)
+        ).fetchone())
+
+    def hotword_history(self, hotword: str, since: str = None,
+                        normalized: bool = False) -> List[Dict]:
+        """
+        查询热搜词的历史排名与热度
+
+        Args:
+            hotword: 热搜词
+            since: 起始时间（可选，'YYYY-MM-DD HH:MM:SS'）
+            normalized: 是否按归一化形式匹配（合并不同写法）
+
+        Returns:
+            [{fetch_time, rank, hotness, hotword}, ...]，按时间升序
+        """
+        if normalized:
+            ids = [row[0] for row in self.conn.execute(
+                'SELECT id FROM hotwords WHERE normalized = ?', (normalize_hotword(hotword),)
+            )]
+        else:
+            row = self.conn.execute('SELECT id FROM hotwords WHERE hotword = ?', (hotword,)).fetchone()
+            ids = [row[0]] if row else []
+        if not ids:
+            return []
+
+        placeholders = ','.join('?' * len(ids))
+        rows = self.conn.execute(
+            f'SELECT i.fetch_time, i.rank, i.hotness, h.hotword '
+            f'FROM snapshot_items i JOIN hotwords h ON h.id = i.hotword_id '
+            f'WHERE i.hotword_id IN ({placeholders}) AND i.fetch_time >= ? '
+            f'ORDER BY i.fetch_time',
+            (*ids, since or '')
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def top_at(self, start: str, end: str, max_rank: int = 10) -> List[Dict]:
+        """
+        时间区间内每个快照的前 N 名
+
+        Returns:
+            [{fetch_time, rank, hotword, hotness}, ...]
+        """
+        rows = self.conn.execute(
+            'SELECT i.fetch_time, i.rank, h.hotword, i.hotness '
+            'FROM snapshot_items i JOIN hotwords h ON h.id = i.hotword_id '
+            'WHERE i.fetch_time BETWEEN ? AND ? AND i.rank <= ? '
+            'ORDER BY i.fetch_time, i.rank',
+            (start, end, max_rank)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load_points(self, since: str = None, last: int = None) -> Dict:
+        """
+        按列加载热度数据点
+
+        一次查询取出区间内全部快照条目，按列存入 array，
+        可直接以 numpy.frombuffer 零拷贝转换为数组。
+
+        Args:
+            since: 起始时间（可选，'YYYY-MM-DD HH:MM:SS'）
+            last: 只加载最近的 last 个快照（可选，与 since 同时给出时取较晚者）
+
+        Returns:
+            {
+                'fetch_times': [抓取时间, ...]（升序）,
+                'snapshot': array('q')  每个数据点所属快照在 fetch_times 中的下标,
+                'hotword_id': array('q'),
+                'rank': array('q'),
+                'hotness': array('q'),
+                'hotwords': {hotword_id: 热搜词}
+            }
+        """
+        since = since or ''
+        if last:
+            row = self.conn.execute(
+                'SELECT fetch_time FROM snapshots ORDER BY fetch_time DESC LIMIT 1 OFFSET ?',
+                (last - 1,)
+            ).fetchone()
+            if row is not None and row[0] > since:
+                since = row[0]
+
+        fetch_times = [row[0] for row in self.conn.execute(
+            'SELECT fetch_time FROM snapshots WHERE fetch_time >= ? ORDER BY fetch_time', (since,)
+        )]
+        rows = self.conn.execute(
+            'SELECT s.idx, i.hotword_id, i.rank, i.hotness '
+            'FROM snapshot_items i JOIN ('
+            '    SELECT id, ROW_NUMBER() OVER (ORDER BY fetch_time) - 1 AS idx '
+            '    FROM snapshots WHERE fetch_time >= ?'
+            ') s ON s.id = i.snapshot_id '
+            'WHERE i.fetch_time >= ? ORDER BY i.fetch_time, i.rank',
+            (since, since)
+        ).fetchall()
+        columns = list(zip(*rows)) or [(), (), (), ()]
+
+        hotwords = dict(self.conn.execute(
+            'SELECT id, hotword FROM hotwords WHERE id IN '
+            '(SELECT DISTINCT hotword_id FROM snapshot_items WHERE fetch_time >= ?)',
+            (since,)
+        ).fetchall())
+
+        return {
+            'fetch_times': fetch_times,
+            'snapshot': array('q', columns[0]),
+            'hotword_id': array('q', columns[1]),
+            'rank': array('q', columns[2]),
+            'hotness': array('q', columns[3]),
+            'hotwords': hotwords,
+        }
+
+    def record_analysis(self, hotword: str, hotness: int, ideas: List[Dict],
+                        model: str = '', analyzed_at: str = None):
+        """
+        记录热搜词最近一次的分析结果（覆盖旧记录）
+
+        Args:
+            hotword: 热搜词
+            hotness: 分析时的热度
+            ideas: 创意列表
+            model: 使用的模型（可选）
+            analyzed_at: 分析时间（可选，默认当前时间）
+        """
+        with self._transaction():
+            self.conn.execute(
+                'INSERT OR REPLACE INTO analyzed_ideas (hotword_id, analyzed_at, hotness, model, ideas) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self._hotword_id(hotword),
+                 analyzed_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                 hotness, model, json.dumps(ideas, ensure_ascii=False))
+            )
+
+    def latest_analysis(self, hotword: str) -> Optional[Dict]:
+        """
+        查询热搜词最近一次的分析结果
+
+        先按原文精确匹配，找不到时按归一化形式匹配（取最近的一条）。
+
+        Args:
+            hotword: 热搜词
+
+        Returns:
+            {hotword, analyzed_at, hotness, model, ideas}，没有记录时返回 None
+        """
+        columns = 'h.hotword, a.analyzed_at, a.hotness, a.model, a.ideas'
+        row = self.conn.execute(
+            f'SELECT {columns} FROM analyzed_ideas a JOIN hotwords h ON h.id = a.hotword_id '
+            f'WHERE h.hotword = ?',
+            (hotword,)
+        ).fetchone()
+        if row is None:
+            row = self.conn.execute(
+                f'SELECT {columns} FROM analyzed_ideas a JOIN hotwords h ON h.id = a.hotword_id '
+                f'WHERE h.normalized = ? ORDER BY a.analyzed_at DESC LIMIT 1',
+                (normalize_hotword(hotword),)
+            ).fetchone()
+        if row is None:
+            return None
+
+        record = dict(row)
+        record['ideas'] = json.loads(record['ideas'])
+        return record
+
+    def analyzed_hotwords(self) -> List[str]:
+        """所有有分析记录的热搜词"""
+        return [row[0] for row in self.conn.execute(
+            'SELECT h.hotword FROM analyzed_ideas a JOIN hotwords h ON h.id = a.hotword_id'
+        )]
+
+    def stats(self) -> Dict[str, int]:
+        """库内统计"""
+        query = self.conn.execute
+        return {
+            'snapshots': query('SELECT COUNT(*) FROM snapshots').fetchone()[0],
+            'hotwords': query('SELECT COUNT(*) FROM hotwords').fetchone()[0],
+            'items': query('SELECT COUNT(*) FROM snapshot_items').fetchone()[0],
+            'analyzed': query('SELECT COUNT(*) FROM analyzed_ideas').fetchone()[0]
+        }
+
+
+def main():
+    """命令行入口"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('ingest', 'history', 'stats'):
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    with SnapshotStore() as store:
+        if command == 'ingest':
+            paths = sys.argv[2:] or sorted(glob.glob('weibo_hotspots_*.json'))
+            print(f"📥 导入 {len(paths)} 个文件到 {store.path}")
+            added = store.ingest_files(paths)
+            print(f"✅ 新增 {added} 个快照")
+        elif command == 'history':
+            if len(sys.argv) < 3:
+                print("❌ 请提供热搜词")
+                sys.exit(1)
+            for row in store.hotword_history(sys.argv[2], normalized=True):
+                print(f"{row['fetch_time']}  #{row['rank']:<3} {row['hotness']:>10,}  {row['hotword']}")
+
+        stats = store.stats()
+        print(f"\n📊 快照 {stats['snapshots']} 个 | 热搜词 {stats['hotwords']} 个 | 记录 {stats['items']} 条"
+              f" | 已分析 {stats['analyzed']} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预编译 HTML 模板引擎
+
+功能：
+- 模板只解析一次，编译为 Python 代码对象（生成器函数），按片段流式产出
+- 编译结果以 marshal 格式缓存到磁盘，模板内容不变时跨进程直接加载
+- 语法（Jinja 风格子集）：
+    {{ 表达式 }}                      插入表达式的值（str()，不转义）
+    {% for 变量 in 表达式 %} ... {% endfor %}
+    {% if 表达式 %} ... {% elif 表达式 %} ... {% else %} ... {% endif %}
+    {# 注释 #}
+- 块标签独占一行时，该行的缩进与换行不会输出
+
+用法：
+template = load_template('templates/report_template.html')
+for chunk in template.render(context): ...
+
+环境变量：
+- TEMPLATE_CACHE_DIR: 编译缓存目录（可选，默认：.cache/templates，设为空字符串则只在内存中缓存）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 编译器输出格式变化时递增，使旧的磁盘缓存失效
+COMPILER_VERSION = 1
+
+_TOKEN_RE = re.compile(r'({{.*?}}|{%.*?%}|{#.*?#})', re.S)
+_FOR_RE = re.compile(r'^for\s+(.+?)\s+in\s+(.+)$', re.S)
+
+_memory_cache: Dict[Tuple[str, int, int], 'CompiledTemplate'] = {}
+_lock = threading.Lock()
+
+
+class TemplateSyntaxError(ValueError):
+    """模板语法错误"""
+
+
+def _strip_blocks(source: str) -> str:
+    """去掉独占一行的块标签所在行的缩进与换行"""
+    return re.sub(r'^[ \t]*({%.*?%}|{#.*?#})[ \t]*\n', r'\1', source, flags=re.M | re.S)
+
+
+def compile_source(source: str, name: str = '<template>') -> str:
+    """
+    把模板翻译为 Python 源码
+
+    生成的模块定义生成器函数 _render()，模板变量作为模块全局变量读取。
+    相邻的文本与表达式合并为一个 f-string；输出先写入缓冲区，
+    在最外层循环的每次迭代结束时作为一个片段产出。
+
+    Args:
+        source: 模板文本
+        name: 模板名称（用于错误信息）
+
+    Returns:
+        Python 源码
+
+    Raises:
+        TemplateSyntaxError: 标签不匹配或表达式语法错误
+    """
+    lines = ['def _render():', '    _buf = []', '    _append = _buf.append']
+    stack: List[Tuple[str, int]] = []
+    pieces: List[Tuple[bool, str]] = []
+    indent = 1
+    line_no = 1
+
+    def emit(code: str, level: int = None):
+        lines.append('    ' * (indent if level is None else level) + code)
+
+    def flush():
+        # 相邻的文本与表达式合并为一个 f-string；表达式先赋给局部变量，
+        # 避免表达式中的引号、反斜杠与 f-string 冲突
+        if not pieces:
+            return
+        literals = []
+        for is_expr, value in pieces:
+            if is_expr:
+                var = f"_v{len(literals)}"
+                emit(f"{var} = ({value})")
+                literals.append(f"f'{{{var}}}'")
+            else:
+                literals.append('f' + repr(value.replace('{', '{{').replace('}', '}}')))
+        emit(f"_append({' '.join(literals)})")
+        pieces.clear()
+
+    def yield_buffer(level: int = None):
+        emit("yield ''.join(_buf)", level)
+        emit('_buf.clear()', level)
+
+    def check(expr: str):
+        try:
+            compile(expr, name, 'eval')
+        except SyntaxError as e:
+            raise TemplateSyntaxError(f"{name}:{line_no}: 表达式语法错误: {expr!r} ({e.msg})") from None
+
+    for token in _TOKEN_RE.split(_strip_blocks(source)):
+        if not token:
+            continue
+        if token.startswith('{{'):
+            expr = token[2:-2].strip()
+            check(expr)
+            pieces.append((True, expr))
+        elif token.startswith('{#'):
+            pass
+        elif token.startswith('{%'):
+            flush()
+            tag = token[2:-2].strip()
+            keyword = tag.split(None, 1)[0] if tag else ''
+            if keyword == 'for':
+                match = _FOR_RE.match(tag)
+                if not match:
+                    raise TemplateSyntaxError(f"{name}:{line_no}: 无效的 for 标签: {tag!r}")
+                check(match.group(2))
+                if not stack:
+                    # 最外层循环开始前先产出已缓冲的内容
+                    yield_buffer()
+                emit(f"for {match.group(1)} in {match.group(2)}:")
+                stack.append(('for', line_no))
+                indent += 1
+            elif keyword == 'if':
+                check(tag[2:].strip())
+                emit(f"if {tag[2:].strip()}:")
+                stack.append(('if', line_no))
+                indent += 1
+            elif keyword in ('elif', 'else'):
+                if not stack or stack[-1][0] != 'if':
+                    raise TemplateSyntaxError(f"{name}:{line_no}: {keyword} 缺少对应的 if")
+                emit('pass')
+                if keyword == 'elif':
+                    check(tag[4:].strip())
+                    emit(f"elif {tag[4:].strip()}:", indent - 1)
+                else:
+                    emit('else:', indent - 1)
+            elif keyword in ('endfor', 'endif'):
+                if not stack or stack[-1][0] != keyword[3:]:
+                    raise TemplateSyntaxError(f"{name}:{line_no}: 多余的 {keyword}")
+                stack.pop()
+                emit('pass')
+                if keyword == 'endfor' and not stack:
+                    # 最外层循环每次迭代产出一个片段
+                    yield_buffer()
+                indent -= 1
+            else:
+                raise TemplateSyntaxError(f"{name}:{line_no}: 未知标签: {tag!r}")
+        else:
+            pieces.append((False, token))
+        line_no += token.count('\n')
+
+    if stack:
+        kind, opened = stack[-1]
+        raise TemplateSyntaxError(f"{name}:{opened}: {kind} 标签未闭合")
+    flush()
+    yield_buffer()
+    return '\n'.join(lines) + '\n'
+
+
+class CompiledTemplate:
+    """已编译的模板"""
+
+    def __init__(self, code, name: str = '<template>'):
+        self.code = code
+        self.name = name
+
+    def render(self, context: Dict) -> Iterator[str]:
+        """
+        渲染模板
+
+        Args:
+            context: 模板变量
+
+        Yields:
+            HTML 片段
+        """
+        namespace = dict(context)
+        exec(self.code, namespace)
+        yield from namespace['_render']()
+
+    def render_string(self, context: Dict) -> str:
+        """渲染为完整字符串"""
+        return ''.join(self.render(context))
+
+
+def _cache_dir() -> Optional[str]:
+    return os.environ.get('TEMPLATE_CACHE_DIR', '.cache/templates') or None
+
+
+def load_template(path: str) -> CompiledTemplate:
+    """
+    加载模板（进程内与磁盘两级缓存）
+
+    进程内缓存以文件路径、修改时间与大小为键，命中时不再读取模板；
+    磁盘缓存键为模板内容、编译器版本与 Python 字节码版本的摘要，
+    模板修改后自动重新编译。
+
+    Args:
+        path: 模板文件路径
+
+    Returns:
+        已编译的模板
+    """
+    stat = os.stat(path)
+    stamp = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        template = _memory_cache.get(stamp)
+        if template is not None:
+            return template
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    key = hashlib.sha256(
+        raw + f"|{COMPILER_VERSION}|".encode('ascii') + importlib.util.MAGIC_NUMBER
+    ).hexdigest()[:20]
+
+    name = os.path.basename(path)
+    code = None
+    cache_dir = _cache_dir()
+    cache_file = os.path.join(cache_dir, f"{os.path.splitext(name)[0]}.{key}.bin") if cache_dir else None
+
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            code = None
+
+    if code is None:
+        code = compile(compile_source(raw.decode('utf-8'), name), path, 'exec')
+        if cache_file:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    marshal.dump(code, f)
+                os.replace(tmp_file, cache_file)
+            except OSError:
+                pass
+
+    template = CompiledTemplate(code, name)
+    with _lock:
+        _memory_cache[stamp] = template
+    return template
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热搜词文本处理工具
+
+功能：
+- 热搜词归一化：全角/半角统一、大小写统一、去除空白与标点符号
+  用于识别 "AI 新模型发布" 与 "#AI新模型发布#" 这类写法不同的同一话题
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import unicodedata
+from functools import lru_cache
+
+
+@lru_cache(maxsize=65536)
+def normalize_hotword(hotword: str) -> str:
+    """
+    归一化热搜词
+
+    Args:
+        hotword: 原始热搜词
+
+    Returns:
+        只保留文字和数字的小写形式（全部被去除时返回去空白后的原文）
+    """
+    text = unicodedata.normalize('NFKC', hotword or '').lower()
+    normalized = ''.join(ch for ch in text if unicodedata.category(ch)[0] in 'LN')
+    return normalized or text.strip()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热搜热度趋势引擎（NumPy 向量化）
+
+功能：
+- 由历史快照构建 话题 × 快照 的热度矩阵（按归一化热搜词合并不同写法）
+- 对所有话题一次性计算热度变化量、增长率与 EWMA z-score（无逐话题循环）
+- 给出"上升"榜：近期热度增速显著高于自身历史波动的话题，
+  可替代按排名截取前 N 名作为分析输入
+
+计算方式：
+- 未上榜的快照以该快照的最低上榜热度填充（热度的上界），避免新上榜话题的增量被夸大
+- delta = 最新一次的热度变化量，growth = delta / 上一快照热度
+- z-score = (delta - 历史变化量的 EWMA 均值) / EWMA 标准差，
+  EWMA 用截断权重向量以矩阵乘法计算，耗时只与参与计算的快照数有关
+
+用法：
+python scripts/trend_engine.py [--history 64] [--limit 20]
+
+环境变量：
+- WEIBO_HISTORY_DB: 历史库路径（见 snapshot_store.py）
+- WEIBO_ARCHIVE_DIR: 设置后改从列式归档读取（见 columnar_archive.py）
+- TREND_HISTORY: 参与计算的最近快照数（可选，默认：64）
+- TREND_ALPHA: EWMA 平滑系数（可选，默认：0.3）
+- TREND_MIN_Z: 判定为上升的最小 z-score（可选，默认：2.0）
+
+依赖：
+- numpy（pip install numpy）
+
+版本：
+v1.0.0 (2026-10-17)
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from text_utils import normalize_hotword
+
+
+class Trends:
+    """一次趋势计算的结果（按话题对齐的数组）"""
+
+    def __init__(self, hotwords: List[str], keys: List[str], series, rank, delta, growth, zscore,
+                 fetch_times: List[str], min_z: float):
+        self.hotwords = hotwords
+        self.keys = keys
+        self.series = series
+        self.rank = rank
+        self.delta = delta
+        self.growth = growth
+        self.zscore = zscore
+        self.fetch_times = fetch_times
+        self.min_z = min_z
+        self._index = {key: i for i, key in enumerate(keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, hotword: str) -> Optional[Dict]:
+        """查询热搜词（按归一化形式）的趋势指标"""
+        i = self._index.get(normalize_hotword(hotword))
+        return None if i is None else self._row(i)
+
+    def _row(self, i: int) -> Dict:
+        return {
+            'hotword': self.hotwords[i],
+            'rank': int(self.rank[i]),
+            'hotness': int(self.series[i, -1]),
+            'delta': int(self.delta[i]),
+            'growth': float(self.growth[i]),
+            'zscore': float(self.zscore[i]),
+        }
+
+    def rising(self, limit: int = 20) -> List[Dict]:
+        """
+        上升榜
+
+        Args:
+            limit: 返回数量
+
+        Returns:
+            当前在榜、热度上升且 z-score 不低于 min_z 的话题，按 z-score 降序
+        """
+        mask = (self.rank > 0) & (self.delta > 0) & (self.zscore >= self.min_z)
+        candidates = np.flatnonzero(mask)
+        order = candidates[np.lexsort((-self.growth[candidates], -self.zscore[candidates]))]
+        return [self._row(i) for i in order[:limit]]
+
+
+class TrendEngine:
+    """热度趋势引擎"""
+
+    def __init__(self, history: int = 64, alpha: float = 0.3, min_z: float = 2.0):
+        """
+        初始化趋势引擎
+
+        Args:
+            history: 参与计算的最近快照数
+            alpha: EWMA 平滑系数（越大越偏重近期）
+            min_z: 判定为上升的最小 z-score
+
+        Raises:
+            ImportError: 未安装 numpy
+        """
+        if np is None:
+            raise ImportError("趋势分析需要 numpy，请运行: pip install numpy")
+        self.history = max(3, history)
+        self.alpha = alpha
+        self.min_z = min_z
+
+    @classmethod
+    def from_env(cls) -> 'TrendEngine':
+        """根据环境变量创建趋势引擎"""
+        return cls(
+            history=int(os.environ.get('TREND_HISTORY', '64')),
+            alpha=float(os.environ.get('TREND_ALPHA', '0.3')),
+            min_z=float(os.environ.get('TREND_MIN_Z', '2.0'))
+        )
+
+    def compute(self, points: Dict) -> Trends:
+        """
+        计算趋势指标
+
+        Args:
+            points: SnapshotStore.load_points() 的返回值（快照可多于 history，只取最近的部分）
+
+        Returns:
+            Trends，只包含最新快照中在榜的话题
+        """
+        fetch_times = points['fetch_times']
+        total = len(fetch_times)
+        snapshot = np.asarray(points['snapshot'], dtype=np.int64)
+        hotword_id = np.asarray(points['hotword_id'], dtype=np.int64)
+        rank = np.asarray(points['rank'], dtype=np.int64)
+        hotness = np.asarray(points['hotness'], dtype=np.float64)
+
+        # 只保留最近 history 个快照的数据点
+        start = max(0, total - self.history)
+        window = total - start
+        keep = snapshot >= start
+        snapshot, hotword_id, rank, hotness = snapshot[keep] - start, hotword_id[keep], rank[keep], hotness[keep]
+        if window == 0 or snapshot.size == 0:
+            return self._empty(fetch_times)
+
+        # 热搜词 id → 归一化话题下标（不同写法合并为同一话题）
+        ids = np.unique(hotword_id)
+        names = points['hotwords']
+        keys, key_index = [], {}
+        lookup = np.empty(ids.size, dtype=np.int64)
+        for pos, hid in enumerate(ids.tolist()):
+            key = normalize_hotword(names.get(hid, str(hid)))
+            if key not in key_index:
+                key_index[key] = len(keys)
+                keys.append(key)
+            lookup[pos] = key_index[key]
+        topic = lookup[np.searchsorted(ids, hotword_id)]
+
+        # 只计算最新快照中在榜的话题
+        latest = snapshot == window - 1
+        current = np.unique(topic[latest])
+        remap = np.full(len(keys), -1, dtype=np.int64)
+        remap[current] = np.arange(current.size)
+        row = remap[topic]
+        on_list = row >= 0
+
+        # 每个快照的最低上榜热度，作为未上榜时的热度上界
+        cutoff = np.full(window, np.inf)
+        np.minimum.at(cutoff, snapshot, hotness)
+        cutoff[np.isinf(cutoff)] = 0.0
+
+        series = np.broadcast_to(cutoff, (current.size, window)).copy()
+        np.maximum.at(series, (row[on_list], snapshot[on_list]), hotness[on_list])
+
+        current_rank = np.full(current.size, np.iinfo(np.int64).max)
+        np.minimum.at(current_rank, row[latest], rank[latest])
+
+        delta, growth, zscore = self._metrics(series)
+
+        # 每个话题取最新快照中排名最高的写法作为展示名
+        display = {}
+        order = np.argsort(rank[latest], kind='stable')
+        for hid, r in zip(hotword_id[latest][order].tolist(), row[latest][order].tolist()):
+            display.setdefault(r, names.get(hid, str(hid)))
+
+        return Trends(
+            hotwords=[display[i] for i in range(current.size)],
+            keys=[keys[k] for k in current.tolist()],
+            series=series,
+            rank=current_rank,
+            delta=delta,
+            growth=growth,
+            zscore=zscore,
+            fetch_times=fetch_times[start:],
+            min_z=self.min_z,
+        )
+
+    def _metrics(self, series):
+        """变化量、增长率与 EWMA z-score（对所有话题向量化）"""
+        count, window = series.shape
+        if window < 2:
+            zeros = np.zeros(count)
+            return zeros.astype(np.int64), zeros, zeros
+
+        diffs = np.diff(series, axis=1)
+        delta = diffs[:, -1]
+        previous = series[:, -2]
+        growth = delta / np.maximum(previous, 1.0)
+
+        past = diffs[:, :-1]
+        if past.shape[1] == 0:
+            return delta.astype(np.int64), growth, np.zeros(count)
+
+        # 截断的 EWMA 权重：最近一次变化量权重为 1，依次乘以 (1 - alpha)
+        weights = (1.0 - self.alpha) ** np.arange(past.shape[1] - 1, -1, -1)
+        weights /= weights.sum()
+        mean = past @ weights
+        variance = ((past - mean[:, None]) ** 2) @ weights
+        # 标准差下限为当前热度的 1%，避免平稳序列上的微小波动被放大
+        std = np.maximum(np.sqrt(variance), 0.01 * np.maximum(series[:, -1], 1.0))
+        zscore = (delta - mean) / std
+        return delta.astype(np.int64), growth, zscore
+
+    def _empty(self, fetch_times: List[str]) -> Trends:
+        empty = np.zeros(0)
+        return Trends([], [], np.zeros((0, 0)), empty.astype(np.int64), empty.astype(np.int64),
+                      empty, empty, fetch_times[-self.history:], self.min_z)
+
+    def from_store(self, store) -> Trends:
+        """从历史库或列式归档加载最近 history 个快照并计算趋势"""
+        return self.compute(store.load_points(last=self.history))
+
+
+def history_source_exists() -> bool:
+    """open_history_source() 对应的数据源是否已存在"""
+    if os.environ.get('WEIBO_ARCHIVE_DIR'):
+        return os.path.isdir(os.environ['WEIBO_ARCHIVE_DIR'])
+    from snapshot_store import default_db_path
+    return os.path.exists(default_db_path())
+
+
+def open_history_source():
+    """
+    打开趋势分析的数据源
+
+    Returns:
+        设置了 WEIBO_ARCHIVE_DIR 时为 ColumnarArchive，否则为 SnapshotStore（均支持 with 语句）
+    """
+    if os.environ.get('WEIBO_ARCHIVE_DIR'):
+        from columnar_archive import ColumnarArchive
+        return ColumnarArchive()
+    from snapshot_store import SnapshotStore
+    return SnapshotStore()
+
+
+def select_rising(result: Dict, trends: Trends, limit: int = 10) -> List[Dict]:
+    """
+    按上升趋势选取待分析的热搜
+
+    上升榜中的热搜按 z-score 排在前面，其余热搜按原排名补足。
+
+    Args:
+        result: 当前热搜数据（WeiboHotspotFetcher.fetch() 的返回值）
+        trends: 趋势计算结果
+        limit: 选取数量
+
+    Returns:
+        热搜数据列表（保留原始 rank 字段）
+    """
+    items = result.get('data', [])
+    rising = {normalize_hotword(t['hotword']): i for i, t in enumerate(trends.rising(len(items)))}
+    ordered = sorted(
+        enumerate(items),
+        key=lambda pair: (rising.get(normalize_hotword(pair[1]['hotword']), len(items)), pair[0])
+    )
+    return [item for _, item in ordered[:limit]]
+
+
+def main():
+    """主函数：打印上升榜"""
+    parser = argparse.ArgumentParser(description="热搜热度趋势")
+    parser.add_argument('--history', type=int, default=int(os.environ.get('TREND_HISTORY', '64')),
+                        help="参与计算的最近快照数 (默认: 64)")
+    parser.add_argument('--limit', type=int, default=20,
+                        help="上升榜数量 (默认: 20)")
+    args = parser.parse_args()
+
+    try:
+        engine = TrendEngine.from_env()
+    except ImportError as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+    engine.history = max(3, args.history)
+
+    with open_history_source() as store:
+        started = time.perf_counter()
+        points = store.load_points(last=engine.history)
+        loaded = time.perf_counter()
+        trends = engine.compute(points)
+        finished = time.perf_counter()
+
+    print(f"📈 {len(trends.fetch_times)} 个快照，{len(points['hotness'])} 个数据点，当前在榜 {len(trends)} 个话题")
+    print(f"⏱️  加载 {(loaded - started) * 1000:.1f} ms | 计算 {(finished - loaded) * 1000:.1f} ms")
+
+    rising = trends.rising(args.limit)
+    if not rising:
+        print("\n😴 暂无明显上升的话题")
+        return
+    print(f"\n🚀 上升榜 (z ≥ {engine.min_z}):")
+    for item in rising:
+        print(f"  #{item['rank']:<3} {item['hotword']}  {item['hotness']:,}"
+              f"  +{item['delta']:,} ({item['growth'] * 100:+.0f}%)  z={item['zscore']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+claude_analysis_anthropic_original.analyze_batch_async 的桩服务测试
+
+本地 http.server 模拟 Messages API（ANTHROPIC_BASE_URL 指向它），
+排名靠前的话题响应更慢，验证并发完成顺序不影响结果顺序，以及 save_ideas 的输出结构。
+
+用法：
+python -m unittest discover tests
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+HAS_ANTHROPIC = importlib.util.find_spec('anthropic') is not None
+if HAS_ANTHROPIC:
+    from claude_analysis_anthropic_original import ClaudeHotspotAnalyzer
+
+HOTWORDS = ['话题0', '话题1', '话题2', '话题3']
+# 该话题返回 400（SDK 不重试），应得到失败占位符
+FAILING = '话题3'
+
+IDEA_FIELDS = {'name', 'score', 'fun_score', 'use_score', 'features', 'target_users',
+               'description', 'hotword', 'hotness', 'rank'}
+
+
+class StubMessagesHandler(BaseHTTPRequestHandler):
+    """POST /v1/messages：按提示词中的话题返回一个创意"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][0]['content']
+        hotword = re.search(r'话题\d', prompt).group()
+
+        if hotword == FAILING:
+            self._send(400, {'type': 'error',
+                             'error': {'type': 'invalid_request_error', 'message': 'stub failure'}})
+            return
+
+        # 排名越靠前响应越慢，完成顺序与输入顺序相反
+        time.sleep(0.05 * (len(HOTWORDS) - int(hotword[-1])))
+        ideas = {'ideas': [{
+            'name': f'{hotword}创意',
+            'score': 85,
+            'fun_score': 80,
+            'use_score': 70,
+            'features': ['功能一', '功能二'],
+            'target_users': '测试用户',
+            'description': f'{hotword}的描述',
+        }]}
+        self._send(200, {
+            'id': f'msg_{hotword[-1]}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': body['model'],
+            'content': [{'type': 'text', 'text': '```json\n' + json.dumps(ideas, ensure_ascii=False) + '\n```'}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': 10, 'output_tokens': 10},
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@unittest.skipUnless(HAS_ANTHROPIC, "未安装 anthropic 库")
+class AnalyzeBatchAsyncTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubMessagesHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.env = mock.patch.dict(os.environ, {'ANTHROPIC_BASE_URL': base_url, 'NO_PROXY': '*'})
+        cls.env.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.hotspots = [{'rank': i + 1, 'hotword': word, 'hotword_num_int': 1000 - i}
+                         for i, word in enumerate(HOTWORDS)]
+        self.analyzer = ClaudeHotspotAnalyzer('test-key', max_workers=len(HOTWORDS))
+
+    def test_results_keep_input_order(self):
+        ideas = asyncio.run(self.analyzer.analyze_batch_async(self.hotspots))
+
+        self.assertEqual([idea['hotword'] for idea in ideas], HOTWORDS)
+        self.assertEqual([idea['rank'] for idea in ideas], [1, 2, 3, 4])
+        self.assertEqual(ideas[0]['name'], '话题0创意')
+        self.assertEqual(ideas[0]['hotness'], 1000)
+        self.assertEqual(ideas[-1]['score'], 0)
+        self.assertEqual(ideas[-1]['name'], f'「{FAILING}」分析失败')
+
+    def test_save_ideas_schema(self):
+        ideas = asyncio.run(self.analyzer.analyze_batch_async(self.hotspots))
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, 'weibo_ideas_test.json')
+            self.analyzer.save_ideas(ideas, output_file)
+            with open(output_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+
+        self.assertEqual(set(saved), {'generate_time', 'statistics', 'ideas'})
+        self.assertEqual(saved['statistics'], {
+            'total': 4,
+            'successful': 3,
+            'excellent': 3,
+            'good': 0,
+            'avg_score': 85.0,
+        })
+        self.assertEqual(saved['ideas'], ideas)
+        for idea in saved['ideas']:
+            self.assertEqual(set(idea), IDEA_FIELDS)
+
+
+if __name__ == '__main__':
+    unittest.main()